@@ -12,7 +12,8 @@ from pathlib import Path
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent))
-from src.generators import generate_mixed_aliases
+from src.generators import generate_mixed_aliases, resume_aliases
+from src.lengths import length_window
 
 class EmailAliasGeneratorGUI:
     def __init__(self, root):
@@ -51,14 +52,33 @@ class EmailAliasGeneratorGUI:
         
         # Count input
         ttk.Label(main_frame, text="🔢 Number of Aliases:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        count_frame = ttk.Frame(main_frame)
+        count_frame.grid(row=2, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         self.count_var = tk.StringVar(value="5")
-        count_entry = ttk.Entry(main_frame, textvariable=self.count_var, width=10)
-        count_entry.grid(row=2, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        ttk.Entry(count_frame, textvariable=self.count_var, width=10).pack(side=tk.LEFT)
         
-        # Generate button
-        generate_btn = ttk.Button(main_frame, text="✨ Generate Aliases", 
+        # Optional time budget
+        ttk.Label(count_frame, text="⏱️ Time Limit (ms):").pack(side=tk.LEFT, padx=(20, 5))
+        self.deadline_var = tk.StringVar()
+        ttk.Entry(count_frame, textvariable=self.deadline_var, width=8).pack(side=tk.LEFT)
+        
+        # Optional length limits for the part before the @
+        ttk.Label(count_frame, text="📏 Length:").pack(side=tk.LEFT, padx=(20, 5))
+        self.min_length_var = tk.StringVar()
+        ttk.Entry(count_frame, textvariable=self.min_length_var, width=4).pack(side=tk.LEFT)
+        ttk.Label(count_frame, text="-").pack(side=tk.LEFT, padx=2)
+        self.max_length_var = tk.StringVar()
+        ttk.Entry(count_frame, textvariable=self.max_length_var, width=4).pack(side=tk.LEFT)
+        
+        # Generate and continue buttons
+        action_frame = ttk.Frame(main_frame)
+        action_frame.grid(row=3, column=0, columnspan=2, pady=20, sticky=tk.W)
+        generate_btn = ttk.Button(action_frame, text="✨ Generate Aliases", 
                                 command=self.generate_aliases, style='Accent.TButton')
-        generate_btn.grid(row=3, column=0, columnspan=2, pady=20, sticky=tk.W)
+        generate_btn.pack(side=tk.LEFT)
+        self.continue_btn = ttk.Button(action_frame, text="➕ Continue", 
+                                     command=self.continue_aliases, state=tk.DISABLED)
+        self.continue_btn.pack(side=tk.LEFT, padx=(10, 0))
         
         # Results area
         ttk.Label(main_frame, text="📋 Generated Aliases:", font=('Arial', 10, 'bold')).grid(
@@ -92,6 +112,26 @@ class EmailAliasGeneratorGUI:
         status_bar.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
         
         self.aliases = []
+        self.continuation = None
+    
+    def get_deadline(self):
+        """Time limit in milliseconds, or None when left empty."""
+        text = self.deadline_var.get().strip()
+        if not text:
+            return None
+        deadline_ms = int(text)
+        if deadline_ms < 0:
+            raise ValueError(text)
+        return deadline_ms
+    
+    def get_lengths(self):
+        """(min_length, max_length) of the local part; None where left empty."""
+        lengths = []
+        for var in (self.min_length_var, self.max_length_var):
+            text = var.get().strip()
+            lengths.append(int(text) if text else None)
+        length_window(*lengths)  # raises ValueError for an impossible window
+        return lengths
     
     def generate_aliases(self):
         email = self.email_var.get().strip().lower()
@@ -111,12 +151,27 @@ class EmailAliasGeneratorGUI:
             messagebox.showerror("Error", "Please enter a valid number")
             return
         
+        try:
+            deadline_ms = self.get_deadline()
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a time limit in milliseconds, or leave it empty")
+            return
+        
+        try:
+            min_length, max_length = self.get_lengths()
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a length range like 6 - 20, or leave it empty")
+            return
+        
         # Generate aliases
         try:
             self.status_var.set("⏳ Generating aliases...")
             self.root.update()
             
-            self.aliases = generate_mixed_aliases(email, count)
+            result = generate_mixed_aliases(email, count, deadline_ms=deadline_ms,
+                                            min_length=min_length, max_length=max_length)
+            self.aliases = list(result)
+            self.set_continuation(result)
             
             # Display results
             self.results_text.delete(1.0, tk.END)
@@ -146,7 +201,45 @@ class EmailAliasGeneratorGUI:
                 
                 self.results_text.insert(tk.END, f"{i:2}. {alias}{alias_type}\n")
             
+            self.show_status()
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to generate aliases: {str(e)}")
+            self.status_var.set("❌ Generation failed")
+    
+    def set_continuation(self, result):
+        """Remember where a run stopped if the time limit cut it short."""
+        self.continuation = result.continuation if result.partial else None
+        self.continue_btn.config(state=tk.NORMAL if self.continuation else tk.DISABLED)
+    
+    def show_status(self):
+        if self.continuation:
+            self.status_var.set(f"⏱️ Time limit reached after {len(self.aliases)} aliases "
+                                "- press Continue for more")
+        else:
             self.status_var.set(f"✅ Generated {len(self.aliases)} aliases successfully!")
+    
+    def continue_aliases(self):
+        """Resume a run that hit the time limit, appending to the results."""
+        if not self.continuation:
+            return
+        try:
+            deadline_ms = self.get_deadline()
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a time limit in milliseconds, or leave it empty")
+            return
+        
+        try:
+            self.status_var.set("⏳ Generating more aliases...")
+            self.root.update()
+            
+            result = resume_aliases(self.continuation, deadline_ms)
+            start = len(self.aliases) + 1
+            self.aliases.extend(result)
+            self.set_continuation(result)
+            for i, alias in enumerate(result, start):
+                self.results_text.insert(tk.END, f"{i:2}. {alias}\n")
+            self.show_status()
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate aliases: {str(e)}")
@@ -6,6 +6,7 @@ Email Alias Generator - A simple interactive tool for generating email aliases
 import click
 import json
 import csv
+import os
 import random
 from pathlib import Path
 from generators import (
@@ -13,8 +14,21 @@ from generators import (
     generate_variations,
     generate_plus_aliases,
     load_word_lists,
-    generate_mixed_aliases
+    generate_mixed_aliases,
+    generate_rotating_aliases,
+    get_default_engine,
+    iter_across_domains,
+    iter_mixed_aliases,
+    reserve_aliases,
+    resume_aliases,
+    set_blocklist
 )
+from deadline import decode_token
+from engine import check_mix
+from extsort import DEFAULT_MEMORY_MB, SET_OPERATIONS, merge_alias_files, read_aliases
+from lengths import MAX_LOCAL_LENGTH, length_window
+from worker import serve_stdio as serve_stdio_worker
+from writers import DATABASE_FORMATS, MAP_FORMATS, write_alias_map, write_sqlite
 
 
 def interactive_mode():
@@ -86,23 +100,83 @@ def interactive_mode():
         click.echo("\n👋 Thanks for using Email Alias Generator!\n")
 
 
-@click.command()
+@click.group(invoke_without_command=True)
+@click.pass_context
 @click.option('--interactive', '-i', is_flag=True, help='Run in interactive mode (default)')
 @click.option('--email', '-e', help='Email address for quick generation')
 @click.option('--count', '-c', default=5, help='Number of aliases to generate')
 @click.option('--output', '-o', help='Output file path')
 @click.option('--format', '-f', 
-              type=click.Choice(['text', 'json', 'csv']), 
+              type=click.Choice(['text', 'json', 'csv', *MAP_FORMATS, *DATABASE_FORMATS]), 
               default='text',
-              help='Output format')
-def main(interactive, email, count, output, format):
+              help='Output format (postfix, postfix-sorted and dbm write alias -> mailbox maps, '
+                   'sqlite appends to a database)')
+@click.option('--shards', default=1, type=click.IntRange(min=1),
+              help='Split postfix/dbm maps into this many shard files')
+@click.option('--mix', help='Strategy weights, e.g. plus=0.8,dots=0.2')
+@click.option('--secure', is_flag=True, help='Use OS entropy so aliases cannot be predicted')
+@click.option('--rotate', is_flag=True,
+              help='Derive stateless rotating aliases keyed by $ALIAS_ROTATION_KEY')
+@click.option('--rotate-period', default=86400, help='Rotation period in seconds')
+@click.option('--deadline-ms', type=click.IntRange(min=0),
+              help='Time budget in milliseconds; prints a resume token if it runs out')
+@click.option('--resume', 'resume_token', metavar='TOKEN',
+              help='Continue a run that hit its deadline, from its resume token')
+@click.option('--blocklist', type=click.Path(exists=True, dir_okay=False),
+              help='File of terms (one per line) that must never appear in an alias')
+@click.option('--min-distance', type=click.IntRange(min=1),
+              help='Keep every new alias at least this many typos (edits) from the others')
+@click.option('--existing', type=click.Path(exists=True, dir_okay=False),
+              help='Aliases already issued (text, CSV or JSON); new ones avoid them')
+@click.option('--min-length', type=click.IntRange(min=1),
+              help='Shortest allowed local part (the text before the @)')
+@click.option('--max-length', type=click.IntRange(min=1, max=MAX_LOCAL_LENGTH),
+              help='Longest allowed local part (the text before the @)')
+@click.option('--domains', help='Comma-separated domains to issue every local part on, '
+                                'e.g. example.com,example.org')
+@click.option('--unique-local-parts', is_flag=True,
+              help='With --domains, issue each local part on one domain only')
+@click.option('--serve-stdio', is_flag=True,
+              help='Stay running and answer JSON-lines requests on stdin/stdout')
+def main(ctx, interactive, email, count, output, format, shards, mix, secure, rotate, rotate_period,
+         deadline_ms, resume_token, blocklist, min_distance, existing, min_length, max_length,
+         domains, unique_local_parts, serve_stdio):
     """Email Alias Generator - Create email aliases easily!"""
     
+    if blocklist:
+        set_blocklist(blocklist)
+    
+    if ctx.invoked_subcommand is not None:
+        return
+    
+    if serve_stdio:
+        serve_stdio_worker(get_default_engine(secure), key=os.environ.get('ALIAS_ROTATION_KEY'))
+        return
+    
     # If no arguments provided or interactive flag, run interactive mode
-    if interactive or (not email and not output):
+    if interactive or (not email and not output and not resume_token):
         interactive_mode()
     else:
         # Quick generation mode
+        if resume_token:
+            try:
+                if existing:
+                    # The token does not carry the existing set, so reserve it again
+                    token = decode_token(resume_token)
+                    if not token.get('min_distance'):
+                        raise ValueError("--existing only resumes runs started with --existing "
+                                         "or --min-distance")
+                    reserve_aliases(token['email'], read_aliases(existing),
+                                    token['min_distance'], secure=secure)
+                aliases = resume_aliases(resume_token, deadline_ms, secure=secure,
+                                         key=os.environ.get('ALIAS_ROTATION_KEY'))
+            except (KeyError, ValueError) as e:
+                click.echo(f"Error: {e}", err=True)
+                return
+            email = email or decode_token(resume_token)['email']
+            emit_aliases(aliases, email, output, format, shards)
+            return
+        
         if not email:
             click.echo("Error: --email is required for non-interactive mode", err=True)
             return
@@ -111,47 +185,218 @@ def main(interactive, email, count, output, format):
             click.echo("Error: Please provide a valid email address", err=True)
             return
         
-        aliases = generate_mixed_aliases(email, count)
+        try:
+            strategy_mix = parse_mix(mix) if mix else None
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            return
+        
+        try:
+            length_window(min_length, max_length)
+        except ValueError:
+            click.echo("Error: --min-length must not exceed --max-length", err=True)
+            return
+        
+        if rotate:
+            key = os.environ.get('ALIAS_ROTATION_KEY')
+            if not key:
+                click.echo("Error: set ALIAS_ROTATION_KEY to use --rotate", err=True)
+                return
+            if min_length or max_length:
+                click.echo("Error: rotating aliases have a fixed length; drop --min-length/--max-length",
+                           err=True)
+                return
+        
+        if domains:
+            domains = [d.strip() for d in domains.split(',') if d.strip()]
+            if not domains or not all('.' in d for d in domains):
+                click.echo("Error: --domains needs comma-separated domains like example.com",
+                           err=True)
+                return
+            if rotate or deadline_ms is not None or min_distance or existing:
+                click.echo("Error: --domains cannot be combined with --rotate, --deadline-ms, "
+                           "--min-distance or --existing", err=True)
+                return
+        
+        if format in MAP_FORMATS or format in DATABASE_FORMATS:
+            if not output:
+                click.echo(f"Error: --output is required for the {format} format", err=True)
+                return
         
+        if existing:
+            # Without --min-distance the existing aliases are simply not repeated
+            min_distance = min_distance or 1
+            reserve_aliases(email, read_aliases(existing), min_distance, secure=secure)
+        
+        if domains:
+            # Each local part is generated once and streamed out on every domain
+            try:
+                aliases = iter_across_domains(email, domains, count, mix=strategy_mix,
+                                              secure=secure, min_length=min_length,
+                                              max_length=max_length, unique=unique_local_parts)
+            except ValueError as e:
+                click.echo(f"Error: {e}", err=True)
+                return
+        elif rotate:
+            aliases = generate_rotating_aliases(email, count, key, period=rotate_period,
+                                                deadline_ms=deadline_ms)
+        elif deadline_ms is None and (format in MAP_FORMATS or format in DATABASE_FORMATS):
+            # Stream straight from the generator into the map or database
+            aliases = iter_mixed_aliases(email, count, strategy_mix, secure=secure,
+                                         min_distance=min_distance, min_length=min_length,
+                                         max_length=max_length)
+        else:
+            aliases = generate_mixed_aliases(email, count, strategy_mix, secure=secure,
+                                             deadline_ms=deadline_ms, min_distance=min_distance,
+                                             min_length=min_length, max_length=max_length)
+        emit_aliases(aliases, email, output, format, shards)
+
+
+def emit_aliases(aliases, email, output, format, shards=1):
+    """Write or display generated aliases, then report a deadline cut-off."""
+    if format in MAP_FORMATS or format in DATABASE_FORMATS:
+        if not output:
+            click.echo(f"Error: --output is required for the {format} format", err=True)
+            return
+        if format == 'sqlite':
+            written = write_sqlite(aliases, email, output)
+        else:
+            written = write_alias_map(aliases, email, output, format, shards)
+        click.echo(f"✓ Generated {written} aliases and saved to {output}")
+    elif output:
+        written = save_to_file(aliases, output, format)
+        click.echo(f"✓ Generated {written} aliases and saved to {output}")
+    else:
+        display_aliases(aliases, format)
+    
+    if getattr(aliases, 'partial', False):
+        click.echo(f"⏱️  Deadline reached before all aliases were generated. Resume with:\n"
+                   f"   --resume {aliases.continuation}", err=True)
+
+
+@main.command()
+@click.argument('files', nargs=-1, type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--ambiguous-only', is_flag=True, help='Only print aliases that parse more than one way')
+def decode(files, ambiguous_only):
+    """Parse aliases (text or CSV, one per line) back into their strategy,
+    words and number. Prints one JSON object per line; reads stdin if no
+    files are given."""
+    decoder = get_default_engine().decoder()
+    for name in files or ('-',):
+        with click.open_file(name, 'r') as f:
+            for alias, parses in decoder.decode_lines(f):
+                if ambiguous_only and len(parses) < 2:
+                    continue
+                click.echo(json.dumps({
+                    'alias': alias,
+                    'ambiguous': len(parses) > 1,
+                    'parses': [{'strategy': p.strategy, 'words': list(p.words), 'number': p.number}
+                               for p in parses],
+                }))
+
+
+@main.command()
+@click.argument('files', nargs=-1, required=True,
+                type=click.Path(exists=True, dir_okay=False))
+@click.option('--op', 'operation', type=click.Choice(SET_OPERATIONS), default='union',
+              help='union of all files, aliases in every file, or aliases of the first '
+                   'file missing from the others')
+@click.option('--output', '-o', help='Output file path (default: print to the terminal)')
+@click.option('--format', '-f', type=click.Choice(['text', 'json', 'csv']), default='text',
+              help='Output format')
+@click.option('--memory-mb', default=DEFAULT_MEMORY_MB, type=click.IntRange(min=1),
+              help='Approximate memory budget for sorting')
+@click.option('--jobs', '-j', default=1, type=click.IntRange(min=1),
+              help='Worker processes for sorting chunks')
+@click.option('--tmp-dir', type=click.Path(file_okay=False),
+              help='Directory for temporary sort runs')
+def merge(files, operation, output, format, memory_mb, jobs, tmp_dir):
+    """Dedupe, merge or diff exported alias files (text, CSV or JSON) of
+    any size. Files are sorted externally in bounded memory and written
+    in sorted order."""
+    aliases = merge_alias_files(files, operation, memory_mb, jobs, tmp_dir)
+    try:
         if output:
-            save_to_file(aliases, output, format)
-            click.echo(f"✓ Generated {len(aliases)} aliases and saved to {output}")
+            written = save_to_file(aliases, output, format)
+            click.echo(f"✓ Wrote {written} aliases to {output}")
         else:
-            display_aliases(aliases, format)
+            for alias in aliases:
+                click.echo(alias)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+    finally:
+        aliases.close()
+
+
+def parse_mix(text):
+    """Parse a strategy mix such as 'plus=0.8,dots=0.2'."""
+    mix = {}
+    for item in text.split(','):
+        name, sep, weight = item.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid mix entry '{item}', expected name=weight")
+        try:
+            mix[name.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight for '{name.strip()}': {weight}")
+    check_mix(mix)
+    return mix
 
 
 def display_aliases(aliases, format):
-    """Display aliases in the specified format."""
+    """Display aliases in the specified format; ``aliases`` may be any iterable."""
     if format == 'json':
-        click.echo(json.dumps(aliases, indent=2))
+        click.echo(json.dumps(list(aliases), indent=2))
     elif format == 'csv':
         click.echo("email")
         for alias in aliases:
             click.echo(alias)
     else:  # text
         click.echo("\n📧 Generated Email Aliases:\n")
-        for i, alias in enumerate(aliases, 1):
-            click.echo(f"  {i}. {alias}")
-        click.echo(f"\n✓ Total: {len(aliases)} aliases")
+        total = 0
+        for total, alias in enumerate(aliases, 1):
+            click.echo(f"  {total}. {alias}")
+        click.echo(f"\n✓ Total: {total} aliases")
 
 
-def save_to_file(aliases, filepath, format):
-    """Save aliases to a file in the specified format."""
+def save_to_file(aliases, filepath, format, base_email=None, shards=1):
+    """Save aliases to a file in the specified format.
+    
+    Map formats (postfix, postfix-sorted, dbm) and sqlite need the base
+    mailbox the aliases forward to. ``aliases`` may be any iterable; it is
+    streamed, not loaded. Returns the number of aliases saved.
+    """
     path = Path(filepath)
     
+    if (format in MAP_FORMATS or format in DATABASE_FORMATS) and not base_email:
+        raise ValueError(f"base_email is required for the {format} format")
+    
+    if format in MAP_FORMATS:
+        return write_alias_map(aliases, base_email, path, format, shards)
+    if format == 'sqlite':
+        return write_sqlite(aliases, base_email, path)
+    
+    count = 0
     if format == 'json':
+        # Same layout as json.dump(..., indent=2), written as we go
         with open(path, 'w') as f:
-            json.dump(aliases, f, indent=2)
+            for alias in aliases:
+                f.write(f"{',' if count else '['}\n  {json.dumps(alias)}")
+                count += 1
+            f.write("\n]" if count else "[]")
     elif format == 'csv':
         with open(path, 'w', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(['email'])
             for alias in aliases:
                 writer.writerow([alias])
+                count += 1
     else:  # text
         with open(path, 'w') as f:
             for alias in aliases:
                 f.write(f"{alias}\n")
+                count += 1
+    return count
 
 
 if __name__ == '__main__':
@@ -0,0 +1,127 @@
+"""
+Aho-Corasick blocklist for generated local parts
+"""
+
+from collections import deque
+
+
+BLOCKED = -1  # scan result when a blocked term occurs
+STEP_CACHE_SIZE = 1 << 20  # memoized (state, word) scans kept before a reset
+
+
+class Blocklist:
+    """Blocked substrings compiled once into an Aho-Corasick automaton.
+
+    ``scan`` checks a string in one pass, however many terms there are.
+    Scans can start from the state another scan ended in, so a local part
+    built from several words is checked piece by piece and terms spanning
+    a word boundary are still found. ``step`` memoizes (state, word) pairs,
+    so checking a pool word after a state seen before is a dict lookup.
+    Aliases are still checked after they are drawn; a rejected one is
+    redrawn.
+
+    Missing transitions are filled in lazily from the failure links, so the
+    automaton becomes a DFA over the characters actually scanned.
+    """
+
+    def __init__(self, terms):
+        self.terms = sorted({term.strip().lower() for term in terms if term.strip()})
+        # Transitions live in one dict keyed by (state << 21 | codepoint)
+        delta = {}
+        out = [False]
+        children = [[]]
+        for term in self.terms:
+            state = 0
+            for char in term:
+                key = state << 21 | ord(char)
+                nxt = delta.get(key)
+                if nxt is None:
+                    nxt = len(out)
+                    delta[key] = nxt
+                    out.append(False)
+                    children.append([])
+                    children[state].append((char, nxt))
+                state = nxt
+            out[state] = True
+
+        # Breadth-first failure links; a state is terminal if any suffix is
+        fail = [0] * len(out)
+        queue = deque(child for _, child in children[0])
+        while queue:
+            state = queue.popleft()
+            for char, child in children[state]:
+                queue.append(child)
+                f = fail[state]
+                while f and (f << 21 | ord(char)) not in delta:
+                    f = fail[f]
+                target = delta.get(f << 21 | ord(char), 0)
+                fail[child] = target if target != child else 0
+                out[child] = out[child] or out[fail[child]]
+
+        self._delta = delta
+        self._fail = fail
+        self._out = out
+        self._steps = {}
+
+    @classmethod
+    def from_file(cls, path):
+        """Load terms from a file: one per line, '#' starts a comment."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(line.split('#', 1)[0] for line in f)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _next(self, state, char):
+        key = state << 21 | ord(char)
+        nxt = self._delta.get(key)
+        if nxt is None:
+            nxt = 0 if state == 0 else self._next(self._fail[state], char)
+            self._delta[key] = nxt
+        return nxt
+
+    def scan(self, text, state=0):
+        """State after ``text`` starting from ``state``, or BLOCKED on a match."""
+        delta = self._delta
+        out = self._out
+        for char in text.lower():
+            nxt = delta.get(state << 21 | ord(char))
+            if nxt is None:
+                nxt = self._next(state, char)
+            if out[nxt]:
+                return BLOCKED
+            state = nxt
+        return state
+
+    def advance(self, text, state=0):
+        """State after ``text``, ignoring matches (for text already accepted)."""
+        for char in text.lower():
+            state = self._next(state, char)
+        return state
+
+    def contains(self, text):
+        """True if any blocked term occurs in ``text``."""
+        return self.scan(text) == BLOCKED
+
+    def step(self, state, word):
+        """Memoized ``scan`` for words that recur, such as pool words."""
+        key = (state, word)
+        steps = self._steps
+        result = steps.get(key)
+        if result is None:
+            if len(steps) >= STEP_CACHE_SIZE:
+                steps.clear()
+            result = steps[key] = self.scan(word, state)
+        return result
+
+    def allows(self, pieces, state=0):
+        """True if the concatenation of ``pieces`` has no blocked term.
+
+        Numbers rarely recur, so they are scanned without filling the cache.
+        """
+        step = self.step
+        for piece in pieces:
+            state = self.scan(piece, state) if piece.isdigit() else step(state, piece)
+            if state == BLOCKED:
+                return False
+        return True
@@ -0,0 +1,91 @@
+"""
+Time budgets, partial results and continuation tokens for generation
+"""
+
+import base64
+import json
+import time
+
+
+CHECK_SECONDS = 0.001  # aim to read the clock about once a millisecond
+FIRST_CHECK = 8  # calls before the first read, so every run makes some progress
+MAX_STRIDE = 1024
+
+
+class Deadline:
+    """A time budget in milliseconds, checked against the monotonic clock.
+
+    Loops call ``expired()`` on every attempt. The clock is only read every
+    ``stride`` calls, and the stride adapts so reads land about
+    ``CHECK_SECONDS`` apart however long an attempt takes: cheap attempts
+    are checked in batches, slow ones one by one. The first read comes
+    after ``FIRST_CHECK`` calls, so a resume whose setup used up a tiny
+    budget still moves its run forward. A fixed ``stride`` turns the
+    adaptation off. ``hit`` records that the budget ran out.
+    """
+
+    __slots__ = ('expires_at', 'stride', 'hit', '_calls', '_adaptive', '_last')
+
+    def __init__(self, ms, stride=None):
+        self._last = time.monotonic()
+        self.expires_at = self._last + ms / 1000.0
+        self._adaptive = stride is None
+        self.stride = FIRST_CHECK if stride is None else stride
+        self.hit = False
+        self._calls = 0
+
+    @classmethod
+    def from_ms(cls, ms, stride=None):
+        """A Deadline for ``ms`` milliseconds, or None for no limit."""
+        return None if ms is None else cls(ms, stride)
+
+    def expired(self):
+        self._calls += 1
+        if self._calls < self.stride:
+            return self.hit
+        self._calls = 0
+        now = time.monotonic()
+        if now >= self.expires_at:
+            self.hit = True
+        elif self._adaptive:
+            # Scale the stride so the next read comes CHECK_SECONDS later
+            elapsed = now - self._last
+            stride = self.stride * CHECK_SECONDS / elapsed if elapsed > 0 else MAX_STRIDE
+            self.stride = max(1, min(int(stride), MAX_STRIDE, self.stride * 2))
+        self._last = now
+        return self.hit
+
+    def remaining_ms(self):
+        return max(0.0, (self.expires_at - time.monotonic()) * 1000.0)
+
+
+class GenerationResult(list):
+    """A list of aliases that also says whether generation was cut short.
+
+    ``partial`` is True when the deadline stopped generation before the
+    requested count was reached; ``continuation`` is then an opaque token
+    that resumes the same run where it stopped.
+    """
+
+    def __init__(self, aliases=(), partial=False, continuation=None):
+        super().__init__(aliases)
+        self.partial = partial
+        self.continuation = continuation
+
+
+def encode_token(state):
+    """Serialize generator state into an opaque, URL-safe token."""
+    raw = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_token(token):
+    """Inverse of ``encode_token``; raises ValueError for malformed tokens."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid continuation token") from None
+    if not isinstance(state, dict) or 'op' not in state:
+        raise ValueError("Invalid continuation token")
+    return state
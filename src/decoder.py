@@ -0,0 +1,170 @@
+"""
+Decode generated aliases back into their strategy, words and number
+"""
+
+from collections import namedtuple
+
+try:
+    from .engine import CREATIVE_TEMPLATES, RANDOM_TEMPLATES
+except ImportError:  # running as a script from src/
+    from engine import CREATIVE_TEMPLATES, RANDOM_TEMPLATES
+
+
+POOL_BITS = {'adjectives': 1, 'nouns': 2, 'verbs': 4}
+PART_NAMES = {'adjectives': 'adjective', 'nouns': 'noun', 'verbs': 'verb',
+              '_': 'underscore', '.': 'dot'}
+
+Parse = namedtuple('Parse', ['strategy', 'template', 'words', 'number'])
+
+
+def template_name(template):
+    """Readable strategy name, e.g. 'adjective-noun-number'."""
+    return '-'.join('number' if isinstance(part, tuple) else PART_NAMES[part]
+                    for part in template)
+
+
+def _unique_templates():
+    seen = set()
+    templates = []
+    for template in CREATIVE_TEMPLATES + RANDOM_TEMPLATES:
+        if template not in seen:
+            seen.add(template)
+            templates.append(template)
+    return tuple(templates)
+
+
+TEMPLATES = _unique_templates()
+TEMPLATE_NAMES = tuple(template_name(template) for template in TEMPLATES)
+
+
+class AliasDecoder:
+    """Parses creative and plus alias local parts with a shared word trie.
+
+    The trie is built once over the adjective, noun and verb lists and
+    every node records which pools end a word there. Decoding walks the
+    local part against each template, following the trie at word slots,
+    so the cost is linear in the local part (times the longest word).
+    """
+
+    END = ''  # trie key marking the pools that end a word at this node
+
+    def __init__(self, adjectives, nouns, verbs):
+        self.pools = {'adjectives': tuple(adjectives), 'nouns': tuple(nouns), 'verbs': tuple(verbs)}
+        self.index = {name: {word: i for i, word in enumerate(words)}
+                      for name, words in self.pools.items()}
+        self.root = {}
+        for name, words in self.pools.items():
+            bit = POOL_BITS[name]
+            for word in words:
+                node = self.root
+                for char in word:
+                    node = node.setdefault(char, {})
+                node[self.END] = node.get(self.END, 0) | bit
+
+    def _word_ends(self, text, start):
+        """(end, pool bits) for every word starting at ``start``."""
+        ends = []
+        node = self.root
+        end_key = self.END
+        for pos in range(start, len(text)):
+            node = node.get(text[pos])
+            if node is None:
+                break
+            bits = node.get(end_key)
+            if bits:
+                ends.append((pos + 1, bits))
+        return ends
+
+    def _match(self, text, template, ends):
+        """All ways ``text`` matches ``template``, as (words, number) pairs.
+
+        ``ends`` caches trie walks per start position across templates.
+        """
+        results = []
+        stack = [(0, 0, ())]
+        while stack:
+            part_index, pos, words = stack.pop()
+            if part_index == len(template):
+                if pos == len(text):
+                    results.append((words, None))
+                continue
+            part = template[part_index]
+            if isinstance(part, tuple):
+                # Numbers only ever close a template
+                digits = text[pos:]
+                if digits.isdigit() and str(int(digits)) == digits and part[0] <= int(digits) <= part[1]:
+                    results.append((words, int(digits)))
+            elif part in POOL_BITS:
+                word_ends = ends.get(pos)
+                if word_ends is None:
+                    word_ends = ends[pos] = self._word_ends(text, pos)
+                bit = POOL_BITS[part]
+                for end, bits in word_ends:
+                    if bits & bit:
+                        stack.append((part_index + 1, end, words + (text[pos:end],)))
+            elif text.startswith(part, pos):
+                stack.append((part_index + 1, pos + len(part), words))
+        return results
+
+    def decode_local(self, local):
+        """Every (strategy, template, words, number) parse of a local part."""
+        local = local.lower()
+        if '+' in local:
+            tag = local.partition('+')[2]
+            word = tag.rstrip('0123456789')
+            number = tag[len(word):]
+            return [Parse('plus', None, (word,), int(number) if number else None)]
+
+        parses = []
+        seen = set()
+        ends = {}
+        for template_id, (template, name) in enumerate(zip(TEMPLATES, TEMPLATE_NAMES)):
+            for words, number in self._match(local, template, ends):
+                key = (name, words, number)
+                if key not in seen:
+                    seen.add(key)
+                    parses.append(Parse(name, template_id, words, number))
+        return parses
+
+    def decode(self, alias):
+        """Parses of an alias's local part; empty if nothing matches."""
+        return self.decode_local(alias.split('@', 1)[0])
+
+    def is_ambiguous(self, alias):
+        """True if the alias parses in more than one way."""
+        return len(self.decode(alias)) > 1
+
+    def compact(self, parse):
+        """Compact integer form: (template id, word indexes..., number)."""
+        if parse.template is None:
+            raise ValueError("Only template-based parses have a compact form")
+        template = TEMPLATES[parse.template]
+        pools = [part for part in template if part in POOL_BITS]
+        indexes = tuple(self.index[pool][word] for pool, word in zip(pools, parse.words))
+        return (parse.template, *indexes, parse.number if parse.number is not None else -1)
+
+    def expand(self, compact):
+        """Rebuild the local part from ``compact``'s output."""
+        template = TEMPLATES[compact[0]]
+        indexes = iter(compact[1:-1])
+        out = []
+        for part in template:
+            if isinstance(part, tuple):
+                out.append(str(compact[-1]))
+            elif part in POOL_BITS:
+                out.append(self.pools[part][next(indexes)])
+            else:
+                out.append(part)
+        return ''.join(out)
+
+    def decode_lines(self, lines):
+        """Decode aliases in bulk from an iterable of lines.
+
+        Blank lines and a CSV ``email`` header are skipped. Yields
+        (alias, parses) pairs.
+        """
+        for line in lines:
+            alias = line.strip().strip('",')
+            if not alias or alias == 'email' or '@' not in alias:
+                continue
+            yield alias, self.decode(alias)
@@ -0,0 +1,326 @@
+"""
+Edit-distance spacing between issued aliases
+"""
+
+import threading
+
+
+def levenshtein(a, b, cap=None):
+    """Levenshtein distance, using Myers' bit-parallel algorithm.
+
+    The common prefix and suffix are stripped first (aliases of a mailbox
+    share the username and domain), then each column of the DP table is
+    held as bit vectors in a Python int, so the cost is a handful of
+    integer operations per remaining character of ``a``. With ``cap`` the
+    scan stops as soon as the distance must exceed it and returns cap + 1.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    n = len(a)
+    if cap is not None and n - len(b) > cap:
+        return cap + 1
+    start = 0
+    end = len(b)
+    while start < end and a[start] == b[start]:
+        start += 1
+    shift = n - len(b)
+    while end > start and a[end + shift - 1] == b[end - 1]:
+        end -= 1
+    a = a[start:end + shift]
+    b = b[start:end]
+    m = len(b)
+    if m == 0:
+        return len(a)
+    peq = {}
+    for i, char in enumerate(b):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv = full
+    mv = 0
+    score = m
+    # The score can drop by at most one per remaining character
+    give_up = None if cap is None else cap + len(a)
+    for char in a:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv
+        if give_up is not None:
+            give_up -= 1
+            if score > give_up:
+                return cap + 1
+    return score
+
+
+def _within_one(a, b):
+    """True if ``a`` and ``b`` are at most one edit apart."""
+    if a == b:
+        return True
+    if len(a) < len(b):
+        a, b = b, a
+    if len(a) - len(b) > 1:
+        return False
+    i = 0
+    while i < len(b) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]  # one substitution
+    return a[i + 1:] == b[i:]  # one deletion from the longer string
+
+
+def _deletions(text):
+    return {text[:i] + text[i + 1:] for i in range(len(text))}
+
+
+class _DeletionIndex:
+    """Finds strings within one edit through shared single-deletion keys.
+
+    Two strings one edit apart always share a key among themselves and
+    their one-character deletions, so a query is a handful of dict lookups
+    plus a check of the few candidates they return.
+    """
+
+    def __init__(self):
+        self._keys = {}
+
+    def add(self, text):
+        keys = self._keys
+        for key in _deletions(text) | {text}:
+            bucket = keys.get(key)
+            if bucket is None:
+                keys[key] = text  # most keys hold a single string
+            elif bucket.__class__ is str:
+                keys[key] = [bucket, text]
+            else:
+                bucket.append(text)
+
+    def near(self, text, radius=1):
+        keys = self._keys
+        if radius == 0:
+            bucket = keys.get(text)
+            return bucket is not None and (bucket == text if bucket.__class__ is str
+                                           else text in bucket)
+        for key in _deletions(text) | {text}:
+            bucket = keys.get(key)
+            if bucket is None:
+                continue
+            for other in ((bucket,) if bucket.__class__ is str else bucket):
+                if _within_one(text, other):
+                    return True
+        return False
+
+
+class _PartitionIndex:
+    """Finds strings within ``radius`` edits by the pigeonhole principle.
+
+    Each indexed string is cut into p segments, 2r + 1 where that leaves
+    them ``WIDTH`` characters or more, but never fewer than r + 1. ``radius``
+    edits touch at most r of them, so a string within the radius shares at
+    least p - r segments with the query, each shifted by at most r positions
+    (and more of them, shifted less, for a query with a smaller radius). A query
+    counts segment hits through a dict lookup per (segment, shift) and only
+    verifies strings with enough hits. Segments shared by very many strings
+    (a common prefix, say) are not counted but assumed to hit, which keeps
+    queries cheap without ever missing a neighbour.
+    """
+
+    COMMON = 256  # segment lists longer than this are assumed to hit
+    WIDTH = 4  # shortest segment worth cutting; short strings get fewer pieces
+
+    def __init__(self, radius):
+        self.radius = radius
+        self._segments = {}  # (length, piece, text) -> strings
+        self._by_length = {}  # length -> strings, for the rare fallback
+        self._bounds = {}
+
+    def _cuts(self, length):
+        cuts = self._bounds.get(length)
+        if cuts is None:
+            radius = self.radius
+            pieces = max(radius + 1, min(2 * radius + 1, length // self.WIDTH))
+            size, extra = divmod(length, pieces)
+            cuts = []
+            start = 0
+            for i in range(pieces):
+                end = start + size + (i >= pieces - extra)
+                cuts.append((start, end))
+                start = end
+            cuts = self._bounds[length] = tuple(cuts)
+        return cuts
+
+    def add(self, text):
+        length = len(text)
+        self._by_length.setdefault(length, []).append(text)
+        if length <= self.radius:
+            return  # too short to cut; found through the length fallback
+        segments = self._segments
+        for i, (start, end) in enumerate(self._cuts(length)):
+            segments.setdefault((length, i, text[start:end]), []).append(text)
+
+    def near(self, text, radius=None):
+        """True if an indexed string is within ``radius`` (default: the index's) of ``text``."""
+        radius = self.radius if radius is None else radius
+        size = len(text)
+        # Neighbours of the same length are the likeliest, so look there first
+        for length in sorted(range(max(0, size - radius), size + radius + 1),
+                             key=lambda n: abs(n - size)):
+            if length not in self._by_length:
+                continue
+            if length <= self.radius:
+                candidates = self._by_length[length]
+            else:
+                candidates = self._candidates(text, length, radius)
+            for other in candidates:
+                if levenshtein(text, other, radius) <= radius:
+                    return True
+        return False
+
+    def _candidates(self, text, length, radius):
+        """Strings of ``length`` that may be within ``radius``, most segment hits first."""
+        # Within ``radius`` edits, at most ``radius`` segments are touched
+        size = len(text)
+        segments = self._segments
+        counts = {}
+        common = []
+        cuts = self._cuts(length)
+        for i, (start, end) in enumerate(cuts):
+            width = end - start
+            hits = []
+            total = 0
+            for pos in range(max(0, start - radius), min(start + radius, size - width) + 1):
+                strings = segments.get((length, i, text[pos:pos + width]))
+                if strings is not None:
+                    hits.append(strings)
+                    total += len(strings)
+            if total > self.COMMON:
+                common.append((total, hits))
+                continue
+            for other in (hits[0] if len(hits) == 1 else set().union(*hits)):
+                counts[other] = counts.get(other, 0) + 1
+        needed = len(cuts) - radius - len(common)
+        if needed > 0:
+            candidates = [other for other, count in counts.items() if count >= needed]
+        else:
+            # At least radius + 1 segments are common. A neighbour misses at
+            # most ``radius`` segments, so it hits one of any radius + 1 of
+            # them: the cheapest common ones give the candidates, and counting
+            # them too tightens the hits a neighbour needs.
+            common.sort(key=lambda item: item[0])
+            members = set()
+            for _, hits in common[:radius + 1]:
+                hit = set().union(*hits)
+                members |= hit
+                for other in hit:
+                    counts[other] = counts.get(other, 0) + 1
+            needed = max(1, needed + radius + 1)
+            candidates = [other for other in members if counts[other] >= needed]
+        candidates.sort(key=counts.__getitem__, reverse=True)
+        return candidates
+
+
+class SpacingIndex:
+    """Set of aliases kept at least ``min_distance`` edits apart.
+
+    Aliases are compared case-insensitively, by local part within each
+    domain (a mistyped domain does not reach the mailbox anyway). Local
+    parts are grouped by stem, the text up to their first ``+``, and only
+    the rest is indexed: plus aliases of one mailbox all share a
+    ``username+`` stem, and indexing it would make every alias look alike.
+    ``min_distance=2`` (no two aliases one typo apart) uses a
+    deletion-neighbourhood index, larger distances a segment partition
+    index. Either way a candidate is checked against a few look-alikes
+    rather than every alias already issued.
+
+    The index is safe to share between threads: each call holds an
+    internal lock for just that check or insert.
+    """
+
+    def __init__(self, min_distance, aliases=()):
+        if min_distance < 1:
+            raise ValueError("min_distance must be at least 1")
+        self.min_distance = min_distance
+        self.radius = min_distance - 1
+        self._exact = set()
+        self._domains = {}
+        self._lock = threading.Lock()
+        for alias in aliases:
+            self._add(alias.lower())
+
+    def __len__(self):
+        return len(self._exact)
+
+    def __contains__(self, alias):
+        return alias.lower() in self._exact
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._exact))
+
+    def _index(self, domain, stem):
+        stems = self._domains.get(domain)
+        if stems is None:
+            stems = self._domains[domain] = {}
+        index = stems.get(stem)
+        if index is None:
+            index = stems[stem] = (_DeletionIndex() if self.radius == 1
+                                   else _PartitionIndex(self.radius))
+        return index
+
+    def conflicts(self, alias):
+        """True if ``alias`` is closer than ``min_distance`` to an indexed alias."""
+        with self._lock:
+            return self._conflicts(alias.lower())
+
+    def add(self, alias):
+        """Index ``alias`` whether or not it conflicts (e.g. an existing alias)."""
+        with self._lock:
+            self._add(alias.lower())
+
+    def admit(self, alias):
+        """Index ``alias`` and return True, unless it conflicts."""
+        alias = alias.lower()
+        with self._lock:
+            if self._conflicts(alias):
+                return False
+            self._add(alias)
+            return True
+
+    def _conflicts(self, alias):
+        if alias in self._exact:
+            return True
+        if self.radius == 0:
+            return False  # distance 1 only rules out exact repeats
+        local, _, domain = alias.rpartition('@')
+        radius = self.radius
+        for stem, index in self._domains.get(domain, {}).items():
+            if local.startswith(stem):
+                # A shared prefix does not change the distance
+                if index.near(local[len(stem):], radius):
+                    return True
+                continue
+            # Split ``local`` where the stem would end: the distance to
+            # stem + rest is the best d(local[:k], stem) + d(local[k:], rest)
+            n = len(stem)
+            for k in range(max(0, n - radius), min(len(local), n + radius) + 1):
+                spent = levenshtein(local[:k], stem, radius)
+                if spent <= radius and index.near(local[k:], radius - spent):
+                    return True
+        return False
+
+    def _add(self, alias):
+        if alias not in self._exact:
+            self._exact.add(alias)
+            if self.radius:
+                local, _, domain = alias.rpartition('@')
+                stem = local[:local.find('+') + 1]
+                self._index(domain, stem).add(local[len(stem):])
@@ -0,0 +1,171 @@
+"""
+Generating local parts once and fanning them out across several domains
+"""
+
+from functools import lru_cache
+from itertools import islice
+
+try:
+    from .engine import GMAIL_DOMAINS, split_email
+except ImportError:  # running as a script from src/
+    from engine import GMAIL_DOMAINS, split_email
+
+
+STRATEGIES = ('mixed', 'plus', 'dots', 'variations', 'creative', 'random')
+DEFAULT_SEPARATORS = '._-'
+MAX_ATTEMPTS = 20  # draws per wanted local part before creative/random give up
+
+
+class DomainRules:
+    """What a domain's mail server accepts in the local part.
+
+    ``dots``: dots are ignored, so dot variations reach the mailbox (Gmail
+    by default); ``plus``: ``name+tag`` is delivered to ``name``;
+    ``separators``: the non-alphanumeric characters a local part may hold.
+    """
+
+    __slots__ = ('domain', 'dots', 'plus', 'separators')
+
+    def __init__(self, domain, dots=None, plus=True, separators=DEFAULT_SEPARATORS):
+        self.domain = domain.lower()
+        self.dots = self.domain in GMAIL_DOMAINS if dots is None else dots
+        self.plus = plus
+        self.separators = frozenset(separators)
+
+    def accepts(self, kind, chars):
+        """True if a local part of ``kind`` using ``chars`` (its separators) works here."""
+        if kind == 'plus':
+            return self.plus and chars - {'+'} <= self.separators
+        if kind == 'dots' and not self.dots:
+            return False
+        return chars <= self.separators
+
+
+@lru_cache(maxsize=4096)
+def domain_rules(domain):
+    """Default rules for a domain, built once per domain."""
+    return DomainRules(domain)
+
+
+class DomainFanout:
+    """Routes each local part to the domains that accept it.
+
+    Local parts are grouped by kind and by the separators they use; the
+    tuple of ``@domain`` suffixes for each group is worked out once and
+    cached, so formatting an alias for N domains is N string joins. With
+    ``unique`` each local part goes to a single domain instead, taking
+    turns among the domains that accept it, so no local part repeats
+    across the whole batch.
+    """
+
+    def __init__(self, domains, rules=None, unique=False):
+        rules = rules or {}
+        self.rules = tuple(rules.get(domain) or domain_rules(domain)
+                           for domain in dict.fromkeys(d.lower() for d in domains))
+        if not self.rules:
+            raise ValueError("At least one domain is needed")
+        self.unique = unique
+        self._routes = {}
+        self._turn = 0
+
+    @property
+    def plus(self):
+        return any(rules.plus for rules in self.rules)
+
+    @property
+    def dots(self):
+        return any(rules.dots for rules in self.rules)
+
+    def targets(self, local, kind):
+        """``@domain`` suffixes for a local part of ``kind`` (plus, dots or plain)."""
+        key = (kind, frozenset(c for c in local if not c.isalnum()))
+        route = self._routes.get(key)
+        if route is None:
+            route = self._routes[key] = tuple(
+                '@' + rules.domain for rules in self.rules if rules.accepts(*key))
+        return route
+
+    def addresses(self, local, kind):
+        """Every address ``local`` is issued as; empty if no domain accepts it."""
+        route = self.targets(local, kind)
+        if not route:
+            return ()
+        if self.unique:
+            turn = self._turn
+            self._turn = turn + 1
+            return (local + route[turn % len(route)],)
+        return [local + suffix for suffix in route]
+
+
+def _mailbox_mix(fanout, strategy, mix):
+    """The mix a mailbox strategy runs with, given what the domains accept."""
+    if strategy == 'plus' or (strategy == 'mixed' and not fanout.dots):
+        mix = {'plus': 1.0}
+    elif strategy == 'dots' or (strategy == 'mixed' and not fanout.plus):
+        mix = {'dots': 1.0}
+    weights = {'plus': 0.0, 'dots': 0.0} if mix else {'plus': 1.0, 'dots': 1.0}
+    for name, weight in (mix or {}).items():
+        weights['dots' if name == 'gmail_dots' else name] = weight
+    if weights['plus'] and not fanout.plus:
+        raise ValueError("None of the domains accepts plus addresses")
+    if weights['dots'] and not fanout.dots:
+        raise ValueError("None of the domains ignores dots, so dot variations would not deliver")
+    return mix
+
+
+def _local_parts(engine, fanout, username, count, strategy, mix, lengths):
+    """(local part, kind) pairs, each local part generated once."""
+    if strategy in ('creative', 'random'):
+        seen = set()
+        for _ in range(count * MAX_ATTEMPTS):
+            if len(seen) >= count:
+                return
+            local = engine.template_local(strategy, **lengths)
+            if local not in seen:
+                seen.add(local)
+                yield local, 'plain'
+        return
+
+    # Mailbox strategies run on one stand-in address; Gmail's when any
+    # domain ignores dots, since the engine only makes dot variations there
+    domain = GMAIL_DOMAINS[0] if fanout.dots else fanout.rules[0].domain
+    mailbox = f"{username}@{domain}"
+    cut = -len(domain) - 1
+    if strategy == 'variations':
+        for alias in islice(engine.iter_variations(mailbox, **lengths), count):
+            yield alias[:cut], 'plain'
+        return
+    for alias in engine.iter_mixed(mailbox, count, mix, **lengths):
+        local = alias[:cut]
+        yield local, 'plus' if '+' in local else 'dots'
+
+
+def iter_across_domains(engine, base, domains, count, strategy='mixed', mix=None,
+                        min_length=None, max_length=None, unique=False, rules=None):
+    """Lazily yield aliases for ``count`` local parts across ``domains``.
+
+    ``base`` is the mailbox's username or full address (its own domain is
+    not added; list it in ``domains`` if wanted). Each local part is
+    generated once and issued on every domain whose ``DomainRules`` accept
+    it: plus addresses only where plus addressing works, dot variations
+    only where dots are ignored. ``rules`` maps domains to custom
+    ``DomainRules``; others use ``domain_rules``. With ``unique`` each local
+    part is issued on one domain only. Local parts no domain accepts are
+    skipped, so a batch can come up short.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+    username = split_email(base)[0] if '@' in base else base
+    if not username:
+        raise ValueError(f"Invalid mailbox: {base}")
+    fanout = DomainFanout(domains, rules, unique)
+    lengths = {'min_length': min_length, 'max_length': max_length}
+    if strategy in ('mixed', 'plus', 'dots'):
+        mix = _mailbox_mix(fanout, strategy, mix)
+    return _fan_out(fanout, _local_parts(engine, fanout, username, count, strategy, mix, lengths))
+
+
+def _fan_out(fanout, local_parts):
+    addresses = fanout.addresses
+    for local, kind in local_parts:
+        yield from addresses(local, kind)
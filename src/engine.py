@@ -0,0 +1,1041 @@
+"""
+Reusable alias engine with precomputed, shareable state
+"""
+
+import random
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+try:
+    from .blocklist import BLOCKED
+    from .deadline import Deadline, GenerationResult, decode_token, encode_token
+    from .distance import SpacingIndex
+    from .lengths import (LayeredBuckets, LengthBuckets, Literal, NumberRange, TemplateLengths,
+                          length_window)
+    from .sampling import LayeredSequence, WeightedChoice, make_chooser
+    from .secure import SecureRandom
+    from .tags import TagPool
+    from .variations import VariationStream, build_variation_spaces
+except ImportError:  # running as a script from src/
+    from blocklist import BLOCKED
+    from deadline import Deadline, GenerationResult, decode_token, encode_token
+    from distance import SpacingIndex
+    from lengths import (LayeredBuckets, LengthBuckets, Literal, NumberRange, TemplateLengths,
+                         length_window)
+    from sampling import LayeredSequence, WeightedChoice, make_chooser
+    from secure import SecureRandom
+    from tags import TagPool
+    from variations import VariationStream, build_variation_spaces
+
+
+GMAIL_DOMAINS = ('gmail.com', 'googlemail.com')
+
+# Default plus words used when no custom words are provided
+DEFAULT_PLUS_WORDS = (
+    'shopping', 'newsletter', 'social', 'work', 'personal',
+    'updates', 'notifications', 'promo', 'info', 'contact',
+    'register', 'signup', 'temp', 'test', 'backup'
+)
+
+# Traditional plus words for mixed generation (practical and recognizable)
+TRADITIONAL_PLUS_WORDS = (
+    'shopping', 'newsletter', 'social', 'work', 'personal', 'updates', 'notifications',
+    'promo', 'info', 'contact', 'register', 'signup', 'temp', 'test', 'backup',
+    'bills', 'banking', 'travel', 'deals', 'offers', 'spam', 'junk', 'friends',
+    'family', 'business', 'freelance', 'projects', 'orders', 'receipts'
+)
+
+# Creative alias templates. Each part is a word pool name, a literal
+# separator or an inclusive (low, high) number range.
+CREATIVE_TEMPLATES = (
+    ('adjectives', 'nouns', (1, 999)),
+    ('verbs', 'nouns', (1, 99)),
+    ('adjectives', 'verbs', (10, 999)),
+    ('verbs', 'adjectives', 'nouns'),
+    ('adjectives', '_', 'nouns'),
+    ('verbs', '_', 'nouns', (1, 99)),
+    ('adjectives', '.', 'verbs', (10, 99)),
+    ('nouns', 'verbs', (2020, 2025)),
+    ('verbs', '.', 'adjectives', '.', 'nouns'),
+    ('verbs', 'adjectives', (1, 999)),
+    ('nouns', 'verbs', (1, 99)),
+    ('adjectives', 'nouns', 'verbs'),
+)
+
+# Templates used by the backward compatible random alias generator
+RANDOM_TEMPLATES = (
+    ('adjectives', 'nouns', (1, 999)),
+    ('adjectives', '_', 'nouns'),
+    ('adjectives', '.', 'nouns', (10, 99)),
+    ('nouns', 'adjectives', (1, 999)),
+    ('nouns', (2020, 2025)),
+)
+
+# Mixed generation: share of Gmail dot variations vs plus addresses
+MIXED_STRATEGIES = {'gmail_dots': 0.4, 'plus': 0.6}
+
+# Redraws allowed before giving up on a blocklist that rejects everything
+MAX_BLOCKED_DRAWS = 1000
+
+
+def check_mix(mix):
+    """Validate a strategy mix; returns it with ``dots`` spelled ``gmail_dots``.
+
+    Raises ValueError for unknown strategies, negative or non-numeric
+    weights, or weights that add up to nothing.
+    """
+    if not isinstance(mix, dict):
+        raise ValueError("A strategy mix maps strategy names to weights")
+    mix = dict(mix)
+    if 'dots' in mix:
+        mix['gmail_dots'] = mix.pop('dots')
+    unknown = set(mix) - set(MIXED_STRATEGIES)
+    if unknown:
+        raise ValueError(f"Unknown strategies in mix: {', '.join(sorted(unknown))} "
+                         "(expected plus, dots)")
+    for name, weight in mix.items():
+        numeric = isinstance(weight, (int, float)) and not isinstance(weight, bool)
+        if not numeric or not 0 <= weight < float('inf'):
+            raise ValueError(f"Weight for '{name}' must be a non-negative number")
+    if not sum(mix.values()) > 0:
+        raise ValueError("At least one strategy in the mix needs a positive weight")
+    return mix
+
+
+def split_email(email):
+    """Split an email address into (username, domain), or None if invalid."""
+    if '@' not in email:
+        return None
+    username, domain = email.split('@', 1)
+    return username, domain
+
+
+def classify_alias(base_email, alias):
+    """Name the strategy that produced an alias of ``base_email``."""
+    local = alias.split('@', 1)[0]
+    if '+' in local:
+        return 'plus'
+    username, domain = split_email(base_email)
+    if local.replace('.', '') == username.replace('.', ''):
+        return 'gmail_dots' if domain.lower() in GMAIL_DOMAINS else 'dots'
+    return 'variation'
+
+
+def count_dot_variations(clean_username, max_dots=3, min_dots=1):
+    """Count the dot placements reachable with min_dots..max_dots dots."""
+    gaps = len(clean_username) - 1
+    total = 0
+    ways = 1
+    for k in range(1, min(max_dots, gaps) + 1):
+        ways = ways * (gaps - k + 1) // k  # C(gaps, k)
+        if k >= min_dots:
+            total += ways
+    return total
+
+
+def dot_range(clean_username, window=None):
+    """(fewest, most) dots for a dot variation within a length window."""
+    n = len(clean_username)
+    low, high = 1, min(3, n - 1)
+    if window is not None:
+        low = max(low, window[0] - n)
+        high = min(high, window[1] - n)
+    return low, high
+
+
+def tag_window(username, window):
+    """Length window for plus tags that keeps ``username+tag`` within ``window``."""
+    if window is None:
+        return None
+    extra = len(username) + 1
+    return max(1, window[0] - extra), window[1] - extra
+
+
+class MailboxState:
+    """Parsed, per-mailbox state cached by the engine."""
+
+    __slots__ = ('email', 'username', 'domain', 'clean_username', 'is_gmail',
+                 'dot_space', 'dot_budget', 'used_tags', 'issued', 'variation_spaces',
+                 'spacing', 'lock')
+
+    def __init__(self, email):
+        username, domain = split_email(email)
+        self.email = email
+        self.username = username
+        self.domain = domain
+        self.clean_username = username.replace('.', '')
+        self.is_gmail = domain.lower() in GMAIL_DOMAINS
+        self.dot_space = count_dot_variations(self.clean_username)
+        # Keep the historical cap so mixed batches stay mostly plus addresses
+        self.dot_budget = min(self.dot_space, len(username) * 2)
+        self.used_tags = set()
+        self.issued = set()
+        self.variation_spaces = None  # built on first use
+        self.spacing = None  # SpacingIndex of issued aliases, with min_distance
+        self.lock = threading.Lock()  # guards used_tags and issued between runs
+
+
+class _Tables:
+    """Immutable tables derived from a set of word lists.
+
+    With ``base`` the word lists are layered on top of another table set:
+    pools the layer does not extend are shared with ``base`` as-is, and
+    extended pools are views over the base words plus the new ones. Words
+    containing a ``blocklist`` term are pruned before anything is built.
+    """
+
+    def __init__(self, adjectives, nouns, verbs, max_plus_word_length,
+                 word_weights=None, creative_weights=None, random_weights=None,
+                 base=None, blocklist=None):
+        self.word_weights = dict(word_weights or {})
+        own_weights = self.word_weights
+        if base is not None and base.word_weights:
+            self.word_weights = {**base.word_weights, **self.word_weights}
+
+        self.base = base
+        self.pools = {}
+        self._extra = {}  # pool name -> words layered over an unchanged base pool
+        for name, words in (('adjectives', adjectives), ('nouns', nouns), ('verbs', verbs)):
+            if blocklist is not None:
+                words = [w for w in words if not blocklist.contains(w)]
+            short = tuple(w for w in words if len(w) <= max_plus_word_length)
+            if base is None:
+                words = tuple(words)
+            else:
+                base_words = getattr(base, name)
+                known = set(base_words)
+                extra = tuple(w for w in dict.fromkeys(words) if w not in known)
+                short = tuple(w for w in short if w not in known)
+                base_short = getattr(base, f'short_{name}')
+                if not extra:
+                    # Nothing new: share the base tuples and sampler outright
+                    setattr(self, name, base_words)
+                    setattr(self, f'short_{name}', base_short)
+                    self.pools[name] = base.pools[name]
+                    continue
+                words = LayeredSequence(base_words, extra)
+                short = LayeredSequence(base_short, short) if short else base_short
+                if not any(w in known for w in own_weights):
+                    self._extra[name] = extra
+            setattr(self, name, words)
+            # Short words that make reasonable plus tags
+            setattr(self, f'short_{name}', short)
+            # One sampler per pool; weighted pools get an alias table
+            self.pools[name] = self.chooser(words)
+
+        self.decoder = None  # built on first use
+
+        # Templates with pool names resolved, skipping any that need an empty pool
+        self._resolved = {}
+        self.creative_templates = self._resolve('creative', CREATIVE_TEMPLATES, creative_weights)
+        self.random_templates = self._resolve('random', RANDOM_TEMPLATES, random_weights)
+        self._lengths = {}  # kind -> TemplateLengths per template, built on first use
+        self._buckets = {}  # pool name -> LengthBuckets, built on first use
+        self._fitting = {}
+        self._short_by_length = {}
+
+    def chooser(self, words):
+        """Sampler over words honouring the per-word frequency weights."""
+        weights = [self.word_weights.get(w, 1.0) for w in words] if self.word_weights else None
+        return make_chooser(words, weights)
+
+    def _resolve(self, kind, templates, weights=None):
+        if weights is None:
+            weights = [1.0] * len(templates)
+        elif len(weights) != len(templates):
+            raise ValueError(f"Expected {len(templates)} template weights, got {len(weights)}")
+
+        resolved = []
+        kept_weights = []
+        for template, weight in zip(templates, weights):
+            parts = []
+            for part in template:
+                if isinstance(part, tuple):
+                    parts.append(part)
+                elif part in self.pools:
+                    if not len(self.pools[part]):
+                        break
+                    parts.append(self.pools[part])
+                else:
+                    parts.append(part)
+            else:
+                if weight > 0:
+                    resolved.append(tuple(parts))
+                    kept_weights.append(weight)
+        self._resolved[kind] = (resolved, kept_weights)
+        if not resolved:
+            return None
+        return make_chooser(resolved, kept_weights)
+
+    def short_of_length(self, name, length):
+        """Short words of pool ``name`` that are exactly ``length`` long."""
+        short = getattr(self, f'short_{name}')
+        if self.base is not None and short is getattr(self.base, f'short_{name}'):
+            return self.base.short_of_length(name, length)
+        buckets = self._short_by_length.get(name)
+        if buckets is None:
+            buckets = {}
+            for word in short:
+                buckets.setdefault(len(word), []).append(word)
+            buckets = self._short_by_length[name] = {n: tuple(w) for n, w in buckets.items()}
+        return buckets.get(length, ())
+
+    def length_buckets(self, name):
+        """``LengthBuckets`` for pool ``name``, built on first use.
+
+        Pools shared with ``base`` reuse its buckets and extended pools
+        layer the new words over them, so a namespace never copies the
+        base vocabulary.
+        """
+        buckets = self._buckets.get(name)
+        if buckets is None:
+            pool = self.pools[name]
+            if self.base is not None and pool is self.base.pools[name]:
+                buckets = self.base.length_buckets(name)
+            elif name in self._extra:
+                extra = self._extra[name]
+                weights = [self.word_weights.get(w, 1.0) for w in extra] if self.word_weights else None
+                buckets = LayeredBuckets(self.base.length_buckets(name), extra, weights)
+            else:
+                buckets = LengthBuckets(pool.items, getattr(pool, 'weights', None))
+            self._buckets[name] = buckets
+        return buckets
+
+    def _template_lengths(self, kind):
+        models = self._lengths.get(kind)
+        if models is None:
+            names = {id(pool): name for name, pool in self.pools.items()}
+            # Templates drawing only from shared pools reuse the base models
+            inherited = {}
+            if self.base is not None:
+                inherited = dict(zip(self.base._resolved[kind][0],
+                                     self.base._template_lengths(kind)))
+            models = []
+            for template in self._resolved[kind][0]:
+                if template in inherited:
+                    models.append(inherited[template])
+                    continue
+                parts = []
+                for part in template:
+                    if part.__class__ is str:
+                        parts.append(Literal(part))
+                    elif part.__class__ is tuple:
+                        parts.append(NumberRange(*part))
+                    else:
+                        parts.append(self.length_buckets(names[id(part)]))
+                models.append(TemplateLengths(parts))
+            self._lengths[kind] = models
+        return models
+
+    def fitting(self, kind, window):
+        """Chooser over the ``kind`` templates that can fit a length window.
+
+        Each template is weighted by its usual weight times the chance its
+        aliases land in the window, so drawing from it and then within the
+        window matches unconstrained generation filtered to the window.
+        None if no template can fit.
+        """
+        key = (kind, window)
+        if key in self._fitting:
+            return self._fitting[key]
+        models = []
+        weights = []
+        for model, weight in zip(self._template_lengths(kind), self._resolved[kind][1]):
+            mass = model.mass(*window)
+            if mass > 0:
+                models.append(model)
+                weights.append(weight * mass)
+        chooser = make_chooser(models, weights) if models else None
+        if len(self._fitting) >= 256:
+            self._fitting.clear()
+        self._fitting[key] = chooser
+        return chooser
+
+
+class AliasEngine:
+    """Alias generator built once from word lists and reused across calls.
+
+    Word-list derived tables are precomputed at construction and parsed
+    mailbox state is kept in a bounded LRU cache. An engine can be shared
+    between threads. With ``secure=True`` every strategy draws from a
+    batched OS entropy source instead of the Mersenne Twister. A
+    ``blocklist`` keeps its terms out of every creative, random and plus
+    local part, including terms formed across word boundaries. With
+    ``min_distance`` every alias issued for a mailbox is at least that many
+    edits away from the others and from any aliases passed to ``reserve``.
+    """
+
+    def __init__(self, adjectives, nouns, verbs, plus_words=None,
+                 max_plus_word_length=8, cache_size=1024,
+                 remember_issued=False, rng=None, word_weights=None,
+                 strategy_mix=None, creative_weights=None, random_weights=None,
+                 secure=False, base=None, blocklist=None, min_distance=None):
+        self.plus_words = tuple(plus_words) if plus_words else DEFAULT_PLUS_WORDS
+        self.max_plus_word_length = max_plus_word_length
+        self.cache_size = cache_size
+        self.remember_issued = remember_issued
+        if rng is None:
+            rng = SecureRandom() if secure else random
+        self.rng = rng
+        self.secure = isinstance(rng, SecureRandom)
+        self.creative_weights = creative_weights
+        self.random_weights = random_weights
+        self.base = base  # engine whose word lists these extend, if any
+        self.blocklist = blocklist
+        self.min_distance = min_distance
+        self.reload(adjectives, nouns, verbs, word_weights)
+        self._mailboxes = OrderedDict()
+        self._spaced_mailboxes = {}  # mailboxes with a spacing index, never evicted
+        self._lock = threading.RLock()
+        self._mixes = {}
+        self.strategy_mix = self._mix_table(strategy_mix)
+
+    @property
+    def adjectives(self):
+        return self._tables.adjectives
+
+    @property
+    def nouns(self):
+        return self._tables.nouns
+
+    @property
+    def verbs(self):
+        return self._tables.verbs
+
+    def reload(self, adjectives, nouns, verbs, word_weights=None):
+        """Swap in new word lists.
+
+        The new tables are built before a single reference assignment
+        publishes them, so calls already running finish on the old tables
+        and nothing waits on the rebuild. For a layered engine these are
+        the words added on top of ``base``.
+        """
+        self._words = (adjectives, nouns, verbs, word_weights)
+        self._tables = _Tables(adjectives, nouns, verbs, self.max_plus_word_length,
+                               word_weights, self.creative_weights, self.random_weights,
+                               base=self.base._tables if self.base is not None else None,
+                               blocklist=self.blocklist)
+
+    def refresh(self):
+        """Rebuild a layered engine's tables after its base engine reloaded."""
+        self.reload(*self._words)
+
+    def set_blocklist(self, blocklist):
+        """Swap in a new ``Blocklist`` (or None) and re-prune the word pools."""
+        self.blocklist = blocklist
+        self.refresh()
+
+    def mailbox(self, base_email):
+        """Return cached state for a mailbox, or None if the address is invalid."""
+        if '@' not in base_email:
+            return None
+        with self._lock:
+            state = self._mailboxes.get(base_email)
+            if state is not None:
+                self._mailboxes.move_to_end(base_email)
+                return state
+            # Its spacing index is the only record of reserved and issued
+            # aliases, so a spaced mailbox outlives the LRU cache
+            state = self._spaced_mailboxes.get(base_email)
+            if state is None:
+                state = MailboxState(base_email)
+            self._mailboxes[base_email] = state
+            if len(self._mailboxes) > self.cache_size:
+                self._mailboxes.popitem(last=False)
+            return state
+
+    def clear_cache(self):
+        """Forget all cached mailbox state, spacing indexes included."""
+        with self._lock:
+            self._mailboxes.clear()
+            self._spaced_mailboxes.clear()
+
+    def _spacing(self, state, min_distance=None):
+        """The mailbox's spacing index for ``min_distance``, or None if unused."""
+        if min_distance is None:
+            min_distance = self.min_distance
+        if min_distance is None:
+            return None
+        with self._lock:
+            spacing = state.spacing
+            if spacing is None or spacing.min_distance != min_distance:
+                spacing = state.spacing = SpacingIndex(min_distance, spacing or ())
+                self._spaced_mailboxes[state.email] = state
+            return spacing
+
+    def _guard(self, state):
+        """Lock for one draw of a run that shares the mailbox's remembered aliases.
+
+        Runs hold it only while checking and recording a single alias, never
+        across a ``yield``, so an open iterator blocks no other call.
+        """
+        return state.lock if self.remember_issued else _NO_LOCK
+
+    def reserve(self, base_email, aliases, min_distance=None):
+        """Record aliases a mailbox already has, so new ones keep their distance."""
+        state = self.mailbox(base_email)
+        if state is None:
+            return
+        spacing = self._spacing(state, min_distance)
+        if spacing is None:
+            raise ValueError("reserve needs a min_distance, on the engine or in the call")
+        for alias in aliases:
+            spacing.add(alias)
+
+    def _mix_table(self, mix):
+        """Alias table for a strategy mix, built once per distinct mix."""
+        mix = check_mix(MIXED_STRATEGIES if mix is None else mix)
+        key = (mix.get('gmail_dots', 0.0), mix.get('plus', 0.0))
+        table = self._mixes.get(key)
+        if table is None:
+            table = WeightedChoice(('gmail_dots', 'plus'), key)
+            self._mixes[key] = table
+        return table
+
+    def _render(self, template):
+        """The pieces (words, separators, number) of one rendered template."""
+        rng = self.rng
+        out = []
+        for part in template:
+            if part.__class__ is str:
+                out.append(part)
+            elif part.__class__ is tuple:
+                out.append(str(rng.randint(part[0], part[1])))
+            else:
+                out.append(part.choice(rng))
+        return out
+
+    def _draw(self, templates, window=None):
+        """Render a random template, redrawing candidates the blocklist rejects.
+
+        With a length ``window`` the templates are ``TemplateLengths`` and
+        render straight into the window.
+        """
+        if templates is None:
+            raise ValueError("No template can be filled from the current word lists")
+        blocklist = self.blocklist
+        rng = self.rng
+        for _ in range(MAX_BLOCKED_DRAWS):
+            template = templates.choice(rng)
+            pieces = self._render(template) if window is None else template.render(rng, *window)
+            if blocklist is None or blocklist.allows(pieces):
+                return ''.join(pieces)
+        raise ValueError("The blocklist rejects nearly every alias these word lists can form")
+
+    def decoder(self):
+        """Alias decoder over the current word lists, built on first use."""
+        tables = self._tables
+        if tables.decoder is None:
+            try:
+                from .decoder import AliasDecoder
+            except ImportError:  # running as a script from src/
+                from decoder import AliasDecoder
+            tables.decoder = AliasDecoder(tables.adjectives, tables.nouns, tables.verbs)
+        return tables.decoder
+
+    def _from_templates(self, kind, unambiguous, window=None, max_attempts=20):
+        tables = self._tables
+        if window is None:
+            templates = getattr(tables, f'{kind}_templates')
+        else:
+            templates = tables.fitting(kind, window)
+            if templates is None:
+                raise ValueError(f"No {kind} alias can be {window[0]}-{window[1]} characters long")
+        local = self._draw(templates, window)
+        if unambiguous:
+            decoder = self.decoder()
+            for _ in range(max_attempts):
+                if len(decoder.decode_local(local)) <= 1:
+                    break
+                local = self._draw(templates, window)
+        return local
+
+    def creative_alias(self, domain='gmail.com', unambiguous=False, min_length=None,
+                       max_length=None):
+        """Generate a creative alias using adjectives, nouns and verbs.
+
+        With ``unambiguous=True`` aliases that decode more than one way
+        are redrawn. ``min_length`` and ``max_length`` bound the local
+        part; it is drawn directly at a fitting length, not by retrying.
+        """
+        window = length_window(min_length, max_length)
+        return f"{self._from_templates('creative', unambiguous, window)}@{domain}"
+
+    def random_alias(self, domain='gmail.com', unambiguous=False, min_length=None,
+                     max_length=None):
+        """Generate a random adjective/noun alias."""
+        window = length_window(min_length, max_length)
+        return f"{self._from_templates('random', unambiguous, window)}@{domain}"
+
+    def template_local(self, kind='creative', unambiguous=False, min_length=None,
+                       max_length=None):
+        """Local part of a ``creative`` or ``random`` alias, for callers adding their own domain."""
+        if kind not in ('creative', 'random'):
+            raise ValueError(f"Unknown template kind: {kind}")
+        return self._from_templates(kind, unambiguous, length_window(min_length, max_length))
+
+    def template_aliases(self, base_email, count, kind='creative', deadline_ms=None,
+                         min_distance=None, min_length=None, max_length=None):
+        """Generate up to ``count`` distinct creative or random aliases on the mailbox's domain.
+
+        Repeats are redrawn and, with ``min_distance``, so are aliases too
+        close to the mailbox's others. Template draws keep no state worth
+        resuming, so a run cut short by ``deadline_ms`` is partial but has
+        no continuation.
+        """
+        if kind not in ('creative', 'random'):
+            raise ValueError(f"Unknown template kind: {kind}")
+        state = self.mailbox(base_email)
+        if state is None:
+            return GenerationResult()
+        window = length_window(min_length, max_length)
+        spacing = self._spacing(state, min_distance)
+        deadline = Deadline.from_ms(deadline_ms)
+        aliases = self._iter_templates(kind, state.domain, count, window, deadline)
+        if spacing is not None:
+            aliases = self._spaced(aliases, spacing, deadline)
+        return self._collect(aliases, count, deadline, None)
+
+    def _iter_templates(self, kind, domain, count, window, deadline=None):
+        seen = set()
+        for _ in range(count * 20):  # Prevent infinite loops
+            if deadline is not None and deadline.expired():
+                return
+            alias = f"{self._from_templates(kind, False, window)}@{domain}"
+            if alias not in seen:
+                seen.add(alias)
+                yield alias
+
+    def iter_variations(self, base_email, order='balanced', weights=None, min_length=None,
+                        max_length=None):
+        """Lazily yield distinct variations of a base email address."""
+        state = self.mailbox(base_email)
+        if state is None:
+            return iter(())
+        spaces = self._variation_spaces(state, length_window(min_length, max_length))
+        return VariationStream(state.username, state.domain, spaces, self.rng, order=order,
+                               weights=weights)
+
+    def _variation_spaces(self, state, window=None):
+        if state.variation_spaces is None:
+            state.variation_spaces = build_variation_spaces(state.username)
+        if window is None:
+            return state.variation_spaces
+        spaces = (space.within(*window) for space in state.variation_spaces)
+        return [space for space in spaces if space.size]
+
+    def variations(self, base_email, count, order='balanced', weights=None, deadline_ms=None,
+                   min_distance=None, min_length=None, max_length=None):
+        """Generate up to ``count`` distinct variations of a base email address.
+
+        With ``deadline_ms`` generation stops when the budget runs out and
+        the result is marked partial; see ``_collect``. ``min_length`` and
+        ``max_length`` bound the local part.
+        """
+        state = self.mailbox(base_email)
+        if state is None:
+            return GenerationResult()
+        stream = self.iter_variations(base_email, order, weights, min_length, max_length)
+        spacing = self._spacing(state, min_distance)
+        deadline = Deadline.from_ms(deadline_ms)
+        aliases = stream if spacing is None else self._spaced(stream, spacing, deadline)
+        return self._collect(aliases, count, deadline, lambda done: {
+            'op': 'variations', 'email': base_email, 'count': count - done,
+            'stream': stream.state(), 'min_distance': min_distance,
+            'lengths': length_window(min_length, max_length),
+        })
+
+    def _spaced(self, aliases, spacing, deadline=None):
+        """Drop aliases closer than the minimum distance to ones already issued."""
+        for alias in aliases:
+            if spacing.admit(alias):
+                yield alias
+            elif deadline is not None and deadline.expired():
+                return  # rejections cost time too
+
+    def _collect(self, aliases, count, deadline, token):
+        """Take up to ``count`` aliases, stopping early if ``deadline`` passes.
+
+        The iterator gets the same ``Deadline`` and checks it on every
+        attempt, so candidates it rejects cannot run past the budget. Always
+        returns a ``GenerationResult``. When the deadline cut it short,
+        ``token(done)`` gives the state that ``resume`` continues from and
+        it is encoded into the result's continuation (None for runs that
+        cannot be resumed).
+        """
+        if deadline is None:
+            taken = list(islice(aliases, count))
+        else:
+            taken = []
+            append = taken.append
+            while len(taken) < count and not deadline.expired():
+                alias = next(aliases, None)
+                if alias is None:
+                    break
+                append(alias)
+        if deadline is not None and deadline.hit and len(taken) < count:
+            continuation = encode_token(token(len(taken))) if token is not None else None
+            return GenerationResult(taken, partial=True, continuation=continuation)
+        return GenerationResult(taken)
+
+    def resume(self, continuation, deadline_ms=None):
+        """Continue a run that a deadline cut short, from its continuation token.
+
+        Returns the next aliases of the same run as a ``GenerationResult``,
+        which is partial again if this deadline also runs out.
+        """
+        token = decode_token(continuation)
+        op = token['op']
+        state = self.mailbox(token['email'])
+        if state is None:
+            raise ValueError("Invalid continuation token")
+        count = token['count']
+        spacing = self._spacing(state, token.get('min_distance'))
+        deadline = Deadline.from_ms(deadline_ms)
+        window = token.get('lengths')
+        window = tuple(window) if window else None
+
+        if op == 'variations':
+            stream = VariationStream.restore(state.username, state.domain,
+                                             self._variation_spaces(state, window), self.rng,
+                                             token['stream'])
+            if spacing is not None:
+                self._respace(spacing, stream.produced())
+            aliases = stream if spacing is None else self._spaced(stream, spacing, deadline)
+            return self._collect(aliases, count, deadline, lambda done: {
+                **token, 'count': count - done, 'stream': stream.state(),
+            })
+
+        weights = self._tables.word_weights
+        if op == 'plus':
+            words = token['words']
+            pool = TagPool.restore(words, self.rng, token['tags'], self._used_tags(state), weights,
+                                   tag_window(state.username, window))
+            if spacing is not None:
+                self._respace(spacing, self._plus_aliases(state, pool.walked()))
+            start = token['start']
+            return self._collect(self._iter_plus(state, pool, words, start, spacing, deadline),
+                                 count, deadline,
+                                 lambda done: {**token, 'count': count - done,
+                                               'start': start + done, 'tags': pool.state()})
+
+        if op == 'mixed':
+            run = self._restore_mixed(state, token)
+            if spacing is not None:
+                self._respace(spacing, self._plus_aliases(state, run.tags.walked()))
+                self._respace(spacing, run.dots)
+            return self._collect(self._iter_mixed(state, run, count, spacing, deadline), count,
+                                 deadline,
+                                 lambda done: {**token, 'count': count - done, **run.state()})
+
+        raise ValueError(f"Cannot resume '{op}' runs with an alias engine")
+
+    def _respace(self, spacing, aliases):
+        """Load a restored run's earlier aliases into its spacing index.
+
+        A token only records where the run stopped, so in a new process the
+        index starts empty; like ``TagPool.restore`` marking tags as used,
+        everything the run walked past is indexed so later aliases keep
+        their distance from it.
+        """
+        for alias in aliases:
+            spacing.add(alias)
+
+    def _plus_aliases(self, state, tags):
+        """Plus aliases of ``tags`` that the blocklist lets through."""
+        allowed = self._tag_filter(state)
+        return (f"{state.username}+{tag}@{state.domain}" for tag in tags
+                if allowed is None or allowed(tag))
+
+    def _used_tags(self, state):
+        return state.used_tags if self.remember_issued else set()
+
+    def _allowed_words(self, words):
+        if self.blocklist is None:
+            return list(words)
+        return [w for w in words if not self.blocklist.contains(w)]
+
+    def _tag_filter(self, state):
+        """Return a check that a plus tag keeps the blocklist out of the local part."""
+        blocklist = self.blocklist
+        if blocklist is None:
+            return None
+        # Terms inside the mailbox's own username are not ours to reject
+        after_username = blocklist.advance(state.username)
+        return lambda tag: blocklist.scan(f"+{tag}", after_username) != BLOCKED
+
+    def plus_aliases(self, base_email, count, custom_words=None, deadline_ms=None,
+                     min_distance=None, min_length=None, max_length=None):
+        """Generate plus addressing aliases (Gmail style).
+
+        ``min_length`` and ``max_length`` bound the local part; only tags
+        of a fitting length are ever drawn.
+        """
+        state = self.mailbox(base_email)
+        if state is None:
+            return GenerationResult()
+
+        window = length_window(min_length, max_length)
+        words = self._allowed_words(custom_words or self.plus_words)
+        pool = TagPool(words, self.rng, self._used_tags(state), self._tables.word_weights,
+                       tag_window(state.username, window))
+        spacing = self._spacing(state, min_distance)
+        deadline = Deadline.from_ms(deadline_ms)
+        return self._collect(self._iter_plus(state, pool, words, 0, spacing, deadline), count,
+                             deadline,
+                             lambda done: {'op': 'plus', 'email': base_email,
+                                           'count': count - done, 'words': words,
+                                           'start': done, 'tags': pool.state(),
+                                           'min_distance': min_distance, 'lengths': window})
+
+    def _iter_plus(self, state, pool, words, start=0, spacing=None, deadline=None):
+        allowed = self._tag_filter(state)
+        guard = self._guard(state)
+        i = start
+        while True:
+            if deadline is not None and deadline.expired():
+                return  # checked per draw, since rejected tags cost time too
+            # The first tags follow the word list order
+            with guard:
+                word = pool.take(words[i] if i < len(words) else None)
+            if word is None:
+                return  # Every variant of every word is taken
+            i += 1
+            if allowed is not None and not allowed(word):
+                continue
+            alias = f"{state.username}+{word}@{state.domain}"
+            if spacing is not None and not spacing.admit(alias):
+                continue
+            yield alias
+
+    def mixed_plus_words(self, tag_lengths=None):
+        """Build the plus word list used by mixed generation.
+
+        With ``tag_lengths`` the words are sampled per word length, from
+        each length that can make a tag of that length, so short windows
+        still get enough short words.
+        """
+        tables = self._tables
+        sample = self.rng.sample
+        if tag_lengths is None:
+            groups = [(tables.short_adjectives, tables.short_verbs, tables.short_nouns)]
+        else:
+            # A tag adds up to three digits to its word
+            groups = [tuple(tables.short_of_length(name, n)
+                            for name in ('adjectives', 'verbs', 'nouns'))
+                      for n in range(max(1, tag_lengths[0] - 3), tag_lengths[1] + 1)]
+        words = list(self._allowed_words(TRADITIONAL_PLUS_WORDS))
+        for adjectives, verbs, nouns in groups:
+            words += sample(adjectives, min(10, len(adjectives)))
+            words += sample(verbs, min(8, len(verbs)))
+            words += sample(nouns, min(7, len(nouns)))
+        return words
+
+    def gmail_dot_variation(self, base_email, min_length=None, max_length=None):
+        """Generate a Gmail dot variation that works as a real alias."""
+        state = self.mailbox(base_email)
+        if state is None:
+            return None
+        return self._dot_variation(state, dot_range(state.clean_username,
+                                                    length_window(min_length, max_length)))
+
+    def _dot_variation(self, state, dots=None):
+        clean_username = state.clean_username
+        fewest, most = dots or dot_range(clean_username)
+        if len(clean_username) < 2 or fewest > most:
+            return None
+
+        rng = self.rng
+        num_dots = rng.randint(fewest, most)
+        positions = sorted(rng.sample(range(1, len(clean_username)), num_dots))
+
+        pieces = []
+        start = 0
+        for pos in positions:
+            pieces.append(clean_username[start:pos])
+            start = pos
+        pieces.append(clean_username[start:])
+        return f"{'.'.join(pieces)}@{state.domain}"
+
+    def mixed_aliases(self, base_email, total_count, mix=None, deadline_ms=None,
+                      min_distance=None, min_length=None, max_length=None):
+        """Generate a mix of alias types that work as real aliases.
+
+        ``mix`` overrides the engine's strategy mix for this call, e.g.
+        ``{'plus': 0.8, 'dots': 0.2}``. With ``deadline_ms`` the result may
+        be partial, with a continuation token for ``resume``.
+        ``min_distance`` overrides the engine's minimum edit distance.
+        ``min_length`` and ``max_length`` bound the local part.
+        """
+        state = self.mailbox(base_email)
+        if state is None:
+            return GenerationResult()
+        run = self._mixed_run(state, mix, length_window(min_length, max_length))
+        spacing = self._spacing(state, min_distance)
+        deadline = Deadline.from_ms(deadline_ms)
+        return self._collect(self._iter_mixed(state, run, total_count, spacing, deadline),
+                             total_count, deadline,
+                             lambda done: {'op': 'mixed', 'email': base_email,
+                                           'count': total_count - done, **run.state(),
+                                           'min_distance': min_distance})
+
+    def iter_mixed(self, base_email, total_count, mix=None, min_distance=None, min_length=None,
+                   max_length=None):
+        """Lazily yield the aliases of ``mixed_aliases`` one at a time."""
+        state = self.mailbox(base_email)
+        if state is None:
+            return iter(())
+        run = self._mixed_run(state, mix, length_window(min_length, max_length))
+        return self._iter_mixed(state, run, total_count, self._spacing(state, min_distance))
+
+    def mixed_run(self, base_email, mix=None, continuation=None, min_length=None,
+                  max_length=None):
+        """A mixed run that hands out its aliases in batches.
+
+        ``take(n)`` returns the run's next aliases and ``continuation()`` a
+        token that restarts the run from that point, even in another
+        process. Storing the token with each batch lets a caller pick up
+        after a restart without ever repeating an alias.
+        """
+        if continuation is None:
+            state = self.mailbox(base_email)
+            if state is None:
+                raise ValueError(f"Invalid email address: {base_email}")
+            run = self._mixed_run(state, mix, length_window(min_length, max_length))
+            return _Batches(self, state, run)
+        token = decode_token(continuation)
+        state = self.mailbox(token['email'])
+        if token['op'] != 'mixed' or state is None:
+            raise ValueError("Invalid continuation token")
+        return _Batches(self, state, self._restore_mixed(state, token))
+
+    def _mixed_run(self, state, mix, window=None):
+        strategy = self.strategy_mix if mix is None else self._mix_table(mix)
+        tag_lengths = tag_window(state.username, window)
+        tags = TagPool(self.mixed_plus_words(tag_lengths), self.rng, self._used_tags(state),
+                       self._tables.word_weights, tag_lengths)
+        return _MixedRun(strategy, tags, [], window)
+
+    def _restore_mixed(self, state, token):
+        window = tuple(token['lengths']) if token.get('lengths') else None
+        return _MixedRun(self._mix_table(dict(zip(('gmail_dots', 'plus'), token['mix']))),
+                         TagPool.restore(token['words'], self.rng, token['tags'],
+                                         self._used_tags(state), self._tables.word_weights,
+                                         tag_window(state.username, window)),
+                         token['dots'], window)
+
+    def _iter_mixed(self, state, run, total_count, spacing=None, deadline=None):
+        rng = self.rng
+        strategy = run.strategy
+        tags = run.tags
+        base_email = state.email
+        allowed = self._tag_filter(state)
+
+        guard = self._guard(state)
+        with guard:
+            seen = state.issued if self.remember_issued else set()
+            seen.update(run.dots)
+        generated = 0
+        attempts = 0
+        max_attempts = total_count * 20  # Prevent infinite loops
+        plus_enabled = strategy.weights[1] > 0 and len(tags) > 0
+        # For Gmail, dots and plus addressing are real aliases.
+        # Other providers only support plus addressing.
+        dots_enabled = state.is_gmail and strategy.weights[0] > 0
+        dots = dot_budget = None
+        if run.lengths is None:
+            dot_budget = state.dot_budget
+        elif dots_enabled:
+            dots = dot_range(state.clean_username, run.lengths)
+            dot_budget = min(count_dot_variations(state.clean_username, dots[1], dots[0]),
+                             len(state.username) * 2)
+
+        while generated < total_count and attempts < max_attempts:
+            if deadline is not None and deadline.expired():
+                return  # checked per attempt, since rejected candidates cost time too
+            attempts += 1
+
+            dots_left = dots_enabled and len(run.dots) < dot_budget
+            if dots_left and plus_enabled:
+                use_dots = strategy.choice(rng) == 'gmail_dots'
+            elif dots_left or plus_enabled:
+                use_dots = dots_left
+            else:
+                break  # Every requested strategy is exhausted
+
+            with guard:
+                if use_dots:
+                    alias = self._dot_variation(state, dots)
+                    if not alias or alias in seen or alias == base_email:
+                        continue
+                else:
+                    word = tags.take()
+                    if word is None:
+                        plus_enabled = False
+                        continue
+                    if allowed is not None and not allowed(word):
+                        continue
+                    alias = f"{state.username}+{word}@{state.domain}"
+                    if alias in seen:
+                        continue
+
+                if spacing is not None and not spacing.admit(alias):
+                    continue
+                if use_dots:
+                    run.dots.append(alias)
+                seen.add(alias)
+            generated += 1
+            yield alias
+
+
+class _MixedRun:
+    """State of one mixed generation run, enough to resume it later."""
+
+    __slots__ = ('strategy', 'tags', 'dots', 'lengths')
+
+    def __init__(self, strategy, tags, dots, lengths=None):
+        self.strategy = strategy
+        self.tags = tags
+        self.dots = dots  # dot variations issued so far
+        self.lengths = lengths  # local-part length window, if any
+
+    def state(self):
+        return {'mix': list(self.strategy.weights), 'words': self.tags.words,
+                'tags': self.tags.state(), 'dots': self.dots, 'lengths': self.lengths}
+
+
+class _Batches:
+    """Batch interface over a mixed run, returned by ``AliasEngine.mixed_run``."""
+
+    __slots__ = ('engine', 'state', 'run')
+
+    def __init__(self, engine, state, run):
+        self.engine = engine
+        self.state = state
+        self.run = run
+
+    def take(self, count):
+        """The run's next ``count`` aliases; fewer once it is running out."""
+        aliases = self.engine._iter_mixed(self.state, self.run, count)
+        try:
+            return list(aliases)
+        finally:
+            aliases.close()
+
+    def continuation(self):
+        return encode_token({'op': 'mixed', 'email': self.state.email, 'count': 0,
+                             **self.run.state(), 'min_distance': None})
+
+
+class _NoLock:
+    """Stand-in context manager when no locking is required."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_LOCK = _NoLock()
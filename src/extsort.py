@@ -0,0 +1,227 @@
+"""
+External-memory sort, merge and set operations over alias files
+"""
+
+import csv
+import heapq
+import json
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import groupby
+from operator import itemgetter
+
+
+SET_OPERATIONS = ('union', 'intersect', 'diff')
+DEFAULT_MEMORY_MB = 256
+MERGE_FAN_IN = 128  # most run files held open by one merge
+ITEM_OVERHEAD = 64  # rough per-string cost in a Python list, in bytes
+READ_SIZE = 1 << 16
+
+
+def _iter_json(f):
+    """Stream the strings of a JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buf = f.read(READ_SIZE).lstrip()
+    if not buf.startswith('['):
+        raise ValueError(f"{f.name}: expected a JSON array of aliases")
+    buf = buf[1:]
+    while True:
+        buf = buf.lstrip()
+        if buf.startswith(','):
+            buf = buf[1:].lstrip()
+        if buf.startswith(']'):
+            return
+        try:
+            value, end = decoder.raw_decode(buf) if buf else (None, None)
+        except json.JSONDecodeError:
+            end = None
+        if end is None:
+            more = f.read(READ_SIZE)
+            if not more:
+                raise ValueError(f"{f.name}: truncated JSON array")
+            buf += more
+            continue
+        buf = buf[end:]
+        if isinstance(value, str):
+            yield value
+
+
+def read_aliases(path):
+    """Stream the aliases in a text, CSV or JSON file written by ``save_to_file``.
+
+    The format follows the extension (.json, .csv, anything else is text).
+    Blank lines, the CSV ``email`` header and entries without an ``@`` are
+    skipped.
+    """
+    suffix = os.path.splitext(str(path))[1].lower()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if suffix == '.json':
+            values = _iter_json(f)
+        elif suffix == '.csv':
+            values = (row[0] for row in csv.reader(f) if row)
+        else:
+            values = f
+        for value in values:
+            alias = value.strip()
+            if '@' in alias and '\n' not in alias:
+                yield alias
+
+
+def _write_run(items, path):
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.writelines(f"{item}\n" for item in items)
+    return path
+
+
+def _sort_run(chunk, path):
+    """Sort and dedupe one chunk into a run file (runs in a worker process)."""
+    return _write_run(sorted(set(chunk)), path)
+
+
+def _read_run(path):
+    with open(path, 'r', encoding='utf-8', newline='\n') as f:
+        for line in f:
+            yield line[:-1]
+
+
+def _unique(sorted_items):
+    previous = None
+    for item in sorted_items:
+        if item != previous:
+            yield item
+            previous = item
+
+
+def merge_sorted(iterables):
+    """Merge sorted iterables into one sorted stream without duplicates."""
+    return _unique(heapq.merge(*iterables))
+
+
+class ExternalSorter:
+    """Sorts and dedupes streams larger than memory through temporary runs.
+
+    Items are gathered into chunks of about ``memory_mb`` / (jobs + 1)
+    megabytes, each chunk is sorted into a run file (in ``jobs`` worker
+    processes when jobs > 1), and runs are merged k ways with a heap. When
+    a stream leaves more than ``MERGE_FAN_IN`` runs they are merged in
+    passes first, so open files stay bounded too. Run files live in a
+    temporary directory removed by ``close``.
+    """
+
+    def __init__(self, memory_mb=DEFAULT_MEMORY_MB, jobs=1, tmp_dir=None):
+        if memory_mb <= 0:
+            raise ValueError("memory_mb must be positive")
+        self.jobs = max(1, jobs)
+        self.chunk_bytes = max(memory_mb * (1 << 20) // (self.jobs + 1), 1 << 20)
+        self._tmp = tempfile.TemporaryDirectory(prefix='aliases-sort-', dir=tmp_dir)
+        self._runs = 0
+        self._pool = ProcessPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        self._pending = set()  # submitted sorts, cancelled if we close early
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if self._pool is not None:
+            # shutdown(cancel_futures=True) needs Python 3.9
+            for future in self._pending:
+                future.cancel()
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self._tmp.cleanup()
+
+    def _run_path(self):
+        self._runs += 1
+        return os.path.join(self._tmp.name, f"run{self._runs:06d}")
+
+    def _chunks(self, items):
+        chunk = []
+        size = 0
+        for item in items:
+            chunk.append(item)
+            size += len(item) + ITEM_OVERHEAD
+            if size >= self.chunk_bytes:
+                yield chunk
+                chunk = []
+                size = 0
+        if chunk:
+            yield chunk
+
+    def runs(self, items):
+        """Split ``items`` into sorted, deduped run files; return their paths."""
+        if self._pool is None:
+            return [_sort_run(chunk, self._run_path()) for chunk in self._chunks(items)]
+
+        paths = []
+        pending = self._pending
+        for chunk in self._chunks(items):
+            # At most ``jobs`` chunks in flight keeps memory bounded
+            if len(pending) >= self.jobs:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending -= done
+                paths.extend(future.result() for future in done)
+            pending.add(self._pool.submit(_sort_run, chunk, self._run_path()))
+        paths.extend(future.result() for future in pending)
+        pending.clear()
+        return sorted(paths)
+
+    def _reduce(self, paths):
+        """Merge runs in passes until at most ``MERGE_FAN_IN`` remain."""
+        while len(paths) > MERGE_FAN_IN:
+            merged = []
+            for i in range(0, len(paths), MERGE_FAN_IN):
+                group = paths[i:i + MERGE_FAN_IN]
+                merged.append(_write_run(merge_sorted(_read_run(p) for p in group),
+                                         self._run_path()))
+                for p in group:
+                    os.remove(p)
+            paths = merged
+        return paths
+
+    def sort(self, items):
+        """Yield ``items`` in sorted order with duplicates removed."""
+        return merge_sorted(_read_run(p) for p in self._reduce(self.runs(items)))
+
+
+def _tagged(stream, source):
+    for item in stream:
+        yield item, source
+
+
+def _combine(streams, operation):
+    """Apply a set operation to sorted, deduped streams in one merge pass."""
+    last = len(streams) - 1
+    tagged = heapq.merge(*(_tagged(stream, i) for i, stream in enumerate(streams)))
+    for item, group in groupby(tagged, key=itemgetter(0)):
+        sources = [i for _, i in group]
+        if operation == 'union':
+            yield item
+        elif operation == 'intersect':
+            if len(sources) > last:
+                yield item
+        elif sources == [0]:  # diff: only in the first file
+            yield item
+
+
+def merge_alias_files(paths, operation='union', memory_mb=DEFAULT_MEMORY_MB, jobs=1, tmp_dir=None):
+    """Stream the sorted union, intersection or difference of alias files.
+
+    ``diff`` yields aliases of the first file found in none of the others,
+    e.g. what is new in the latest export. Memory stays near ``memory_mb``
+    whatever the file sizes; temporary runs are removed once the generator
+    finishes or is closed.
+    """
+    if operation not in SET_OPERATIONS:
+        raise ValueError(f"Unknown set operation: {operation}")
+    with ExternalSorter(memory_mb, jobs, tmp_dir) as sorter:
+        if operation == 'union':
+            # One sort over every file dedupes the union directly
+            yield from sorter.sort(alias for path in paths for alias in read_aliases(path))
+            return
+        streams = [sorter.sort(read_aliases(path)) for path in paths]
+        yield from _combine(streams, operation)
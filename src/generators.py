@@ -2,324 +2,283 @@
 Email alias generation strategies
 """
 
-import random
-import string
-import sys
-from pathlib import Path
+import threading
+from functools import lru_cache
+
+try:
+    from .blocklist import Blocklist
+    from .deadline import decode_token
+    from .domains import iter_across_domains as _iter_across_domains
+    from .engine import AliasEngine
+    from .namespaces import NamespaceRegistry
+    from .pool import DEFAULT_CAPACITY, DEFAULT_LEASE_SECONDS, DEFAULT_LOW_WATER, AliasPool
+    from .rotating import RotatingAliases
+    from .wordlists import WordListSource, load_weighted_word_lists
+except ImportError:  # running as a script from src/
+    from blocklist import Blocklist
+    from deadline import decode_token
+    from domains import iter_across_domains as _iter_across_domains
+    from engine import AliasEngine
+    from namespaces import NamespaceRegistry
+    from pool import DEFAULT_CAPACITY, DEFAULT_LEASE_SECONDS, DEFAULT_LOW_WATER, AliasPool
+    from rotating import RotatingAliases
+    from wordlists import WordListSource, load_weighted_word_lists
 
 
 def load_word_lists():
     """Load adjectives, nouns, and verbs from text files."""
-    current_dir = Path(__file__).parent.parent  # Go up from src/ to root
-    data_dir = current_dir / 'data'
-    
-    # For PyInstaller executables, use the bundled data
-    if hasattr(sys, '_MEIPASS'):
-        data_dir = Path(sys._MEIPASS) / 'data'
-    
-    try:
-        with open(data_dir / 'adjectives.txt', 'r') as f:
-            adjectives = [line.strip() for line in f if line.strip()]
-    except FileNotFoundError:
-        # Fallback adjectives if file not found
-        adjectives = [
-            'happy', 'sunny', 'cool', 'swift', 'bright', 'clever', 'quick',
-            'brave', 'calm', 'wise', 'noble', 'keen', 'bold', 'sharp', 'smart'
-        ]
-    
-    try:
-        with open(data_dir / 'nouns.txt', 'r') as f:
-            nouns = [line.strip() for line in f if line.strip()]
-    except FileNotFoundError:
-        # Fallback nouns if file not found
-        nouns = [
-            'eagle', 'tiger', 'wolf', 'fox', 'hawk', 'bear', 'lion',
-            'storm', 'wind', 'fire', 'star', 'moon', 'sun', 'sky', 'ocean'
-        ]
-    
-    try:
-        with open(data_dir / 'verbs.txt', 'r') as f:
-            verbs = [line.strip() for line in f if line.strip()]
-    except FileNotFoundError:
-        # Fallback verbs if file not found
-        verbs = [
-            'run', 'jump', 'fly', 'soar', 'swim', 'dive', 'climb', 'dance',
-            'sing', 'play', 'laugh', 'smile', 'think', 'dream', 'create'
-        ]
-    
+    adjectives, nouns, verbs, _ = load_weighted_word_lists()
     return adjectives, nouns, verbs
 
 
-def generate_creative_alias(adjectives, nouns, verbs, domain='gmail.com'):
+_default_engines = {}
+_default_engine_lock = threading.Lock()
+_watcher = None
+_namespaces = None
+_blocklist = None
+
+
+def get_default_engine(secure=False):
+    """Return the shared engine built from the bundled word lists."""
+    engine = _default_engines.get(secure)
+    if engine is None:
+        with _default_engine_lock:
+            engine = _default_engines.get(secure)
+            if engine is None:
+                adjectives, nouns, verbs, weights = load_weighted_word_lists()
+                engine = AliasEngine(adjectives, nouns, verbs, word_weights=weights, secure=secure,
+                                     blocklist=_blocklist)
+                _default_engines[secure] = engine
+                if _watcher is not None:
+                    _watcher.attach(engine)
+    return engine
+
+
+def watch_word_lists(interval=2.0):
+    """Hot-reload the bundled word lists into the default engines.
+
+    Starts (once) a background thread that polls the data files every
+    ``interval`` seconds and swaps edited lists in without a restart.
+    """
+    global _watcher
+    with _default_engine_lock:
+        if _watcher is None:
+            _watcher = WordListSource(interval=interval)
+            for engine in _default_engines.values():
+                _watcher.attach(engine)
+            if _namespaces is not None:
+                _watcher.attach(_namespaces)
+        _watcher.start()
+    return _watcher
+
+
+def get_namespaces():
+    """Return the shared word-list namespace registry over the bundled lists."""
+    global _namespaces
+    if _namespaces is None:
+        with _default_engine_lock:
+            if _namespaces is None:
+                adjectives, nouns, verbs, weights = load_weighted_word_lists()
+                _namespaces = NamespaceRegistry(adjectives, nouns, verbs, word_weights=weights,
+                                                blocklist=_blocklist)
+                if _watcher is not None:
+                    _watcher.attach(_namespaces)
+    return _namespaces
+
+
+def set_blocklist(blocklist):
+    """Keep blocked terms out of everything the shared engines generate.
+
+    ``blocklist`` is a ``Blocklist``, the path of a term file (one term per
+    line) or None to turn filtering off. It is compiled once and applied to
+    the default engines, the namespaces and custom word-list engines.
+    """
+    global _blocklist
+    if blocklist is not None and not isinstance(blocklist, Blocklist):
+        blocklist = Blocklist.from_file(blocklist)
+    with _default_engine_lock:
+        _blocklist = blocklist
+        engines = list(_default_engines.values())
+        namespaces = _namespaces
+    for engine in engines:
+        engine.set_blocklist(blocklist)
+    if namespaces is not None:
+        namespaces.set_blocklist(blocklist)
+    _custom_engine.cache_clear()
+    _list_engines.clear()
+    return blocklist
+
+
+LIST_ENGINES_SIZE = 64  # (word lists -> engine) decisions kept before a reset
+_list_engines = {}
+
+
+@lru_cache(maxsize=8)
+def _custom_engine(adjectives, nouns, verbs, secure):
+    return AliasEngine(adjectives, nouns, verbs, secure=secure, blocklist=_blocklist)
+
+
+def _snapshot(words):
+    """Contents to check a cached entry against: tuples cannot change, lists can."""
+    return words if isinstance(words, tuple) else list(words)
+
+
+def _engine_for(adjectives, nouns, verbs=(), secure=False):
+    """Reuse the default engine unless the caller passes different word lists.
+
+    Callers hand in the same list objects call after call, so the answer is
+    cached by object id and length (the entry keeps the lists alive, so the
+    ids cannot be reused). A hit still confirms the contents against a copy
+    taken when it was cached, so lists edited in place are picked up;
+    comparing two lists of the same strings is a fast identity scan.
+    """
+    engine = get_default_engine(secure)
+    defaults = (engine.adjectives, engine.nouns, engine.verbs)
+    if adjectives is defaults[0] and nouns is defaults[1] and (not verbs or verbs is defaults[2]):
+        return engine
+    lists = (adjectives, nouns, verbs)
+    key = (id(adjectives), len(adjectives), id(nouns), len(nouns), id(verbs), len(verbs), secure)
+    entry = _list_engines.get(key)
+    # A reload or blocklist change swaps the default lists, which invalidates the entry
+    if (entry is not None and all(a is b for a, b in zip(entry[2], defaults))
+            and all(copy is words or copy == words for copy, words in zip(entry[1], lists))):
+        return entry[3]
+    words = tuple(adjectives), tuple(nouns), tuple(verbs)
+    if words[0] == defaults[0] and words[1] == defaults[1] and (not verbs or words[2] == defaults[2]):
+        found = engine
+    else:
+        found = _custom_engine(*words, secure)
+    if len(_list_engines) >= LIST_ENGINES_SIZE:
+        _list_engines.clear()
+    _list_engines[key] = (lists, tuple(_snapshot(w) for w in lists), defaults, found)
+    return found
+
+
+def generate_creative_alias(adjectives, nouns, verbs, domain='gmail.com', secure=False,
+                            min_length=None, max_length=None):
     """Generate creative email aliases using all three word lists."""
-    strategies = [
-        # adjective + noun + number
-        lambda: f"{random.choice(adjectives)}{random.choice(nouns)}{random.randint(1, 999)}@{domain}",
-        # verb + noun + number
-        lambda: f"{random.choice(verbs)}{random.choice(nouns)}{random.randint(1, 99)}@{domain}",
-        # adjective + verb + number
-        lambda: f"{random.choice(adjectives)}{random.choice(verbs)}{random.randint(10, 999)}@{domain}",
-        # verb + adjective + noun
-        lambda: f"{random.choice(verbs)}{random.choice(adjectives)}{random.choice(nouns)}@{domain}",
-        # adjective + _ + noun
-        lambda: f"{random.choice(adjectives)}_{random.choice(nouns)}@{domain}",
-        # verb + _ + noun + number
-        lambda: f"{random.choice(verbs)}_{random.choice(nouns)}{random.randint(1, 99)}@{domain}",
-        # adjective + . + verb + number
-        lambda: f"{random.choice(adjectives)}.{random.choice(verbs)}{random.randint(10, 99)}@{domain}",
-        # noun + verb + year
-        lambda: f"{random.choice(nouns)}{random.choice(verbs)}{random.randint(2020, 2025)}@{domain}",
-        # verb + . + adjective + . + noun
-        lambda: f"{random.choice(verbs)}.{random.choice(adjectives)}.{random.choice(nouns)}@{domain}",
-        # creative combinations with numbers
-        lambda: f"{random.choice(verbs)}{random.choice(adjectives)}{random.randint(1, 999)}@{domain}",
-        lambda: f"{random.choice(nouns)}{random.choice(verbs)}{random.randint(1, 99)}@{domain}",
-        lambda: f"{random.choice(adjectives)}{random.choice(nouns)}{random.choice(verbs)}@{domain}",
-    ]
-    
-    return random.choice(strategies)()
-
-
-def generate_random_alias(adjectives, nouns, domain='gmail.com'):
+    return _engine_for(adjectives, nouns, verbs, secure).creative_alias(
+        domain, min_length=min_length, max_length=max_length)
+
+
+def generate_random_alias(adjectives, nouns, domain='gmail.com', secure=False, min_length=None,
+                          max_length=None):
     """Generate a random email alias using word combinations (backward compatibility)."""
-    strategies = [
-        # adjective + noun + number
-        lambda: f"{random.choice(adjectives)}{random.choice(nouns)}{random.randint(1, 999)}@{domain}",
-        # adjective + _ + noun
-        lambda: f"{random.choice(adjectives)}_{random.choice(nouns)}@{domain}",
-        # adjective + . + noun + number
-        lambda: f"{random.choice(adjectives)}.{random.choice(nouns)}{random.randint(10, 99)}@{domain}",
-        # noun + adjective + number
-        lambda: f"{random.choice(nouns)}{random.choice(adjectives)}{random.randint(1, 999)}@{domain}",
-        # single word + year-like number
-        lambda: f"{random.choice(nouns)}{random.randint(2020, 2025)}@{domain}",
-    ]
-    
-    return random.choice(strategies)()
-
-
-def generate_variations(base_email, count):
-    """Generate variations of a base email address."""
-    if '@' not in base_email:
-        return []
-    
-    username, domain = base_email.split('@')
-    variations = []
-    
-    # Different variation strategies
-    for i in range(count):
-        strategy = i % 10  # Cycle through strategies
-        
-        if strategy == 0 and '.' not in username:
-            # Add dots in username (if no dots exist)
-            if len(username) > 2:
-                pos = random.randint(1, len(username) - 1)
-                variation = f"{username[:pos]}.{username[pos:]}@{domain}"
-            else:
-                variation = f"{username}{random.randint(1, 99)}@{domain}"
-        elif strategy == 1:
-            # Add numbers at the end
-            variation = f"{username}{random.randint(1, 999)}@{domain}"
-        elif strategy == 2:
-            # Add year
-            variation = f"{username}{random.randint(2020, 2025)}@{domain}"
-        elif strategy == 3:
-            # Add underscore and number
-            variation = f"{username}_{random.randint(1, 99)}@{domain}"
-        elif strategy == 4:
-            # Prepend number
-            variation = f"{random.randint(1, 9)}{username}@{domain}"
-        elif strategy == 5:
-            # Add common suffixes
-            suffix = random.choice(['pro', 'mail', 'contact', 'info', 'official'])
-            variation = f"{username}.{suffix}@{domain}"
-        elif strategy == 6:
-            # Double the username
-            variation = f"{username}{username}@{domain}"
-        elif strategy == 7:
-            # Reverse username
-            variation = f"{username[::-1]}@{domain}"
-        elif strategy == 8:
-            # Add dots and numbers
-            if len(username) > 3:
-                pos = len(username) // 2
-                variation = f"{username[:pos]}.{username[pos:]}{random.randint(1, 99)}@{domain}"
-            else:
-                variation = f"{username}.{random.randint(100, 999)}@{domain}"
-        else:
-            # Mix letters with numbers
-            variation = f"{username}{random.choice(string.ascii_lowercase)}{random.randint(10, 99)}@{domain}"
-        
-        variations.append(variation)
-    
-    return variations
-
-
-def generate_plus_aliases(base_email, count, custom_words=None):
+    return _engine_for(adjectives, nouns, secure=secure).random_alias(
+        domain, min_length=min_length, max_length=max_length)
+
+
+def generate_variations(base_email, count, secure=False, deadline_ms=None, min_distance=None,
+                        min_length=None, max_length=None):
+    """Generate distinct variations of a base email address."""
+    return get_default_engine(secure).variations(base_email, count, deadline_ms=deadline_ms,
+                                                 min_distance=min_distance,
+                                                 min_length=min_length, max_length=max_length)
+
+
+def iter_variations(base_email, order='balanced', weights=None, secure=False, min_length=None,
+                    max_length=None):
+    """Lazily yield distinct variations in balanced or weighted strategy order."""
+    return get_default_engine(secure).iter_variations(base_email, order, weights, min_length,
+                                                      max_length)
+
+
+def generate_plus_aliases(base_email, count, custom_words=None, secure=False, deadline_ms=None,
+                          min_distance=None, min_length=None, max_length=None):
     """Generate plus addressing aliases (Gmail style)."""
-    if '@' not in base_email:
-        return []
-    
-    username, domain = base_email.split('@')
-    aliases = []
-    used_words = set()
-    
-    # Default words if none provided
-    if not custom_words:
-        custom_words = [
-            'shopping', 'newsletter', 'social', 'work', 'personal',
-            'updates', 'notifications', 'promo', 'info', 'contact',
-            'register', 'signup', 'temp', 'test', 'backup'
-        ]
-    
-    for i in range(count):
-        attempts = 0
-        max_word_attempts = 50  # Prevent infinite loop
-        
-        while attempts < max_word_attempts:
-            attempts += 1
-            
-            if i < len(custom_words):
-                base_word = custom_words[i]
-            else:
-                base_word = random.choice(custom_words)
-            
-            # Create variations to ensure uniqueness
-            if base_word not in used_words:
-                word = base_word
-            elif f"{base_word}2" not in used_words:
-                word = f"{base_word}2"
-            elif f"{base_word}{random.randint(10, 99)}" not in used_words:
-                word = f"{base_word}{random.randint(10, 99)}"
-            else:
-                # Generate completely random combination
-                word = f"{base_word}{random.randint(100, 999)}"
-            
-            if word not in used_words:
-                used_words.add(word)
-                alias = f"{username}+{word}@{domain}"
-                aliases.append(alias)
-                break
-    
-    return aliases
-
-
-def generate_mixed_aliases(base_email, total_count):
-    """Generate a mix of different alias types automatically."""
-    if '@' not in base_email:
-        return []
-    
-    username, domain = base_email.split('@')
-    aliases = []
-    
-    # Load word lists for enhanced plus addressing
-    adjectives, nouns, verbs = load_word_lists()
-    
-    # For Gmail, only plus addressing and dots work as TRUE aliases
-    # For other providers, only plus addressing works as true aliases
-    is_gmail = domain.lower() in ['gmail.com', 'googlemail.com']
-    
-    if is_gmail:
-        # Gmail supports dots and plus addressing as REAL aliases
-        strategies = [
-            ('gmail_dots', 0.4),   # 40% chance - dots in username
-            ('plus', 0.6),         # 60% chance - plus addressing
-        ]
-    else:
-        # Other providers: only plus addressing works as real aliases
-        strategies = [
-            ('plus', 1.0),         # 100% chance - only plus addressing works
-        ]
-    
-    # Generate enhanced plus words using our word lists (but keep them reasonable)
-    enhanced_plus_words = [
-        # Traditional plus words (these are practical and recognizable)
-        'shopping', 'newsletter', 'social', 'work', 'personal', 'updates', 'notifications',
-        'promo', 'info', 'contact', 'register', 'signup', 'temp', 'test', 'backup',
-        'bills', 'banking', 'travel', 'deals', 'offers', 'spam', 'junk', 'friends',
-        'family', 'business', 'freelance', 'projects', 'orders', 'receipts',
-        # Add some creative but short words from our lists
-        *random.sample([w for w in adjectives if len(w) <= 8], min(10, len([w for w in adjectives if len(w) <= 8]))),
-        *random.sample([w for w in verbs if len(w) <= 8], min(8, len([w for w in verbs if len(w) <= 8]))),
-        *random.sample([w for w in nouns if len(w) <= 8], min(7, len([w for w in nouns if len(w) <= 8])))
-    ]
-    
-    # Generate aliases
-    generated_count = 0
-    attempts = 0
-    max_attempts = total_count * 20  # Prevent infinite loops
-    
-    # Calculate maximum possible dot variations
-    # For username "tom" we can have: t.om, to.m, t.o.m (all positions between chars)
-    max_dot_variations = 2 ** (len(username) - 1) - 1 if len(username) > 1 else 0
-    # But limit to reasonable number to avoid infinite loops
-    max_dot_variations = min(max_dot_variations, len(username) * 2)
-    
-    while generated_count < total_count and attempts < max_attempts:
-        attempts += 1
-        
-        # Count current alias types
-        dot_count = sum(1 for alias in aliases if '+' not in alias and alias.split('@')[0] != username)
-        plus_count = sum(1 for alias in aliases if '+' in alias)
-        
-        # Choose strategy based on what we can still generate
-        available_strategies = []
-        
-        if is_gmail and dot_count < max_dot_variations:
-            available_strategies.append(('gmail_dots', 0.4))
-        
-        # Plus addressing has virtually unlimited variations
-        available_strategies.append(('plus', 0.6))
-        
-        if not available_strategies:
-            break  # Can't generate more unique aliases
-        
-        # Choose strategy
-        strategy_type = random.choices(
-            [s[0] for s in available_strategies],
-            weights=[s[1] for s in available_strategies]
-        )[0]
-        
-        if strategy_type == 'gmail_dots':
-            # Generate Gmail dot variations (these are REAL aliases)
-            alias = generate_gmail_dot_variation(base_email)
-            if alias and alias not in aliases and alias != base_email:
-                aliases.append(alias)
-                generated_count += 1
-        
-        elif strategy_type == 'plus':
-            # Generate enhanced plus alias (these are REAL aliases)
-            plus_aliases = generate_plus_aliases(base_email, 1, enhanced_plus_words)
-            if plus_aliases and plus_aliases[0] not in aliases:
-                aliases.append(plus_aliases[0])
-                generated_count += 1
-    
-    return aliases
-
-
-def generate_gmail_dot_variation(base_email):
+    return get_default_engine(secure).plus_aliases(base_email, count, custom_words, deadline_ms,
+                                                   min_distance, min_length, max_length)
+
+
+def generate_mixed_aliases(base_email, total_count, mix=None, secure=False, deadline_ms=None,
+                           min_distance=None, min_length=None, max_length=None):
+    """Generate a mix of different alias types automatically.
+
+    ``mix`` optionally sets the strategy weights, e.g. {'plus': 0.8, 'dots': 0.2}.
+    With ``secure=True`` all randomness comes from OS entropy. With
+    ``deadline_ms`` generation stops when the time budget runs out: the
+    result's ``partial`` flag is set and ``continuation`` can be passed to
+    ``resume_aliases`` for the rest. With ``min_distance`` every alias is
+    at least that many edits from the others issued for the mailbox,
+    including those passed to ``reserve_aliases``. ``min_length`` and
+    ``max_length`` bound the local part (the text before the @).
+    """
+    return get_default_engine(secure).mixed_aliases(base_email, total_count, mix, deadline_ms,
+                                                    min_distance, min_length, max_length)
+
+
+def iter_mixed_aliases(base_email, total_count, mix=None, secure=False, min_distance=None,
+                       min_length=None, max_length=None):
+    """Lazily yield mixed aliases, for streaming them straight to a writer."""
+    return get_default_engine(secure).iter_mixed(base_email, total_count, mix, min_distance,
+                                                 min_length, max_length)
+
+
+def iter_across_domains(base_email, domains, count, strategy='mixed', mix=None, secure=False,
+                        min_length=None, max_length=None, unique=False, rules=None):
+    """Lazily yield aliases for ``count`` local parts, each issued on every fitting domain.
+
+    Every local part is generated once and joined with each domain whose
+    rules accept it, so many domains cost little more than one. With
+    ``unique`` each local part is issued on a single domain instead.
+    """
+    return _iter_across_domains(get_default_engine(secure), base_email, domains, count, strategy,
+                                mix, min_length, max_length, unique, rules)
+
+
+def reserve_aliases(base_email, aliases, min_distance=1, secure=False):
+    """Register a mailbox's existing aliases so new ones keep ``min_distance`` from them."""
+    get_default_engine(secure).reserve(base_email, aliases, min_distance)
+
+
+def open_alias_pool(path, base_email, mix=None, capacity=DEFAULT_CAPACITY,
+                    low_water=DEFAULT_LOW_WATER, lease_seconds=DEFAULT_LEASE_SECONDS,
+                    secure=False, background=True):
+    """Open (or create) a pre-generated alias pool for a mailbox in a SQLite file.
+
+    ``pool.lease()`` hands out a fresh alias in well under a millisecond,
+    from any thread or process sharing the file; ``commit`` or ``release``
+    it afterwards. With ``background`` a thread keeps the pool topped up.
+    """
+    pool = AliasPool(path, base_email, get_default_engine(secure), mix, capacity, low_water,
+                     lease_seconds)
+    return pool.start() if background else pool
+
+
+def generate_gmail_dot_variation(base_email, secure=False, min_length=None, max_length=None):
     """Generate Gmail-specific dot variations that actually work as aliases."""
-    if '@' not in base_email:
-        return None
-    
-    username, domain = base_email.split('@')
-    
-    # Remove existing dots for Gmail
-    clean_username = username.replace('.', '')
-    
-    # If username is too short, just return None
-    if len(clean_username) < 2:
-        return None
-    
-    # Generate random dot positions
-    num_dots = random.randint(1, min(3, len(clean_username) - 1))
-    positions = sorted(random.sample(range(1, len(clean_username)), num_dots))
-    
-    # Insert dots at positions
-    result = clean_username
-    for i, pos in enumerate(positions):
-        # Adjust position based on previously inserted dots
-        adjusted_pos = pos + i
-        result = result[:adjusted_pos] + '.' + result[adjusted_pos:]
-    
-    return f"{result}@{domain}"
+    return get_default_engine(secure).gmail_dot_variation(base_email, min_length, max_length)
+
+
+def generate_rotating_aliases(base_email, count, key, mode='plus', period=86400, epoch=None,
+                              deadline_ms=None):
+    """Derive ``count`` stateless aliases for the current (or given) epoch.
+
+    The same key, mailbox, epoch and index always give the same alias, so
+    nothing needs to be stored; see ``verify_rotating_alias``.
+    """
+    rotating = RotatingAliases(key, get_default_engine(), mode=mode, period=period)
+    return rotating.derive_many(base_email, count, epoch, deadline_ms=deadline_ms)
+
+
+def resume_aliases(continuation, deadline_ms=None, secure=False, key=None):
+    """Continue a generation run that a deadline cut short.
+
+    Rotating runs need the same ``key`` they were derived with; the token
+    never contains it.
+    """
+    token = decode_token(continuation)
+    if token['op'] == 'rotating':
+        if key is None:
+            raise ValueError("Resuming rotating aliases needs the rotation key")
+        rotating = RotatingAliases(key, get_default_engine(), mode=token['mode'],
+                                   period=token['period'])
+        return rotating.derive_many(token['email'], token['count'], token['epoch'],
+                                    token['start'], deadline_ms)
+    return get_default_engine(secure).resume(continuation, deadline_ms)
+
+
+def verify_rotating_alias(alias, key, base_email=None, mode='plus', period=86400, grace=1):
+    """Return (epoch, index) if ``alias`` was derived with ``key``, else None."""
+    rotating = RotatingAliases(key, get_default_engine(), mode=mode, period=period, grace=grace)
+    return rotating.verify(alias, base_email)
@@ -0,0 +1,176 @@
+"""
+Length windows and length-bucketed sampling for alias local parts
+"""
+
+try:
+    from .sampling import make_chooser
+except ImportError:  # running as a script from src/
+    from sampling import make_chooser
+
+
+MAX_LOCAL_LENGTH = 64  # RFC 5321 limit on the part before the @
+WINDOW_CACHE_SIZE = 256  # length windows with cached tables, per template
+
+
+def length_window(min_length=None, max_length=None):
+    """Normalize optional local-part length bounds into (low, high), or None if unbounded."""
+    if min_length is None and max_length is None:
+        return None
+    low = 1 if min_length is None else min_length
+    high = MAX_LOCAL_LENGTH if max_length is None else max_length
+    if low < 1 or high < low:
+        raise ValueError(f"Invalid length window: {min_length}..{max_length}")
+    return low, high
+
+
+class LengthBuckets:
+    """Words of a pool grouped by length, each group with its own sampler.
+
+    ``masses`` maps each length to the chance that an unconstrained draw
+    from the pool has it, so a word of a given length is drawn with the
+    same relative weights as without any constraint.
+    """
+
+    __slots__ = ('masses', 'total', '_buckets')
+
+    def __init__(self, items, weights=None):
+        groups = {}
+        for i, item in enumerate(items):
+            words, word_weights = groups.setdefault(len(item), ([], []))
+            words.append(item)
+            word_weights.append(1.0 if weights is None else weights[i])
+        self.total = sum(sum(w) for _, w in groups.values())
+        self.masses = {length: sum(w) / self.total for length, (_, w) in groups.items()
+                       if sum(w) > 0}
+        self._buckets = {length: make_chooser(words, w) for length, (words, w) in groups.items()}
+
+    def sample(self, length, rng):
+        return self._buckets[length].choice(rng)
+
+
+class LayeredBuckets:
+    """``LengthBuckets`` of a base pool plus extra words, sharing the base buckets.
+
+    A word of a given length comes from the base bucket or the extra one
+    in proportion to their weight at that length, which is the same draw
+    as one bucket holding both.
+    """
+
+    __slots__ = ('masses', 'total', '_base', '_extra', '_split')
+
+    def __init__(self, base, items, weights=None):
+        extra = LengthBuckets(items, weights)
+        self.total = base.total + extra.total
+        self.masses = {}
+        self._split = {}
+        for length in base.masses.keys() | extra.masses.keys():
+            from_base = base.masses.get(length, 0.0) * base.total
+            from_extra = extra.masses.get(length, 0.0) * extra.total
+            self.masses[length] = (from_base + from_extra) / self.total
+            self._split[length] = from_base / (from_base + from_extra)
+        self._base = base
+        self._extra = extra
+
+    def sample(self, length, rng):
+        split = self._split[length]
+        if split == 1.0 or (split and rng.random() < split):
+            return self._base.sample(length, rng)
+        return self._extra.sample(length, rng)
+
+
+class Literal:
+    """A separator part: always the same text."""
+
+    __slots__ = ('text', 'masses')
+
+    def __init__(self, text):
+        self.text = text
+        self.masses = {len(text): 1.0}
+
+    def sample(self, length, rng):
+        return self.text
+
+
+class NumberRange:
+    """A uniform number from an inclusive range, bucketed by digit count."""
+
+    __slots__ = ('bounds', 'masses')
+
+    def __init__(self, low, high):
+        self.bounds = {}
+        self.masses = {}
+        span = high - low + 1
+        for digits in range(len(str(low)), len(str(high)) + 1):
+            first = max(low, 10 ** (digits - 1) if digits > 1 else 0)
+            last = min(high, 10 ** digits - 1)
+            if first <= last:
+                self.bounds[digits] = (first, last)
+                self.masses[digits] = (last - first + 1) / span
+
+    def sample(self, length, rng):
+        first, last = self.bounds[length]
+        return str(rng.randint(first, last))
+
+
+class TemplateLengths:
+    """Length distribution of a template, for drawing aliases within a window.
+
+    Each part knows how likely each of its lengths is (``masses``); suffix
+    convolutions of those give, for every part and remaining length, the
+    chance the remaining parts add up to exactly that length. A draw then
+    picks the total length, each part's length in turn, and finally a word
+    or number of that length, which is exactly an unconstrained draw
+    conditioned on the window. Every choice comes from a table built on
+    first use, so a tight window costs the same as none.
+    """
+
+    def __init__(self, parts):
+        self.parts = tuple(parts)
+        # suffix[i][r]: chance parts i.. add up to r characters
+        suffix = [[1.0]]
+        for part in reversed(self.parts):
+            after = suffix[0]
+            combined = [0.0] * (max(part.masses) + len(after))
+            for length, mass in part.masses.items():
+                for rest, rest_mass in enumerate(after):
+                    if rest_mass:
+                        combined[length + rest] += mass * rest_mass
+            suffix.insert(0, combined)
+        self.suffix = suffix
+        cumulative = [0.0]
+        for mass in suffix[0]:
+            cumulative.append(cumulative[-1] + mass)
+        self._cumulative = cumulative
+        self._totals = {}  # (low, high) -> chooser over total lengths
+        self._steps = {}  # (part, remaining) -> chooser over that part's length
+
+    def mass(self, low, high):
+        """Chance that an unconstrained draw lands within [low, high]."""
+        cumulative = self._cumulative
+        top = len(cumulative) - 1
+        return cumulative[min(high + 1, top)] - cumulative[min(low, top)]
+
+    def render(self, rng, low, high):
+        """Pieces of one draw whose total length is within [low, high]."""
+        total = self._totals.get((low, high))
+        if total is None:
+            if len(self._totals) >= WINDOW_CACHE_SIZE:
+                self._totals.clear()
+            lengths = [n for n in range(low, min(high + 1, len(self.suffix[0])))
+                       if self.suffix[0][n] > 0]
+            total = self._totals[(low, high)] = make_chooser(
+                lengths, [self.suffix[0][n] for n in lengths])
+        remaining = total.choice(rng)
+        pieces = []
+        for i, part in enumerate(self.parts):
+            step = self._steps.get((i, remaining))
+            if step is None:
+                after = self.suffix[i + 1]
+                options = [length for length in part.masses
+                           if 0 <= remaining - length < len(after) and after[remaining - length] > 0]
+                step = self._steps[(i, remaining)] = make_chooser(
+                    options, [part.masses[n] * after[remaining - n] for n in options])
+            length = step.choice(rng)
+            pieces.append(part.sample(length, rng))
+            remaining -= length
+        return pieces
@@ -0,0 +1,120 @@
+"""
+Multi-tenant word-list namespaces over shared, interned storage
+"""
+
+import sys
+import threading
+
+try:
+    from .engine import AliasEngine
+    from .wordlists import VALID_WORD
+except ImportError:  # running as a script from src/
+    from engine import AliasEngine
+    from wordlists import VALID_WORD
+
+
+def clean_words(words):
+    """Lowercase and de-duplicate tenant words like ``read_word_file`` does.
+
+    Raises ValueError naming any word that could not appear in an alias.
+    """
+    cleaned = list(dict.fromkeys(word.lower() for word in words))
+    rejected = [word for word in cleaned if not VALID_WORD.match(word)]
+    if rejected:
+        raise ValueError(f"Invalid words (letters and digits only): {', '.join(map(repr, rejected))}")
+    return cleaned
+
+
+class NamespaceRegistry:
+    """Named word-list namespaces layered over one shared base engine.
+
+    Every namespace is an ``AliasEngine`` whose tables extend the base
+    engine's: pools a tenant does not extend are the very same objects as
+    the base pools, and extended pools are views over the base words plus
+    the tenant's new words. All words are interned in one pool, so memory
+    grows with the number of unique words rather than with the number of
+    tenants. Looking up a namespace is a dict access.
+    """
+
+    def __init__(self, adjectives, nouns, verbs, word_weights=None, **engine_options):
+        self._options = engine_options
+        self._vocabulary = set()
+        self._lock = threading.Lock()
+        self.base = AliasEngine(self.intern(adjectives), self.intern(nouns), self.intern(verbs),
+                                word_weights=word_weights, **engine_options)
+        self._namespaces = {}
+
+    def intern(self, words):
+        """Return ``words`` as shared string objects, recording them in the pool."""
+        interned = [sys.intern(word) for word in words]
+        self._vocabulary.update(interned)
+        return interned
+
+    @property
+    def unique_words(self):
+        """Number of distinct strings held across the base lists and all tenants."""
+        return len(self._vocabulary)
+
+    def define(self, name, adjectives=(), nouns=(), verbs=(), plus_words=None, word_weights=None):
+        """Create or replace a namespace adding tenant words to the base lists.
+
+        Words are validated like the bundled word files; a ValueError names
+        any that are not plain letters and digits.
+        """
+        adjectives, nouns, verbs = clean_words(adjectives), clean_words(nouns), clean_words(verbs)
+        plus_words = clean_words(plus_words) if plus_words else None
+        if word_weights:
+            word_weights = {word.lower(): weight for word, weight in word_weights.items()}
+        engine = AliasEngine(
+            self.intern(adjectives), self.intern(nouns), self.intern(verbs),
+            plus_words=self.intern(plus_words) if plus_words else None,
+            word_weights=word_weights, base=self.base, **self._options
+        )
+        with self._lock:
+            self._namespaces[name] = engine
+        return engine
+
+    def get(self, name=None):
+        """Engine for a namespace, or the base engine for None."""
+        if name is None:
+            return self.base
+        try:
+            return self._namespaces[name]
+        except KeyError:
+            raise KeyError(f"Unknown word-list namespace: {name}") from None
+
+    def __contains__(self, name):
+        return name in self._namespaces
+
+    def __len__(self):
+        return len(self._namespaces)
+
+    def names(self):
+        return list(self._namespaces)
+
+    def remove(self, name):
+        """Drop a namespace; its interned words stay in the shared pool."""
+        with self._lock:
+            self._namespaces.pop(name, None)
+
+    def set_blocklist(self, blocklist):
+        """Apply a ``Blocklist`` (or None) to the base engine and every namespace."""
+        self._options['blocklist'] = blocklist
+        self.base.set_blocklist(blocklist)
+        with self._lock:
+            engines = list(self._namespaces.values())
+        for engine in engines:
+            engine.set_blocklist(blocklist)
+
+    def reload(self, adjectives, nouns, verbs, word_weights=None):
+        """Replace the shared base lists and rebuild every namespace on top.
+
+        Has the same signature as ``AliasEngine.reload``, so a registry can
+        be attached to a ``WordListSource`` for hot reloading.
+        """
+        self.base.reload(self.intern(adjectives), self.intern(nouns), self.intern(verbs),
+                         word_weights)
+        with self._lock:
+            engines = list(self._namespaces.values())
+        for engine in engines:
+            engine.refresh()
@@ -0,0 +1,278 @@
+"""
+Pre-generated alias pool with concurrent leasing
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+
+DEFAULT_CAPACITY = 1000
+DEFAULT_LOW_WATER = 250
+DEFAULT_LEASE_SECONDS = 300
+REFILL_CHUNK = 256  # aliases written per transaction, so leases never wait long
+BUSY_TIMEOUT_MS = 5000
+
+# An alias is 'ready' once generated, 'leased' while a caller holds it,
+# 'committed' once used for good and 'returned' when a lease was given back
+# or expired. Returned aliases can be leased again.
+STATUSES = ('ready', 'leased', 'committed', 'returned')
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS pool_aliases ("
+    "id INTEGER PRIMARY KEY, "
+    "mailbox TEXT NOT NULL, "
+    "alias TEXT NOT NULL UNIQUE, "
+    "status TEXT NOT NULL, "
+    "lease TEXT, "
+    "expires_at REAL, "
+    "updated_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS pool_available ON pool_aliases (mailbox, id) "
+    "WHERE status IN ('ready', 'returned')",
+    "CREATE INDEX IF NOT EXISTS pool_leased ON pool_aliases (expires_at) "
+    "WHERE status = 'leased'",
+    "CREATE TABLE IF NOT EXISTS pool_runs ("
+    "mailbox TEXT PRIMARY KEY, "
+    "continuation TEXT NOT NULL, "
+    "exhausted INTEGER NOT NULL DEFAULT 0)",
+)
+
+# Oldest first: returned aliases were leased before, so they go out again first
+LEASE_SQL = (
+    "UPDATE pool_aliases SET status = 'leased', lease = ?, expires_at = ?, updated_at = ? "
+    "WHERE id = (SELECT id FROM pool_aliases WHERE mailbox = ? AND status IN ('ready', 'returned') "
+    "ORDER BY id LIMIT 1) "
+    "RETURNING alias"
+)
+# RETURNING needs SQLite 3.35; older libraries select and update in one write transaction
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+NEXT_AVAILABLE_SQL = (
+    "SELECT id, alias FROM pool_aliases WHERE mailbox = ? AND status IN ('ready', 'returned') "
+    "ORDER BY id LIMIT 1"
+)
+
+Lease = namedtuple('Lease', ('alias', 'token', 'expires_at'))
+
+
+class AliasPool:
+    """Aliases for one mailbox generated ahead of time into a SQLite file.
+
+    ``lease()`` hands out an alias with a single indexed UPDATE (a SELECT
+    and UPDATE in one write transaction before SQLite 3.35), so any
+    number of threads and processes can share one pool file; SQLite's write
+    lock is the only lock. A leased alias is either ``commit``-ted or
+    ``release``-d; leases not settled within ``lease_seconds`` (say the
+    caller crashed) are returned to the pool by ``reclaim``.
+
+    Aliases come from one resumable mixed run of ``engine``, whose
+    continuation token is stored in the same transaction as each batch, so
+    the pool carries on after a restart without repeating an alias.
+    ``start()`` runs a background thread that tops the pool back up to
+    ``capacity`` whenever it falls below ``low_water``.
+    """
+
+    def __init__(self, path, base_email, engine, mix=None, capacity=DEFAULT_CAPACITY,
+                 low_water=DEFAULT_LOW_WATER, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 interval=1.0):
+        if not 0 <= low_water < capacity:
+            raise ValueError("low_water must be below capacity")
+        self.path = os.fspath(path)
+        self.base_email = base_email
+        self.engine = engine
+        self.mix = mix
+        self.capacity = capacity
+        self.low_water = low_water
+        self.lease_seconds = lease_seconds
+        self.interval = interval
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._refill_lock = threading.Lock()
+        self._run = None
+        self._token = None  # continuation this process last stored
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._leases = 0
+        self._wake_every = max(1, (capacity - low_water) // 8)
+
+        conn = self._connect()
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def start(self):
+        """Start the background refill thread (once); returns the pool."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refill_loop, name='alias-pool-refill',
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the refill thread and close every connection."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _refill_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            self.reclaim()
+            if self.available() < self.low_water:
+                self.refill()
+
+    def lease(self):
+        """Lease the next alias as a ``Lease``, or None once the mailbox is exhausted.
+
+        An empty pool is refilled inline, so leasing never fails while
+        aliases can still be generated.
+        """
+        conn = self._connect()
+        while True:
+            now = time.time()
+            token = os.urandom(8).hex()
+            row = self._take(conn, token, now + self.lease_seconds, now)
+            if row is not None:
+                self._leases += 1
+                if self._leases % self._wake_every == 0:
+                    self._wake.set()
+                return Lease(row[0], token, now + self.lease_seconds)
+            # Another thread may have refilled (and this one added nothing)
+            # between the UPDATE and the refill; only an empty pool is the end
+            if not self.refill() and not self.available():
+                return None
+
+    def _take(self, conn, token, expires_at, now):
+        """Mark the next available alias as leased; returns (alias,) or None."""
+        if HAS_RETURNING:
+            return conn.execute(LEASE_SQL, (token, expires_at, now, self.base_email)).fetchone()
+        # BEGIN IMMEDIATE takes the write lock first, so no other lease can
+        # pick the same row between the SELECT and the UPDATE
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(NEXT_AVAILABLE_SQL, (self.base_email,)).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE pool_aliases SET status = 'leased', lease = ?, expires_at = ?, "
+                    "updated_at = ? WHERE id = ?", (token, expires_at, now, row[0]))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return None if row is None else (row[1],)
+
+    def _settle(self, lease, status):
+        cursor = self._connect().execute(
+            "UPDATE pool_aliases SET status = ?, lease = NULL, expires_at = NULL, updated_at = ? "
+            "WHERE alias = ? AND lease = ? AND status = 'leased'",
+            (status, time.time(), lease.alias, lease.token))
+        return cursor.rowcount == 1
+
+    def commit(self, lease):
+        """Mark a leased alias as used for good.
+
+        Returns False if the lease had already expired and been reclaimed.
+        """
+        return self._settle(lease, 'committed')
+
+    def release(self, lease):
+        """Give a leased alias back, to be leased again first."""
+        return self._settle(lease, 'returned')
+
+    def reclaim(self):
+        """Return expired leases to the pool; returns how many there were."""
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE pool_aliases SET status = 'returned', lease = NULL, expires_at = NULL, "
+            "updated_at = ? WHERE status = 'leased' AND expires_at < ? AND mailbox = ?",
+            (now, now, self.base_email))
+        return cursor.rowcount
+
+    def available(self):
+        """Aliases ready to lease."""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM pool_aliases WHERE mailbox = ? AND status IN ('ready', 'returned')",
+            (self.base_email,)).fetchone()[0]
+
+    def stats(self):
+        """Count of aliases in each status."""
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(self._connect().execute(
+            "SELECT status, COUNT(*) FROM pool_aliases WHERE mailbox = ? GROUP BY status",
+            (self.base_email,)))
+        return counts
+
+    def refill(self):
+        """Top the pool up to ``capacity``; returns how many aliases were added."""
+        with self._refill_lock:
+            conn = self._connect()
+            added = 0
+            while True:
+                missing = self.capacity - self.available()
+                if missing <= 0:
+                    return added
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    run = self._current_run(conn)
+                    aliases = [] if run is None else run.take(min(missing, REFILL_CHUNK))
+                    now = time.time()
+                    inserted = conn.executemany(
+                        "INSERT OR IGNORE INTO pool_aliases (mailbox, alias, status, updated_at) "
+                        "VALUES (?, ?, 'ready', ?)",
+                        [(self.base_email, alias, now) for alias in aliases]).rowcount
+                    if run is not None:
+                        self._token = run.continuation()
+                        conn.execute(
+                            "INSERT OR REPLACE INTO pool_runs (mailbox, continuation, exhausted) "
+                            "VALUES (?, ?, ?)", (self.base_email, self._token, int(not aliases)))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                added += max(inserted, 0)
+                if not aliases:
+                    return added  # the mailbox has no aliases left
+
+    def _current_run(self, conn):
+        """The stored run, reloaded if another process refilled since; None if exhausted."""
+        row = conn.execute("SELECT continuation, exhausted FROM pool_runs WHERE mailbox = ?",
+                           (self.base_email,)).fetchone()
+        if row is None:
+            if self._run is None:
+                self._run = self.engine.mixed_run(self.base_email, self.mix)
+        elif row[1]:
+            return None
+        elif self._run is None or row[0] != self._token:
+            self._run = self.engine.mixed_run(self.base_email, continuation=row[0])
+        return self._run
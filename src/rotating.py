@@ -0,0 +1,179 @@
+"""
+Stateless, HMAC-derived rotating aliases
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+
+try:
+    from .deadline import Deadline, GenerationResult, encode_token
+    from .engine import split_email
+except ImportError:  # running as a script from src/
+    from deadline import Deadline, GenerationResult, encode_token
+    from engine import split_email
+
+
+DIGITS36 = '0123456789abcdefghijklmnopqrstuvwxyz'
+DERIVE_BATCH = 256  # aliases derived between deadline checks
+
+
+def to_base36(number):
+    if number == 0:
+        return '0'
+    out = []
+    while number:
+        number, digit = divmod(number, 36)
+        out.append(DIGITS36[digit])
+    return ''.join(reversed(out))
+
+
+class RotatingAliases:
+    """Aliases derived as a keyed function of (mailbox, epoch, index).
+
+    Nothing has to be stored: any alias can be regenerated from its index,
+    and an inbound address is checked with one HMAC per accepted epoch.
+    ``mode='plus'`` yields ``user+word-<index><mac>@domain``; ``mode='local'``
+    replaces the whole local part with ``adjnoun-<index><mac>``, in which
+    case ``verify`` needs the base mailbox since it is not in the address.
+
+    Epochs are ``period`` seconds long and aliases from the previous
+    ``grace`` epochs still verify, which gives the rotation schedule.
+    """
+
+    def __init__(self, key, engine, mode='plus', period=86400, grace=1,
+                 mac_length=8, clock=time.time):
+        if mode not in ('plus', 'local'):
+            raise ValueError(f"Unknown rotating alias mode: {mode}")
+        if not isinstance(period, (int, float)) or period <= 0:
+            raise ValueError("period must be a positive number of seconds")
+        if not 4 <= mac_length <= 32:
+            raise ValueError("mac_length must be between 4 and 32")
+        self.key = key.encode('utf-8') if isinstance(key, str) else bytes(key)
+        self.mode = mode
+        self.period = period
+        self.grace = grace
+        self.mac_length = mac_length
+        self.clock = clock
+        self._mac_bytes = (mac_length * 5 + 7) // 8
+        # Snapshot word lists as tuples so indexes stay stable
+        self.plus_words = tuple(engine.plus_words)
+        self.adjectives = tuple(engine.adjectives)
+        self.nouns = tuple(engine.nouns)
+
+    def epoch(self, now=None):
+        """Epoch number for a timestamp (default: now)."""
+        return int((self.clock() if now is None else now) // self.period)
+
+    def _digest(self, base_email, epoch, index):
+        message = f"{base_email.lower()}\x00{epoch}\x00{index}".encode('utf-8')
+        return hmac.digest(self.key, message, hashlib.sha256)
+
+    def _mac(self, digest):
+        encoded = base64.b32encode(digest[:self._mac_bytes]).decode('ascii')
+        return encoded[:self.mac_length].lower()
+
+    def _local(self, username, digest, index):
+        selector = int.from_bytes(digest[-8:], 'big')
+        suffix = f"{to_base36(index)}{self._mac(digest)}"
+        if self.mode == 'plus':
+            word = self.plus_words[selector % len(self.plus_words)]
+            return f"{username}+{word}-{suffix}"
+        adjective = self.adjectives[selector % len(self.adjectives)]
+        noun = self.nouns[(selector // len(self.adjectives)) % len(self.nouns)]
+        return f"{adjective}{noun}-{suffix}"
+
+    def derive(self, base_email, index, epoch=None):
+        """The alias for ``index`` in ``epoch`` (default: current epoch)."""
+        parts = split_email(base_email)
+        if parts is None:
+            return None
+        username, domain = parts
+        if epoch is None:
+            epoch = self.epoch()
+        return f"{self._local(username, self._digest(base_email, epoch, index), index)}@{domain}"
+
+    def derive_many(self, base_email, count, epoch=None, start=0, deadline_ms=None):
+        """Derive ``count`` consecutive aliases in one pass.
+
+        With ``deadline_ms`` the result may be partial; its continuation
+        token records the next index, and resuming it needs the same key.
+        """
+        parts = split_email(base_email)
+        if parts is None:
+            return GenerationResult()
+        username, domain = parts
+        if epoch is None:
+            epoch = self.epoch()
+
+        key = self.key
+        prefix = f"{base_email.lower()}\x00{epoch}\x00".encode('utf-8')
+        digest = hmac.digest
+        local = self._local
+        sha256 = hashlib.sha256
+        deadline = Deadline.from_ms(deadline_ms, stride=1)
+        aliases = GenerationResult()
+        end = start + count
+        index = start
+        while index < end:
+            if deadline is not None and deadline.expired():
+                aliases.partial = True
+                aliases.continuation = encode_token({
+                    'op': 'rotating', 'email': base_email, 'count': end - index,
+                    'start': index, 'epoch': epoch, 'mode': self.mode, 'period': self.period,
+                })
+                break
+            stop = min(end, index + DERIVE_BATCH)
+            aliases.extend(
+                f"{local(username, digest(key, prefix + str(i).encode('ascii'), sha256), i)}@{domain}"
+                for i in range(index, stop)
+            )
+            index = stop
+        return aliases
+
+    def verify(self, alias, base_email=None, now=None):
+        """Check that ``alias`` was derived by this key, without any lookup.
+
+        In plus mode the base mailbox is recovered from the alias. Returns
+        the (epoch, index) the alias was derived for, or None. Aliases keep
+        verifying after the word lists change.
+        """
+        parts = split_email(alias)
+        if parts is None:
+            return None
+        local, domain = parts
+
+        if self.mode == 'plus':
+            username, plus, tag = local.partition('+')
+            if not plus:
+                return None
+            base = f"{username}@{domain}"
+        else:
+            if base_email is None:
+                raise ValueError("base_email is required to verify local-mode aliases")
+            base = base_email
+            base_parts = split_email(base_email)
+            if base_parts is None or base_parts[1].lower() != domain.lower():
+                return None
+            tag = local
+
+        word, dash, suffix = tag.rpartition('-')
+        if not word or len(suffix) <= self.mac_length:
+            return None
+        index_text = suffix[:-self.mac_length]
+        try:
+            index = int(index_text, 36)
+        except ValueError:
+            return None
+        if to_base36(index) != index_text:
+            return None  # non-canonical index encoding
+
+        # Only the index and MAC are checked: the word in front of them is
+        # picked from the word lists, which may have been reloaded since
+        mac = suffix[-self.mac_length:]
+        current = self.epoch(now)
+        for epoch in range(current, current - self.grace - 1, -1):
+            if hmac.compare_digest(self._mac(self._digest(base, epoch, index)), mac):
+                return epoch, index
+        return None
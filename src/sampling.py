@@ -0,0 +1,140 @@
+"""
+Weighted sampling helpers backed by Vose alias tables
+"""
+
+from collections.abc import Sequence
+
+
+class AliasTable:
+    """Vose alias table: O(n) to build, O(1) per weighted draw."""
+
+    __slots__ = ('size', 'prob', 'alias')
+
+    def __init__(self, weights):
+        weights = [float(w) for w in weights]
+        if not weights:
+            raise ValueError("AliasTable needs at least one weight")
+        if any(w < 0 for w in weights):
+            raise ValueError("Weights must be non-negative")
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("At least one weight must be positive")
+
+        n = len(weights)
+        scaled = [w * n / total for w in weights]
+        prob = [0.0] * n
+        alias = list(range(n))
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+
+        # Whatever is left is full up to rounding error
+        for i in large + small:
+            prob[i] = 1.0
+
+        self.size = n
+        self.prob = prob
+        self.alias = alias
+
+    def sample(self, rng):
+        """Draw an index using a single uniform variate."""
+        u = rng.random() * self.size
+        i = int(u)
+        if i >= self.size:  # guard against u == size after rounding
+            i = self.size - 1
+        return i if u - i < self.prob[i] else self.alias[i]
+
+
+class LayeredSequence(Sequence):
+    """Read-only view of ``base`` followed by ``extra`` without copying ``base``."""
+
+    __slots__ = ('base', 'extra', '_split')
+
+    def __init__(self, base, extra):
+        self.base = base
+        self.extra = tuple(extra)
+        self._split = len(base)
+
+    def __len__(self):
+        return self._split + len(self.extra)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        if index < 0:
+            index += len(self)
+        if index < self._split:
+            return self.base[index]
+        return self.extra[index - self._split]
+
+    def __iter__(self):
+        yield from self.base
+        yield from self.extra
+
+    def __eq__(self, other):
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+
+class UniformChoice:
+    """Uniform choice over a fixed sequence."""
+
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        self.items = items if isinstance(items, (tuple, LayeredSequence)) else tuple(items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def choice(self, rng):
+        return rng.choice(self.items)
+
+
+class WeightedChoice:
+    """Weighted choice over items; the alias table is rebuilt only when weights change."""
+
+    __slots__ = ('items', '_weights', '_table')
+
+    def __init__(self, items, weights=None):
+        self.items = tuple(items)
+        self._weights = None
+        self._table = None
+        self.set_weights(weights if weights is not None else [1.0] * len(self.items))
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def weights(self):
+        return self._weights
+
+    def set_weights(self, weights):
+        """Replace the weights, rebuilding the table only if they differ."""
+        weights = tuple(float(w) for w in weights)
+        if len(weights) != len(self.items):
+            raise ValueError("Need exactly one weight per item")
+        if weights != self._weights:
+            self._table = AliasTable(weights)
+            self._weights = weights
+
+    def choice(self, rng):
+        return self.items[self._table.sample(rng)]
+
+
+def make_chooser(items, weights=None):
+    """Return a UniformChoice, or a WeightedChoice if any weight differs."""
+    if weights is None or len(set(weights)) <= 1:
+        return UniformChoice(items)
+    return WeightedChoice(items, weights)
@@ -0,0 +1,103 @@
+"""
+Cryptographically secure random source with batched entropy draws
+"""
+
+import os
+import random
+import threading
+
+
+_WORD = 0x100000000  # 2 ** 32
+
+
+class SecureRandom(random.Random):
+    """Drop-in ``random.Random`` replacement fed by OS entropy.
+
+    Entropy is read from ``os.urandom`` in large blocks and split into
+    32-bit words, so individual draws never touch the OS. Bounded integers
+    use Lemire's multiply-shift method, which is unbiased and only rejects
+    a draw with probability below n / 2**32. Like ``random.SystemRandom``,
+    the generator cannot be seeded or have its state saved.
+
+    Words are handed out through a list iterator, whose ``next`` is atomic
+    under the GIL, so one instance can be shared between threads without
+    ever reusing entropy.
+    """
+
+    def __init__(self, block_size=1 << 16):
+        self.block_size = block_size - block_size % 4 or 4
+        self._refill_lock = threading.Lock()
+        self._words = iter(())
+        super().__init__()
+
+    def _refill(self):
+        with self._refill_lock:
+            block = memoryview(os.urandom(self.block_size)).cast('I').tolist()
+            self._words = iter(block)
+
+    def _word(self):
+        """Next uniformly distributed 32-bit word."""
+        try:
+            return next(self._words)
+        except StopIteration:
+            self._refill()
+            return next(self._words)
+
+    def _below(self, n):
+        """Unbiased integer in [0, n)."""
+        if n <= 0:
+            raise ValueError("n must be positive")
+        if n > _WORD:
+            return self._randbelow_with_getrandbits(n)
+        word = self._word
+        while True:
+            m = word() * n
+            low = m & 0xFFFFFFFF
+            if low >= n or low >= (_WORD - n) % n:
+                return m >> 32
+
+    _randbelow = _below
+
+    def random(self):
+        """Float in [0.0, 1.0) with 53 bits of entropy."""
+        a = self._word() >> 5
+        b = self._word() >> 6
+        return (a * 67108864 + b) * (1.0 / 9007199254740992)
+
+    def getrandbits(self, k):
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        if k <= 32:
+            return self._word() >> (32 - k)
+        words = (k + 31) // 32
+        x = 0
+        for _ in range(words):
+            x = (x << 32) | self._word()
+        return x >> (words * 32 - k)
+
+    def randbytes(self, n):
+        return os.urandom(n)
+
+    def choice(self, seq):
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[self._below(len(seq))]
+
+    def randint(self, a, b):
+        return a + self._below(b - a + 1)
+
+    def randrange(self, start, stop=None, step=1):
+        if stop is None:
+            return self._below(start)
+        if step == 1:
+            return start + self._below(stop - start)
+        return super().randrange(start, stop, step)
+
+    def seed(self, *args, **kwargs):
+        """No-op: OS entropy cannot be seeded."""
+        return None
+
+    def _notimplemented(self, *args, **kwargs):
+        raise NotImplementedError('SecureRandom state cannot be saved or restored')
+
+    getstate = setstate = _notimplemented
@@ -0,0 +1,184 @@
+"""
+Distinct plus tags drawn from a word list without retry loops
+"""
+
+import hashlib
+from array import array
+from functools import lru_cache
+
+try:
+    from .sampling import AliasTable
+except ImportError:  # running as a script from src/
+    from sampling import AliasTable
+
+
+# Each word yields: word, word2, word10..word99, word100..word999
+TWO_DIGIT = 90
+THREE_DIGIT = 900
+VARIANTS_PER_WORD = 2 + TWO_DIGIT + THREE_DIGIT
+
+
+def plus_capacity(words):
+    """Upper bound on the distinct tags a word list can produce."""
+    return VARIANTS_PER_WORD * len(set(words))
+
+
+def variant_span(word, lengths=None):
+    """The variants ``[first, stop)`` of ``word`` whose length is within ``lengths``.
+
+    Variant lengths never decrease (word, word2, two then three digits), so
+    the ones fitting a (low, high) window are always a single run.
+    """
+    if lengths is None:
+        return 0, VARIANTS_PER_WORD
+    low, high = lengths
+    first = stop = 0
+    runs = ((0, 1), (1, 2), (2, 2 + TWO_DIGIT), (2 + TWO_DIGIT, VARIANTS_PER_WORD))
+    for extra, (start, end) in enumerate(runs):
+        if low <= len(word) + extra <= high:
+            if not stop:
+                first = start
+            stop = end
+    return first, stop
+
+
+@lru_cache(maxsize=1024)
+def _suffix_order(key, word, first, size):
+    """A keyed pseudorandom permutation of ``first .. first + size - 1`` for one word.
+
+    Suffixes are sorted by a keyed BLAKE2b hash, so each word gets its own
+    order and tags seen for one word say nothing about another's. Orders
+    are cached, since every resume of a run restores the same key.
+    """
+    prefix = f"{word}:".encode()
+    def rank(suffix):
+        return hashlib.blake2b(prefix + str(suffix).encode(), key=key, digest_size=8).digest()
+    return array('H', sorted(range(first, first + size), key=rank))
+
+
+class TagPool:
+    """Hands out unused plus tags, walking each word's variants in turn.
+
+    A word is tried as-is first, then with ``2``, then with two and three
+    digit suffixes in a random order of its own, derived from a per-pool
+    key drawn from ``rng`` so ``restore`` can rebuild it. Words whose
+    variants are used up are dropped in O(1), so the pool never loops on a
+    saturated word, and ``take`` only returns None once every variant is
+    taken. With ``lengths`` (low, high) only tags of that length are handed
+    out; each word simply starts and stops at the edges of its fitting
+    variants.
+    """
+
+    def __init__(self, words, rng, used=None, weights=None, lengths=None):
+        self.words = list(dict.fromkeys(words))
+        self.rng = rng
+        self.used = used if used is not None else set()
+        self._index = {word: i for i, word in enumerate(self.words)}
+        spans = [variant_span(word, lengths) for word in self.words]
+        self._starts = [first for first, _ in spans]
+        self._positions = list(self._starts)
+        self._ends = [stop for _, stop in spans]
+        self._active = [i for i, (first, stop) in enumerate(spans) if first < stop]
+        self._slot = [0] * len(self.words)  # word -> position in _active
+        for slot, i in enumerate(self._active):
+            self._slot[i] = slot
+        self._weights = None
+        self._table = None
+        if weights is not None:
+            weights = [weights.get(word, 1.0) for word in self.words]
+            if len(set(weights)) > 1:
+                self._weights = weights
+                self._rebuild()
+        self._key = rng.getrandbits(128).to_bytes(16, 'big')
+        self._orders = {}  # (word, digits) -> suffix order, built on first use
+
+    def __len__(self):
+        return len(self._active)
+
+    def state(self):
+        """Per-word positions and the suffix-order key, for ``restore``."""
+        return {'positions': list(self._positions), 'key': self._key.hex()}
+
+    @classmethod
+    def restore(cls, words, rng, state, used=None, weights=None, lengths=None):
+        """Rebuild a pool from ``state()`` so it carries on where it stopped.
+
+        Every tag the earlier pool walked past is marked as used, so the
+        restored pool never hands out a tag twice.
+        """
+        pool = cls(words, rng, used, weights, lengths)
+        pool._key = bytes.fromhex(state['key'])
+        for i, position in enumerate(state['positions']):
+            first = pool._starts[i]
+            if first < pool._ends[i] <= position:
+                pool._drop(i)
+            pool._positions[i] = max(position, first)
+        pool.used.update(pool.walked())
+        return pool
+
+    def walked(self):
+        """Every tag the pool has walked past, whether handed out or skipped."""
+        for i, word in enumerate(self.words):
+            for k in range(self._starts[i], self._positions[i]):
+                yield self._variant(word, k)
+
+    def _rebuild(self):
+        active = [self._weights[i] for i in self._active]
+        self._table = AliasTable(active) if active and sum(active) > 0 else None
+
+    def _variant(self, word, k):
+        if k == 0:
+            return word
+        if k == 1:
+            return f"{word}2"
+        k -= 2
+        if k < TWO_DIGIT:
+            return f"{word}{self._order(word, 2)[k]}"
+        return f"{word}{self._order(word, 3)[k - TWO_DIGIT]}"
+
+    def _order(self, word, digits):
+        order = self._orders.get((word, digits))
+        if order is None:
+            if digits == 2:
+                order = _suffix_order(self._key, word, 10, TWO_DIGIT)
+            else:
+                order = _suffix_order(self._key, word, 100, THREE_DIGIT)
+            self._orders[(word, digits)] = order
+        return order
+
+    def _drop(self, i):
+        """Remove word ``i`` from the active set."""
+        slot = self._slot[i]
+        last = self._active.pop()
+        if last != i:
+            self._active[slot] = last
+            self._slot[last] = slot
+        if self._weights is not None:
+            self._rebuild()
+
+    def _pick(self):
+        if self._table is not None:
+            return self._active[self._table.sample(self.rng)]
+        return self._active[self.rng.randrange(len(self._active))]
+
+    def take(self, word=None):
+        """Return an unused tag, preferring ``word`` if given; None when exhausted."""
+        i = self._index.get(word) if word is not None else None
+        if i is not None and self._positions[i] >= self._ends[i]:
+            i = None
+        while self._active:
+            if i is None:
+                if self._weights is not None and self._table is None:
+                    return None  # only zero-weight words remain
+                i = self._pick()
+            k = self._positions[i]
+            self._positions[i] = k + 1
+            if k + 1 >= self._ends[i]:
+                self._drop(i)
+            tag = self._variant(self.words[i], k)
+            if tag not in self.used:
+                self.used.add(tag)
+                return tag
+            if self._positions[i] >= self._ends[i]:
+                i = None
+        return None
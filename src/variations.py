@@ -0,0 +1,257 @@
+"""
+Explicit, enumerable variation spaces for a base username
+"""
+
+import math
+import string
+from bisect import bisect_right
+from collections import deque
+
+try:
+    from .sampling import AliasTable
+except ImportError:  # running as a script from src/
+    from sampling import AliasTable
+
+
+VARIATION_SUFFIXES = ('pro', 'mail', 'contact', 'info', 'official')
+LETTERS = string.ascii_lowercase
+
+
+class VariationSpace:
+    """All variations one strategy can produce, addressable by index.
+
+    ``lengths`` lists (stop, length) runs: indices up to each ``stop`` render
+    local parts of that length, which lets ``within`` cut a space down to
+    a length window without rendering anything.
+    """
+
+    __slots__ = ('name', 'size', 'render', 'lengths')
+
+    def __init__(self, name, size, render, lengths):
+        self.name = name
+        self.size = size
+        self.render = render  # index -> local part
+        self.lengths = lengths
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return self.render(index)
+
+    def within(self, low, high):
+        """The variations of this space whose length is within [low, high]."""
+        starts = []  # first original index of each kept run
+        stops = []  # end of each kept run, in the new numbering
+        lengths = []
+        start = size = 0
+        for stop, length in self.lengths:
+            if low <= length <= high:
+                starts.append(start)
+                size += stop - start
+                stops.append(size)
+                lengths.append((size, length))
+            start = stop
+        if size == self.size:
+            return self
+        render = self.render
+        if len(starts) == 1:
+            first = starts[0]
+            return VariationSpace(self.name, size, lambda i: render(first + i), lengths)
+
+        def render_kept(i):
+            run = bisect_right(stops, i)
+            return render(starts[run] + i - (stops[run - 1] if run else 0))
+
+        return VariationSpace(self.name, size, render_kept, lengths)
+
+
+def _number_runs(first, last, extra):
+    """Length runs for the numbers first..last, each with ``extra`` other characters."""
+    runs = []
+    for digits in range(len(str(first)), len(str(last)) + 1):
+        top = min(last, 10 ** digits - 1)
+        runs.append((top - first + 1, extra + digits))
+    return tuple(runs)
+
+
+def build_variation_spaces(username):
+    """Build the non-empty variation spaces for a username, in strategy order."""
+    u = username
+    n = len(u)
+    spaces = []
+
+    # Add a dot in the username (only if no dots exist)
+    if '.' not in u and n > 2:
+        spaces.append(VariationSpace('dots', n - 1, lambda i: f"{u[:i + 1]}.{u[i + 1:]}",
+                                     ((n - 1, n + 1),)))
+    # Add numbers at the end
+    spaces.append(VariationSpace('number', 999, lambda i: f"{u}{i + 1}", _number_runs(1, 999, n)))
+    # Add year
+    spaces.append(VariationSpace('year', 6, lambda i: f"{u}{2020 + i}", ((6, n + 4),)))
+    # Add underscore and number
+    spaces.append(VariationSpace('underscore', 99, lambda i: f"{u}_{i + 1}",
+                                 _number_runs(1, 99, n + 1)))
+    # Prepend number
+    spaces.append(VariationSpace('prefix', 9, lambda i: f"{i + 1}{u}", ((9, n + 1),)))
+    # Add common suffixes
+    spaces.append(VariationSpace('suffix', len(VARIATION_SUFFIXES),
+                                 lambda i: f"{u}.{VARIATION_SUFFIXES[i]}",
+                                 tuple((i + 1, n + 1 + len(suffix))
+                                       for i, suffix in enumerate(VARIATION_SUFFIXES))))
+    # Double the username
+    spaces.append(VariationSpace('double', 1, lambda i: u + u, ((1, 2 * n),)))
+    # Reverse username (nothing new for palindromes)
+    if u[::-1] != u:
+        spaces.append(VariationSpace('reverse', 1, lambda i: u[::-1], ((1, n),)))
+    # Add dots and numbers
+    if n > 3:
+        mid = n // 2
+        spaces.append(VariationSpace('dots_number', 99, lambda i: f"{u[:mid]}.{u[mid:]}{i + 1}",
+                                     _number_runs(1, 99, n + 1)))
+    else:
+        spaces.append(VariationSpace('dots_number', 900, lambda i: f"{u}.{i + 100}",
+                                     ((900, n + 4),)))
+    # Mix letters with numbers
+    spaces.append(VariationSpace('letter_number', len(LETTERS) * 90,
+                                 lambda i: f"{u}{LETTERS[i // 90]}{10 + i % 90}",
+                                 ((len(LETTERS) * 90, n + 3),)))
+
+    return spaces
+
+
+class _Cursor:
+    """Walks one space in a random affine order: (a * k + b) mod size."""
+
+    __slots__ = ('space', 'position', 'step', 'offset')
+
+    def __init__(self, space, rng):
+        self.space = space
+        self.position = 0
+        size = space.size
+        step = rng.randint(1, size) if size > 1 else 1
+        while math.gcd(step, size) != 1:
+            step += 1
+        self.step = step
+        self.offset = rng.randrange(size)
+
+    def exhausted(self):
+        return self.position >= self.space.size
+
+    def next(self):
+        index = (self.step * self.position + self.offset) % self.space.size
+        self.position += 1
+        return self.space.render(index)
+
+
+class VariationStream:
+    """Lazily yield distinct variations across all strategy spaces.
+
+    ``order='balanced'`` round-robins over the strategies, ``'weighted'``
+    picks a strategy per draw in proportion to ``weights`` (strategy name
+    to weight, defaulting to each space's size). Exhausted strategies are
+    dropped as soon as they run out.
+    """
+
+    def __init__(self, username, domain, spaces, rng, order='balanced', weights=None):
+        if order not in ('balanced', 'weighted'):
+            raise ValueError(f"Unknown variation order: {order}")
+        self.username = username
+        self.domain = domain
+        self.order = order
+        self.rng = rng
+        self.total = sum(space.size for space in spaces)
+        self._seen = {username}
+        self._cursors = [_Cursor(space, rng) for space in spaces]
+        self._start(weights)
+
+    def _start(self, weights):
+        cursors = [c for c in self._cursors if not c.exhausted()]
+        if self.order == 'balanced':
+            self._queue = deque(cursors)
+        else:
+            weights = weights or {}
+            self._active = [c for c in cursors if weights.get(c.space.name, c.space.size) > 0]
+            self._weights = [weights.get(c.space.name, c.space.size) for c in self._active]
+            self._rebuild()
+
+    def state(self):
+        """Where every strategy stands, for ``restore``."""
+        if self.order == 'balanced':
+            # Keep the round-robin order: queued cursors first
+            queued = list(self._queue)
+            cursors = queued + [c for c in self._cursors if c not in queued]
+            weights = None
+        else:
+            cursors = self._cursors
+            # Dropped strategies get weight 0 so they stay dropped
+            weights = dict.fromkeys((c.space.name for c in cursors), 0)
+            weights.update((c.space.name, w) for c, w in zip(self._active, self._weights))
+        return {
+            'order': self.order,
+            'cursors': [[c.space.name, c.position, c.step, c.offset] for c in cursors],
+            'weights': weights,
+        }
+
+    @classmethod
+    def restore(cls, username, domain, spaces, rng, state):
+        """Rebuild a stream from ``state()`` so it carries on where it stopped.
+
+        Variations the earlier stream already produced are rendered again
+        into the seen set, so none of them is repeated.
+        """
+        stream = cls(username, domain, (), rng, order=state['order'])
+        stream.total = sum(space.size for space in spaces)
+        by_name = {space.name: space for space in spaces}
+        for name, position, step, offset in state['cursors']:
+            cursor = _Cursor.__new__(_Cursor)
+            cursor.space = by_name[name]
+            cursor.position, cursor.step, cursor.offset = position, step, offset
+            for k in range(position):
+                stream._seen.add(cursor.space.render((step * k + offset) % cursor.space.size))
+            stream._cursors.append(cursor)
+        stream._start(state['weights'])
+        return stream
+
+    def produced(self):
+        """Every alias the stream has produced, including restored ones."""
+        return (f"{local}@{self.domain}" for local in self._seen if local != self.username)
+
+    def _rebuild(self):
+        self._table = AliasTable(self._weights) if self._active else None
+
+    def _next_cursor(self):
+        if self.order == 'balanced':
+            queue = self._queue
+            while queue:
+                cursor = queue.popleft()
+                if not cursor.exhausted():
+                    queue.append(cursor)
+                    return cursor
+            return None
+
+        while self._active:
+            slot = self._table.sample(self.rng)
+            cursor = self._active[slot]
+            if not cursor.exhausted():
+                return cursor
+            # Drop the exhausted strategy; weights change only here
+            del self._active[slot]
+            del self._weights[slot]
+            self._rebuild()
+        return None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            cursor = self._next_cursor()
+            if cursor is None:
+                raise StopIteration
+            local = cursor.next()
+            if local not in self._seen:
+                self._seen.add(local)
+                return f"{local}@{self.domain}"
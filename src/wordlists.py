@@ -0,0 +1,177 @@
+"""
+Word list loading, validation and hot reloading
+"""
+
+import re
+import sys
+import threading
+from pathlib import Path
+
+
+WORD_FILES = ('adjectives.txt', 'nouns.txt', 'verbs.txt')
+
+# Words end up in the local part of an address, so keep them plain
+VALID_WORD = re.compile(r'^[a-z0-9]+$')
+
+# Fallback word lists if the data files are not found
+FALLBACK_ADJECTIVES = (
+    'happy', 'sunny', 'cool', 'swift', 'bright', 'clever', 'quick',
+    'brave', 'calm', 'wise', 'noble', 'keen', 'bold', 'sharp', 'smart'
+)
+FALLBACK_NOUNS = (
+    'eagle', 'tiger', 'wolf', 'fox', 'hawk', 'bear', 'lion',
+    'storm', 'wind', 'fire', 'star', 'moon', 'sun', 'sky', 'ocean'
+)
+FALLBACK_VERBS = (
+    'run', 'jump', 'fly', 'soar', 'swim', 'dive', 'climb', 'dance',
+    'sing', 'play', 'laugh', 'smile', 'think', 'dream', 'create'
+)
+FALLBACKS = (FALLBACK_ADJECTIVES, FALLBACK_NOUNS, FALLBACK_VERBS)
+
+
+def default_data_dir():
+    """Locate the data directory, including inside PyInstaller bundles."""
+    # For PyInstaller executables, use the bundled data
+    if hasattr(sys, '_MEIPASS'):
+        return Path(sys._MEIPASS) / 'data'
+    return Path(__file__).parent.parent / 'data'  # Go up from src/ to root
+
+
+def read_word_file(path):
+    """Read one word per line, optionally followed by a frequency weight.
+
+    Words are lowercased and de-duplicated (first occurrence wins).
+    Returns the words, a dict of explicitly given weights and a list of
+    rejected lines.
+    """
+    words = []
+    weights = {}
+    rejected = []
+    seen = set()
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if not fields:
+                continue
+            word = fields[0].lower()
+            if not VALID_WORD.match(word) or len(fields) > 2:
+                rejected.append(line.rstrip('\n'))
+                continue
+            if len(fields) == 2:
+                try:
+                    weight = float(fields[1])
+                except ValueError:
+                    rejected.append(line.rstrip('\n'))
+                    continue
+                if weight < 0:
+                    rejected.append(line.rstrip('\n'))
+                    continue
+                weights[word] = weight
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+    return words, weights, rejected
+
+
+def read_word_lists(data_dir):
+    """Read every word file in ``data_dir``, falling back to built-in lists.
+
+    Returns ((adjectives, nouns, verbs, weights), rejected), where
+    ``rejected`` maps each file name to its rejected lines.
+    """
+    lists = []
+    weights = {}
+    rejected = {}
+    for name, fallback in zip(WORD_FILES, FALLBACKS):
+        try:
+            words, file_weights, rejected[name] = read_word_file(data_dir / name)
+        except FileNotFoundError:
+            words, file_weights, rejected[name] = list(fallback), {}, []
+        lists.append(words)
+        weights.update(file_weights)
+    return (lists[0], lists[1], lists[2], weights), rejected
+
+
+def load_weighted_word_lists(data_dir=None):
+    """Load (adjectives, nouns, verbs, weights), falling back to built-in lists."""
+    data_dir = Path(data_dir) if data_dir is not None else default_data_dir()
+    return read_word_lists(data_dir)[0]
+
+
+class WordListSource:
+    """Watches the word list files and hot-swaps them into engines.
+
+    ``poll()`` compares file modification times and sizes; when anything
+    changed it reloads the lists and calls ``engine.reload`` for every
+    attached engine. The engines build their new tables first and then
+    swap them in with a single assignment, so generation in progress keeps
+    using the old tables and is never blocked. ``start()`` runs the polling
+    in a daemon thread.
+    """
+
+    def __init__(self, data_dir=None, interval=2.0):
+        self.data_dir = Path(data_dir) if data_dir is not None else default_data_dir()
+        self.interval = interval
+        self.rejected = {}
+        self._engines = []
+        self._signature = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _current_signature(self):
+        signature = []
+        for name in WORD_FILES:
+            try:
+                stat = (self.data_dir / name).stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def load(self):
+        """Read the lists now, recording rejected lines per file."""
+        self._signature = self._current_signature()
+        word_lists, rejected = read_word_lists(self.data_dir)
+        self.rejected.update(rejected)
+        return word_lists
+
+    def attach(self, engine):
+        """Keep ``engine`` in sync with the files from now on."""
+        with self._lock:
+            if self._signature is None:
+                self.load()
+            self._engines.append(engine)
+
+    def poll(self):
+        """Reload if the files changed; return True when a reload happened."""
+        with self._lock:
+            if self._current_signature() == self._signature:
+                return False
+            adjectives, nouns, verbs, weights = self.load()
+            for engine in self._engines:
+                engine.reload(adjectives, nouns, verbs, weights)
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except (OSError, ValueError):
+                # Half-written files: keep the current tables and retry next tick
+                self._signature = None
+
+    def start(self):
+        """Start polling in a background daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='wordlist-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background polling thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
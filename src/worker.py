@@ -0,0 +1,167 @@
+"""
+Long-lived JSON-lines worker serving alias requests over stdin/stdout
+"""
+
+import json
+import queue
+import sys
+import threading
+
+try:
+    from .deadline import decode_token
+    from .rotating import RotatingAliases
+except ImportError:  # running as a script from src/
+    from deadline import decode_token
+    from rotating import RotatingAliases
+
+
+STRATEGIES = ('mixed', 'plus', 'dots', 'variations', 'creative', 'random', 'rotating')
+CHUNK_SIZE = 1000  # aliases per response line; larger batches span several lines
+MAX_COUNT = 1000000
+
+_EOF = object()
+
+
+def _encode(response):
+    return json.dumps(response, separators=(',', ':')) + '\n'
+
+
+class StdioWorker:
+    """Answers newline-delimited JSON requests with newline-delimited JSON.
+
+    A request looks like::
+
+        {"id": 7, "mailbox": "john@gmail.com", "count": 3, "strategy": "plus",
+         "constraints": {"min_length": 8, "max_length": 20}}
+
+    ``strategy`` is one of ``STRATEGIES`` (default ``mixed``); constraints
+    may set ``min_length``, ``max_length``, ``min_distance``, ``mix``,
+    ``words`` (plus tags) and ``deadline_ms``. A request with a
+    ``continuation`` resumes a run that hit its deadline instead; creative
+    and random runs have none and come back partial without one.
+
+    Each response line carries the request ``id`` and up to ``CHUNK_SIZE``
+    aliases; the last line of a request has ``"done": true`` plus
+    ``partial`` and ``continuation``, failures a single ``error`` line.
+    Requests are answered in order. A reader thread queues input lines, so
+    the parent can pipeline requests without waiting; output is flushed
+    whenever no further request is already waiting, which batches writes
+    under load and answers a lone request at once.
+    """
+
+    def __init__(self, engine, infile=None, outfile=None, key=None):
+        self.engine = engine
+        self.infile = sys.stdin if infile is None else infile
+        self.outfile = sys.stdout if outfile is None else outfile
+        self.key = key
+        self._rotating = {}
+        self._lines = queue.Queue()
+
+    def _read(self):
+        try:
+            for line in self.infile:
+                self._lines.put(line)
+        finally:
+            self._lines.put(_EOF)
+
+    def serve(self):
+        """Answer requests until stdin closes; returns the number answered."""
+        threading.Thread(target=self._read, name='stdio-reader', daemon=True).start()
+        write = self.outfile.write
+        answered = 0
+        while True:
+            line = self._lines.get()
+            if line is _EOF:
+                break
+            if line.strip():
+                for response in self.handle_line(line):
+                    write(_encode(response))
+                answered += 1
+            if self._lines.empty():
+                self.outfile.flush()
+        self.outfile.flush()
+        return answered
+
+    def handle_line(self, line):
+        """Response objects for one request line."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            request_id = request.get('id')
+            result = self.generate(request)
+        except Exception as e:  # one bad request must not take the worker down
+            message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+            return [{'id': request_id, 'error': str(message) or type(e).__name__}]
+        return self._chunks(request_id, result)
+
+    def _chunks(self, request_id, aliases):
+        responses = [{'id': request_id, 'aliases': aliases[i:i + CHUNK_SIZE], 'done': False}
+                     for i in range(0, max(len(aliases), 1), CHUNK_SIZE)]
+        last = responses[-1]
+        last['done'] = True
+        last['partial'] = getattr(aliases, 'partial', False)
+        last['continuation'] = getattr(aliases, 'continuation', None)
+        return responses
+
+    def generate(self, request):
+        """Run one request against the engine; returns a list of aliases."""
+        engine = self.engine
+        constraints = request.get('constraints') or {}
+        if not isinstance(constraints, dict):
+            raise ValueError("'constraints' must be a JSON object")
+        deadline_ms = constraints.get('deadline_ms')
+        if request.get('continuation'):
+            token = decode_token(request['continuation'])
+            if token['op'] == 'rotating':
+                return self._rotating_for(token).derive_many(
+                    token['email'], token['count'], token['epoch'], token['start'], deadline_ms)
+            return engine.resume(request['continuation'], deadline_ms)
+
+        mailbox = request.get('mailbox')
+        if not isinstance(mailbox, str) or '@' not in mailbox:
+            raise ValueError("Request needs a 'mailbox' email address")
+        count = request.get('count', 1)
+        if not isinstance(count, int) or not 0 <= count <= MAX_COUNT:
+            raise ValueError(f"'count' must be an integer from 0 to {MAX_COUNT}")
+        strategy = request.get('strategy', 'mixed')
+        lengths = {'min_length': constraints.get('min_length'),
+                   'max_length': constraints.get('max_length')}
+        min_distance = constraints.get('min_distance')
+
+        if strategy == 'mixed':
+            return engine.mixed_aliases(mailbox, count, constraints.get('mix'), deadline_ms,
+                                        min_distance, **lengths)
+        if strategy == 'dots':
+            return engine.mixed_aliases(mailbox, count, {'dots': 1.0}, deadline_ms,
+                                        min_distance, **lengths)
+        if strategy == 'plus':
+            return engine.plus_aliases(mailbox, count, constraints.get('words'), deadline_ms,
+                                       min_distance, **lengths)
+        if strategy == 'variations':
+            return engine.variations(mailbox, count, deadline_ms=deadline_ms,
+                                     min_distance=min_distance, **lengths)
+        if strategy in ('creative', 'random'):
+            # Fresh addresses on the mailbox's domain
+            return engine.template_aliases(mailbox, count, strategy, deadline_ms, min_distance,
+                                           **lengths)
+        if strategy == 'rotating':
+            return self._rotating_for(constraints).derive_many(
+                mailbox, count, constraints.get('epoch'), deadline_ms=deadline_ms)
+        raise ValueError(f"Unknown strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+
+    def _rotating_for(self, constraints):
+        if self.key is None:
+            raise ValueError("Rotating aliases need the worker started with a rotation key")
+        options = (constraints.get('mode', 'plus'), constraints.get('period', 86400))
+        rotating = self._rotating.get(options)
+        if rotating is None:
+            rotating = self._rotating[options] = RotatingAliases(
+                self.key, self.engine, mode=options[0], period=options[1])
+        return rotating
+
+
+def serve_stdio(engine, infile=None, outfile=None, key=None):
+    """Serve JSON-lines alias requests on stdin/stdout until stdin closes."""
+    return StdioWorker(engine, infile, outfile, key).serve()
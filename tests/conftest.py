@@ -0,0 +1,27 @@
+"""
+Shared test setup: import the package as ``src`` from the project root
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.engine import AliasEngine  # noqa: E402
+from src.wordlists import load_weighted_word_lists  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def word_lists():
+    return load_weighted_word_lists()
+
+
+@pytest.fixture
+def engine(word_lists):
+    """A fresh engine on the bundled word lists with a seeded rng."""
+    adjectives, nouns, verbs, weights = word_lists
+    return AliasEngine(adjectives, nouns, verbs, rng=random.Random(1234), word_weights=weights)
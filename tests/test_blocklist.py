@@ -0,0 +1,48 @@
+"""
+Tests for the Aho-Corasick blocklist
+"""
+
+import random
+
+from src.blocklist import BLOCKED, Blocklist
+
+
+TERMS = ('ass', 'sex', 'he', 'she', 'hers', 'his', 'badword')
+
+
+def test_scan_matches_naive_search():
+    blocklist = Blocklist(TERMS)
+    rng = random.Random(11)
+    for _ in range(3000):
+        text = ''.join(rng.choice('abdehirsswx') for _ in range(rng.randint(0, 12)))
+        assert blocklist.contains(text) == any(term in text for term in TERMS), text
+
+
+def test_terms_across_word_boundaries():
+    blocklist = Blocklist(['badword'])
+    assert blocklist.allows(['happy', 'tiger'])
+    assert not blocklist.allows(['bad', 'word'])
+    assert not blocklist.allows(['bad', 'word'])  # memoized steps
+    assert not blocklist.allows(['xba', 'dwo', 'rdy'])
+    assert blocklist.allows(['good', 'word'])
+
+
+def test_numbers_are_not_memoized():
+    blocklist = Blocklist(['x42'])
+    assert not blocklist.allows(['max', '42'])
+    assert blocklist.allows(['happy', 'tiger', '123'])
+    assert all(not word.isdigit() for _, word in blocklist._steps)
+
+
+def test_scan_resumes_from_a_state():
+    blocklist = Blocklist(['hers'])
+    state = blocklist.scan('she')
+    assert state not in (0, BLOCKED)
+    assert blocklist.scan('rs', state) == BLOCKED
+    assert blocklist.scan('rs') != BLOCKED
+
+
+def test_terms_are_case_insensitive_and_stripped():
+    blocklist = Blocklist(['  Foo\n', '', '   '])
+    assert len(blocklist) == 1
+    assert blocklist.contains('xxFOOxx')
@@ -0,0 +1,105 @@
+"""
+Tests for decoding aliases back into strategy, words and number
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.decoder import TEMPLATE_NAMES, AliasDecoder
+
+TESTS = Path(__file__).parent
+
+
+@pytest.fixture
+def decoder(engine):
+    return engine.decoder()
+
+
+def test_sample_aliases_decode(decoder):
+    aliases = json.loads((TESTS / 'test_aliases.json').read_text())
+    for alias in aliases:
+        parses = decoder.decode(alias)
+        assert parses, alias
+        local = alias.split('@')[0]
+        for parse in parses:
+            assert decoder.expand(decoder.compact(parse)) == local
+    parse = decoder.decode('royaleagle428@mycompany.com')[0]
+    assert (parse.strategy, parse.words) == ('adjective-noun-number', ('royal', 'eagle'))
+    assert decoder.decode('laughing_wave@mycompany.com')[0].number is None
+
+
+def test_generated_aliases_decode_to_their_words(engine, decoder):
+    for make in (engine.creative_alias, engine.random_alias):
+        for _ in range(300):
+            local = make('example.com').split('@')[0]
+            parses = decoder.decode_local(local)
+            assert parses and parses[0].strategy in TEMPLATE_NAMES
+            assert all(decoder.expand(decoder.compact(p)) == local for p in parses)
+
+
+def test_ambiguous_splits_are_all_reported():
+    decoder = AliasDecoder(['red', 'redo'], ['dog', 'odog'], [])
+    parses = decoder.decode('redodog42@example.com')
+    assert {p.words for p in parses} == {('red', 'odog'), ('redo', 'dog')}
+    assert all(p.strategy == 'adjective-noun-number' and p.number == 42 for p in parses)
+    assert decoder.is_ambiguous('redodog42@example.com')
+    assert not decoder.is_ambiguous('red_dog@example.com')
+    assert decoder.decode('bluecat7@example.com') == []
+
+
+def test_numbers_must_fit_the_template():
+    decoder = AliasDecoder(['red'], ['dog'], [])
+    assert decoder.decode('reddog7@example.com')[0].number == 7
+    # Leading zeros and out-of-range numbers are never generated
+    assert decoder.decode('reddog07@example.com') == []
+    assert decoder.decode('reddog1000@example.com') == []
+
+
+def test_compact_round_trip(decoder):
+    parse = decoder.decode('Royal.Eagle42@example.com')[0]
+    compact = decoder.compact(parse)
+    assert all(isinstance(value, int) for value in compact)
+    assert decoder.expand(compact) == 'royal.eagle42'
+    assert decoder.expand(decoder.compact(decoder.decode('wise_crystal@x.com')[0])) == 'wise_crystal'
+
+
+def test_plus_tags_decode(decoder):
+    assert decoder.decode('john.doe+shopping@gmail.com') == [('plus', None, ('shopping',), None)]
+    parse = decoder.decode('john+work42@example.com')[0]
+    assert (parse.words, parse.number) == (('work',), 42)
+    assert decoder.decode('John+Info7@example.com')[0].words == ('info',)
+    with pytest.raises(ValueError):
+        decoder.compact(decoder.decode('john+work@example.com')[0])
+
+
+def test_decode_lines_skips_headers_and_blanks(decoder):
+    lines = ['email\n', '\n', 'royaleagle428@mycompany.com\n', '"keen_data@mycompany.com",\n',
+             'not an alias\n']
+    decoded = list(decoder.decode_lines(lines))
+    assert [alias for alias, _ in decoded] == ['royaleagle428@mycompany.com',
+                                                'keen_data@mycompany.com']
+    assert all(parses for _, parses in decoded)
+
+
+def test_cli_decode(tmp_path):
+    path = tmp_path / 'aliases.csv'
+    path.write_text('email\nroyaleagle428@mycompany.com\njohn+work@example.com\n')
+    result = subprocess.run([sys.executable, 'alias_generator.py', 'decode', str(path)],
+                            cwd=TESTS.parent / 'src', capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    rows = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [row['alias'] for row in rows] == ['royaleagle428@mycompany.com', 'john+work@example.com']
+    assert rows[0]['parses'] == [{'strategy': 'adjective-noun-number',
+                                  'words': ['royal', 'eagle'], 'number': 428}]
+    assert rows[1]['parses'][0]['strategy'] == 'plus'
+    assert not rows[0]['ambiguous']
+
+    only = subprocess.run([sys.executable, 'alias_generator.py', 'decode', '--ambiguous-only',
+                           str(path)], cwd=TESTS.parent / 'src', capture_output=True, text=True,
+                          timeout=60)
+    assert only.returncode == 0, only.stderr
+    assert all(json.loads(line)['ambiguous'] for line in only.stdout.splitlines())
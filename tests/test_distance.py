@@ -0,0 +1,85 @@
+"""
+Tests for edit distances and alias spacing
+"""
+
+import random
+
+import pytest
+
+from src.distance import SpacingIndex, levenshtein
+
+
+def naive_levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ca != cb))
+    return row[-1]
+
+
+def _word(rng, low=0, high=14, alphabet='abc.+'):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+
+def test_levenshtein_matches_dynamic_programming():
+    rng = random.Random(5)
+    for _ in range(3000):
+        a, b = _word(rng), _word(rng)
+        assert levenshtein(a, b) == naive_levenshtein(a, b), (a, b)
+
+
+def test_levenshtein_cap():
+    rng = random.Random(6)
+    for _ in range(3000):
+        a, b = _word(rng), _word(rng)
+        cap = rng.randint(0, 4)
+        expected = naive_levenshtein(a, b)
+        assert levenshtein(a, b, cap) == (expected if expected <= cap else cap + 1)
+
+
+def test_levenshtein_long_strings():
+    rng = random.Random(8)
+    a = _word(rng, 80, 120, 'abcdefgh')
+    b = _word(rng, 80, 120, 'abcdefgh')
+    assert levenshtein(a, b) == naive_levenshtein(a, b)
+
+
+@pytest.mark.parametrize('min_distance', [1, 2, 3, 4])
+def test_spacing_index_matches_brute_force(min_distance):
+    rng = random.Random(min_distance)
+    index = SpacingIndex(min_distance)
+    kept = []
+    for _ in range(1500):
+        local = 'john.doe+' + _word(rng, 1, 6, 'abcd2')
+        alias = f"{local}@example.com"
+        # levenshtein itself is checked against the DP above
+        expected = all(levenshtein(local, other) >= min_distance for other in kept)
+        assert index.admit(alias) == expected, alias
+        if expected:
+            kept.append(local)
+    assert len(index) == len(kept)
+
+
+def test_spacing_is_per_domain_and_case_insensitive():
+    index = SpacingIndex(2, ['bob+news@example.com'])
+    assert index.conflicts('BOB+News@Example.com')
+    assert index.conflicts('bob+newz@example.com')
+    assert not index.conflicts('bob+newz@example.org')
+
+
+@pytest.mark.parametrize('min_distance', [2, 3, 4])
+def test_spacing_index_across_stems(min_distance):
+    # Long shared usernames, dot variants and bare usernames land in
+    # different stem buckets but must still be spaced against each other
+    rng = random.Random(10 + min_distance)
+    index = SpacingIndex(min_distance)
+    kept = []
+    for _ in range(800):
+        user = rng.choice(['christopher.johnson', 'christopherjohnson', 'chris.topher.johnson'])
+        local = user + rng.choice(['', '+' + _word(rng, 0, 5, 'ab2'), _word(rng, 1, 2, 'ab+')])
+        expected = all(levenshtein(local, other) >= min_distance for other in kept)
+        assert index.admit(f"{local}@example.com") == expected, local
+        if expected:
+            kept.append(local)
+    assert len(kept) > 5
@@ -0,0 +1,92 @@
+"""
+Tests for issuing local parts across several domains
+"""
+
+from collections import Counter
+
+import pytest
+
+from src.domains import DomainFanout, DomainRules, _mailbox_mix, iter_across_domains
+
+DOMAINS = ['gmail.com', 'example.com', 'noplus.org']
+RULES = {'noplus.org': DomainRules('noplus.org', plus=False)}
+
+
+def _split(alias):
+    local, domain = alias.split('@')
+    return local, domain
+
+
+def test_plus_and_dots_only_go_where_they_deliver(engine):
+    aliases = list(iter_across_domains(engine, 'john.doe@gmail.com', DOMAINS, 300, rules=RULES))
+    by_domain = {}
+    for alias in aliases:
+        local, domain = _split(alias)
+        by_domain.setdefault(domain, []).append(local)
+    assert set(by_domain) == {'gmail.com', 'example.com'}
+    assert all('+' in local for local in by_domain['example.com'])
+    assert any('+' not in local for local in by_domain['gmail.com'])
+    # Every plus local part reaches both domains that take plus addresses
+    plus = Counter(local for local, _ in map(_split, aliases) if '+' in local)
+    assert set(plus.values()) == {2}
+
+
+def test_dot_variations_need_a_domain_that_ignores_dots(engine):
+    aliases = list(iter_across_domains(engine, 'johndoe', ['gmail.com', 'example.com'], 100,
+                                       strategy='dots'))
+    assert aliases and all(alias.endswith('@gmail.com') for alias in aliases)
+    assert all(_split(alias)[0].replace('.', '') == 'johndoe' for alias in aliases)
+
+
+def test_separators_a_domain_rejects_are_kept_off_it(engine):
+    rules = {'strict.com': DomainRules('strict.com', separators='')}
+    aliases = list(iter_across_domains(engine, 'jo', ['strict.com', 'example.com'], 200,
+                                       strategy='random', rules=rules))
+    for alias in aliases:
+        local, domain = _split(alias)
+        if domain == 'strict.com':
+            assert local.isalnum()
+    assert any(alias.endswith('@strict.com') for alias in aliases)
+
+
+@pytest.mark.parametrize('strategy', ['mixed', 'plus', 'variations', 'creative', 'random'])
+def test_unique_issues_each_local_part_once(engine, strategy):
+    aliases = list(iter_across_domains(engine, 'john.doe@gmail.com', DOMAINS, 200,
+                                       strategy=strategy, unique=True, rules=RULES))
+    locals_ = [_split(alias)[0] for alias in aliases]
+    assert len(locals_) == len(set(locals_))
+    assert len({_split(alias)[1] for alias in aliases}) > 1
+
+
+@pytest.mark.parametrize('strategy', ['creative', 'random'])
+def test_template_strategies_do_not_repeat(engine, strategy):
+    aliases = list(iter_across_domains(engine, 'bob', ['a.com', 'b.com'], 1000,
+                                       strategy=strategy))
+    assert len(aliases) == 2000
+    assert len(set(aliases)) == len(aliases)
+    assert len({_split(alias)[0] for alias in aliases}) == 1000
+
+
+def test_mailbox_mix_rejects_strategies_no_domain_fits():
+    no_plus = DomainFanout(['noplus.org'], RULES)
+    no_dots = DomainFanout(['example.com'])
+    with pytest.raises(ValueError, match="plus"):
+        _mailbox_mix(no_plus, 'plus', None)
+    with pytest.raises(ValueError, match="dots"):
+        _mailbox_mix(no_dots, 'dots', None)
+    # Neither plus addresses nor dot variations would deliver
+    with pytest.raises(ValueError, match="plus"):
+        _mailbox_mix(no_plus, 'mixed', None)
+    # A plain mixed run falls back to whatever the domains accept
+    assert _mailbox_mix(no_dots, 'mixed', None) == {'plus': 1.0}
+    assert _mailbox_mix(DomainFanout(['gmail.com'], {'gmail.com': DomainRules(
+        'gmail.com', plus=False)}), 'mixed', None) == {'dots': 1.0}
+
+
+def test_bad_requests_are_rejected(engine):
+    with pytest.raises(ValueError):
+        iter_across_domains(engine, 'bob', [], 5)
+    with pytest.raises(ValueError):
+        iter_across_domains(engine, 'bob', ['a.com'], 5, strategy='nope')
+    with pytest.raises(ValueError):
+        iter_across_domains(engine, '@a.com', ['a.com'], 5)
@@ -0,0 +1,137 @@
+"""
+Tests for engine state shared between calls
+"""
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+
+def _finishes(func, timeout=10):
+    thread = threading.Thread(target=func, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_open_iterator_does_not_block_other_mailboxes(engine):
+    it = engine.iter_mixed('john@gmail.com', 100, min_distance=2)
+    next(it)
+    assert _finishes(lambda: engine.mixed_aliases('someone.else@example.com', 1))
+    assert _finishes(lambda: engine.plus_aliases('john@gmail.com', 5, min_distance=2))
+    it.close()
+
+
+def test_open_iterator_with_remembered_aliases(word_lists):
+    from src.engine import AliasEngine
+
+    adjectives, nouns, verbs, weights = word_lists
+    engine = AliasEngine(adjectives, nouns, verbs, word_weights=weights, remember_issued=True)
+    it = engine.iter_mixed('john@gmail.com', 100)
+    first = [next(it) for _ in range(10)]
+    other = []
+    assert _finishes(lambda: other.extend(engine.mixed_aliases('john@gmail.com', 50)))
+    rest = list(it)
+    assert len(set(first + rest + other)) == len(first) + len(rest) + len(other)
+
+
+def test_spacing_holds_across_concurrent_runs(engine):
+    from src.distance import levenshtein
+
+    results = []
+
+    def run():
+        results.extend(engine.plus_aliases('bob@example.com', 300, min_distance=3))
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    locals_ = [alias.split('@')[0] for alias in results]
+    assert len(set(locals_)) == len(locals_)
+    close = [(a, b) for i, a in enumerate(locals_) for b in locals_[i + 1:]
+             if levenshtein(a, b, 2) < 3]
+    assert not close
+
+
+def test_word_list_callers_reuse_engines():
+    from src import generators
+
+    adjectives, nouns, verbs = generators.load_word_lists()
+    default = generators.get_default_engine()
+    assert generators._engine_for(adjectives, nouns, verbs) is default
+    assert generators._engine_for(adjectives, nouns, verbs) is default
+    custom = list(adjectives[:50])
+    engine = generators._engine_for(custom, nouns, verbs)
+    assert engine is not default
+    assert generators._engine_for(custom, nouns, verbs) is engine
+    # A reload swaps the default lists, so the cached answer is rechecked
+    words = default._words
+    default.reload(custom, nouns, verbs)
+    try:
+        assert generators._engine_for(custom, nouns, verbs) is default
+    finally:
+        default.reload(*words)
+
+
+def test_word_lists_edited_in_place_are_picked_up():
+    from src.generators import generate_random_alias
+
+    adjectives, nouns = ['red', 'blue'], ['fox', 'cat']
+    generate_random_alias(adjectives, nouns)
+    adjectives[:] = ['green', 'pink']
+    for _ in range(50):
+        local = generate_random_alias(adjectives, nouns).split('@')[0]
+        assert 'red' not in local and 'blue' not in local
+
+
+@pytest.mark.parametrize('mix', [{'foo': 1}, {'plus': 0, 'dots': 0}, {'plus': -1},
+                                 {'plus': 'x'}, [1]])
+def test_bad_strategy_mixes_are_rejected(engine, mix):
+    with pytest.raises(ValueError):
+        engine.mixed_aliases('john@gmail.com', 3, mix)
+
+
+def test_cli_reports_a_bad_mix_without_a_traceback():
+    result = subprocess.run(
+        [sys.executable, 'alias_generator.py', '--email', 'john@gmail.com', '--mix', 'plus=-1'],
+        cwd=Path(__file__).parent.parent / 'src', capture_output=True, text=True, timeout=60)
+    assert 'Traceback' not in result.stderr
+    assert 'Error:' in result.stderr
+
+
+def test_spacing_survives_mailbox_cache_eviction(word_lists):
+    from src.engine import AliasEngine
+
+    adjectives, nouns, verbs, weights = word_lists
+    engine = AliasEngine(adjectives, nouns, verbs, word_weights=weights, cache_size=16)
+    engine.reserve('bob@example.com', ['bob+travel@example.com'], 2)
+    for i in range(100):
+        engine.mixed_aliases(f"user{i}@example.com", 1)
+    aliases = engine.plus_aliases('bob@example.com', 5, ['travel', 'travel1', 'news'],
+                                  min_distance=2)
+    assert 'bob+travel@example.com' not in aliases
+    assert 'bob+news@example.com' in aliases
+
+
+def test_cli_resume_keeps_existing_aliases_out(tmp_path):
+    def run(*args):
+        return subprocess.run([sys.executable, 'alias_generator.py', *args],
+                              cwd=Path(__file__).parent.parent / 'src', capture_output=True,
+                              text=True, timeout=120)
+
+    existing = tmp_path / 'existing.txt'
+    first = run('--email', 'john.doe@gmail.com', '--count', '1500', '--format', 'csv')
+    existing.write_text(first.stdout)
+    started = run('--email', 'john.doe@gmail.com', '--count', '1500', '--format', 'csv',
+                  '--existing', str(existing), '--deadline-ms', '0')
+    token = started.stderr.split('--resume ')[1].split()[0]
+    resumed = run('--resume', token, '--existing', str(existing), '--format', 'csv')
+    taken = set(existing.read_text().split()[1:])
+    new = resumed.stdout.split()[1:]
+    assert new
+    assert not taken & set(new)
@@ -0,0 +1,78 @@
+"""
+Tests for the external-memory merge of alias files
+"""
+
+import json
+import random
+
+import pytest
+
+from src import extsort
+from src.extsort import ExternalSorter, merge_alias_files, read_aliases
+
+
+def _aliases(rng, count):
+    return [f"user{rng.randrange(count * 2)}@example.com" for _ in range(count)]
+
+
+@pytest.fixture
+def files(tmp_path):
+    rng = random.Random(9)
+    a, b, c = _aliases(rng, 3000), _aliases(rng, 3000), _aliases(rng, 3000)
+    (tmp_path / 'a.txt').write_text(''.join(f"{x}\n" for x in a))
+    (tmp_path / 'b.csv').write_text('email\n' + ''.join(f"{x}\n" for x in b))
+    (tmp_path / 'c.json').write_text(json.dumps(c, indent=2))
+    paths = [tmp_path / 'a.txt', tmp_path / 'b.csv', tmp_path / 'c.json']
+    return paths, [set(a), set(b), set(c)]
+
+
+def test_read_aliases_reads_every_format(files):
+    paths, sets = files
+    for path, expected in zip(paths, sets):
+        assert set(read_aliases(path)) == expected
+
+
+@pytest.mark.parametrize('operation, combine', [
+    ('union', lambda a, b, c: a | b | c),
+    ('intersect', lambda a, b, c: a & b & c),
+    ('diff', lambda a, b, c: a - b - c),
+])
+def test_set_operations(files, operation, combine):
+    paths, sets = files
+    assert list(merge_alias_files(paths, operation)) == sorted(combine(*sets))
+
+
+def test_many_runs_are_merged_in_passes(monkeypatch, tmp_path):
+    monkeypatch.setattr(extsort, 'MERGE_FAN_IN', 3)
+    rng = random.Random(4)
+    items = [f"{rng.randrange(5000)}@x.com" for _ in range(20000)]
+    with ExternalSorter(tmp_dir=tmp_path) as sorter:
+        sorter.chunk_bytes = 64 * 1000  # about 1000 items per run
+        assert list(sorter.sort(items)) == sorted(set(items))
+        assert sorter._runs > 20
+
+
+def test_parallel_runs(tmp_path):
+    items = [f"{i % 7000}@x.com" for i in range(30000)]
+    with ExternalSorter(jobs=2, tmp_dir=tmp_path) as sorter:
+        sorter.chunk_bytes = 64 * 3000
+        assert list(sorter.sort(items)) == sorted(set(items))
+
+
+def test_close_after_a_failed_stream_stops_the_workers(tmp_path):
+    def items():
+        for i in range(20000):
+            yield f"{i}@x.com"
+        raise RuntimeError("input went away")
+
+    with pytest.raises(RuntimeError):
+        with ExternalSorter(jobs=2, tmp_dir=tmp_path) as sorter:
+            sorter.chunk_bytes = 64 * 1000
+            sorter.runs(items())
+    assert sorter._pool is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_unknown_operation(files):
+    with pytest.raises(ValueError):
+        list(merge_alias_files(files[0], 'xor'))
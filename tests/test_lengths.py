@@ -0,0 +1,97 @@
+"""
+Tests for length-windowed generation
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from src.lengths import LayeredBuckets, LengthBuckets
+from src.namespaces import NamespaceRegistry
+
+
+def _local(alias):
+    return alias.split('@')[0]
+
+
+@pytest.mark.parametrize('kind', ['creative', 'random'])
+@pytest.mark.parametrize('window', [(6, 8), (12, 12), (18, 30)])
+def test_template_aliases_fit_the_window(engine, kind, window):
+    make = engine.creative_alias if kind == 'creative' else engine.random_alias
+    for _ in range(300):
+        assert window[0] <= len(_local(make('example.com', min_length=window[0],
+                                               max_length=window[1]))) <= window[1]
+
+
+def test_windowed_draws_match_filtered_unconstrained_ones(engine):
+    # Drawing inside the window must not skew which lengths come up
+    free = Counter(len(_local(engine.random_alias('x.com'))) for _ in range(20000))
+    free = {n: c for n, c in free.items() if 10 <= n <= 12}
+    bounded = Counter(len(_local(engine.random_alias('x.com', min_length=10, max_length=12)))
+                      for _ in range(20000))
+    total = sum(free.values())
+    for n in (10, 11, 12):
+        assert abs(bounded[n] / 20000 - free[n] / total) < 0.03
+
+
+def test_impossible_window_names_the_bounds(engine):
+    with pytest.raises(ValueError, match="No creative alias can be 1-2 characters long"):
+        engine.creative_alias('example.com', min_length=1, max_length=2)
+    with pytest.raises(ValueError, match="No random alias can be 60-64 characters long"):
+        engine.random_alias('example.com', min_length=60, max_length=64)
+    with pytest.raises(ValueError):
+        engine.random_alias('example.com', min_length=9, max_length=3)
+
+
+def test_variations_fit_the_window(engine):
+    result = engine.variations('john.doe@example.com', 40, min_length=11, max_length=13)
+    assert len(result) == 40
+    assert all(11 <= len(_local(alias)) <= 13 for alias in result)
+    assert len(set(result)) == len(result)
+
+
+def test_gmail_dots_fit_the_window(engine):
+    for _ in range(200):
+        alias = engine.gmail_dot_variation('johndoe@gmail.com', min_length=9, max_length=9)
+        assert len(_local(alias)) == 9 and _local(alias).replace('.', '') == 'johndoe'
+    # johndoe takes 1-3 dots, so 7-10 characters; nothing else fits
+    assert engine.gmail_dot_variation('johndoe@gmail.com', max_length=7) is None
+    assert engine.gmail_dot_variation('johndoe@gmail.com', min_length=11) is None
+
+
+def test_layered_buckets_draw_like_one_bucket():
+    rng = random.Random(3)
+    base_words = ['ab', 'cd', 'efg', 'hij', 'klmn']
+    extra = ['op', 'qrs', 'tuvwx']
+    weights = [1, 2, 3, 1, 1, 4, 1, 2]
+    layered = LayeredBuckets(LengthBuckets(base_words, weights[:5]), extra, weights[5:])
+    whole = LengthBuckets(base_words + extra, weights)
+    assert layered.masses.keys() == whole.masses.keys()
+    for n, mass in whole.masses.items():
+        assert layered.masses[n] == pytest.approx(mass)
+    counts = Counter(layered.sample(2, rng) for _ in range(30000))
+    # 'ab', 'cd' and 'op' weigh 1, 2 and 4
+    for word, share in (('ab', 1 / 7), ('cd', 2 / 7), ('op', 4 / 7)):
+        assert abs(counts[word] / 30000 - share) < 0.02
+
+
+def test_namespaces_share_the_base_length_tables(word_lists):
+    adjectives, nouns, verbs, weights = word_lists
+    registry = NamespaceRegistry(adjectives, nouns, verbs, word_weights=weights,
+                                 rng=random.Random(5))
+    base = registry.base._tables
+    tables = registry.define('acme', nouns=['rocketsled', 'zz'])._tables
+    tenant = registry.get('acme')
+    for _ in range(200):
+        local = _local(tenant.random_alias('x.com', min_length=8, max_length=10))
+        assert 8 <= len(local) <= 10
+    assert tables.length_buckets('adjectives') is base.length_buckets('adjectives')
+    assert isinstance(tables.length_buckets('nouns'), LayeredBuckets)
+    assert tables.length_buckets('nouns')._base is base.length_buckets('nouns')
+    # Only the tenant's two-letter noun makes e.g. zz2024 six characters long
+    seen = {_local(tenant.random_alias('x.com', min_length=6, max_length=6)) for _ in range(500)}
+    assert any(local.startswith('zz20') for local in seen)
+    # Reweighting a base word cannot reuse the base buckets
+    tables = registry.define('globex', nouns=['zz'], word_weights={nouns[0]: 50})._tables
+    assert not isinstance(tables.length_buckets('nouns'), LayeredBuckets)
@@ -0,0 +1,83 @@
+"""
+Tests for per-tenant word-list namespaces
+"""
+
+import random
+
+import pytest
+
+from src.blocklist import Blocklist
+from src.namespaces import NamespaceRegistry
+
+
+@pytest.fixture
+def registry(word_lists):
+    adjectives, nouns, verbs, weights = word_lists
+    return NamespaceRegistry(adjectives, nouns, verbs, word_weights=weights,
+                             rng=random.Random(7))
+
+
+def test_namespaces_layer_over_the_base_lists(registry):
+    base = registry.base
+    engine = registry.define('acme', nouns=['rocketsled', base.nouns[0], 'anvil'])
+    assert list(engine.nouns) == list(base.nouns) + ['rocketsled', 'anvil']
+    assert 'rocketsled' not in base.nouns
+    assert registry.get('acme') is engine
+    assert registry.get() is base
+    with pytest.raises(KeyError):
+        registry.get('globex')
+
+
+def test_untouched_pools_are_shared_with_the_base(registry):
+    base = registry.base._tables
+    tables = registry.define('acme', nouns=['rocketsled'])._tables
+    assert tables.adjectives is base.adjectives
+    assert tables.pools['adjectives'] is base.pools['adjectives']
+    assert tables.pools['verbs'] is base.pools['verbs']
+    assert tables.pools['nouns'] is not base.pools['nouns']
+    # Repeating base words adds nothing, so the pool stays shared too
+    tables = registry.define('initech', nouns=list(base.nouns[:5]))._tables
+    assert tables.pools['nouns'] is base.pools['nouns']
+
+
+def test_words_are_counted_once_across_tenants(registry):
+    before = registry.unique_words
+    for name in ('acme', 'globex', 'initech'):
+        registry.define(name, nouns=['rocketsled', 'stapler'], adjectives=['sleepy'])
+    assert registry.unique_words == before + 3
+    a, b = registry.get('acme').nouns, registry.get('globex').nouns
+    assert a[-1] is b[-1]
+
+
+def test_tenant_words_are_validated(registry):
+    engine = registry.define('acme', nouns=['Sled', 'sled', 'ANVIL'], word_weights={'Sled': 5})
+    assert list(engine.nouns[-2:]) == ['sled', 'anvil']
+    assert engine._tables.word_weights['sled'] == 5
+    for bad in (['Foo Bar@evil.com'], ['a+b'], ['dot.ted'], [''], ['ünï']):
+        with pytest.raises(ValueError):
+            registry.define('evil', nouns=bad)
+    with pytest.raises(ValueError):
+        registry.define('evil', plus_words=['work', 'x@y'])
+    assert 'evil' not in registry
+
+
+def test_reload_rebuilds_namespaces_on_the_new_base(registry):
+    registry.define('acme', nouns=['rocketsled'])
+    registry.reload(['grumpy'], ['walrus'], ['juggles'])
+    engine = registry.get('acme')
+    assert list(engine.nouns) == ['walrus', 'rocketsled']
+    assert list(engine.adjectives) == ['grumpy']
+    assert engine._tables.pools['adjectives'] is registry.base._tables.pools['adjectives']
+    local = engine.random_alias('example.com').split('@')[0]
+    assert 'grumpy' in local or 'walrus' in local or 'rocketsled' in local
+
+
+def test_blocklist_reaches_every_namespace(registry):
+    registry.define('acme', nouns=['rocketsled', 'anvil'])
+    registry.set_blocklist(Blocklist(['sled']))
+    assert 'rocketsled' not in registry.get('acme').nouns
+    assert 'anvil' in registry.get('acme').nouns
+    # Namespaces defined later pick the blocklist up as well
+    assert 'rocketsled' not in registry.define('globex', nouns=['rocketsled']).nouns
+    registry.set_blocklist(None)
+    assert 'rocketsled' in registry.get('acme').nouns
@@ -0,0 +1,71 @@
+"""
+Tests for the pre-generated alias pool
+"""
+
+import threading
+
+import pytest
+
+from src import pool as pool_module
+from src.pool import AliasPool
+
+
+MAILBOX = 'john.doe@example.com'
+
+
+@pytest.fixture
+def pool(tmp_path, engine):
+    with AliasPool(tmp_path / 'pool.db', MAILBOX, engine, capacity=200, low_water=50) as pool:
+        yield pool
+
+
+@pytest.mark.parametrize('returning', [True, False])
+def test_leases_are_unique_across_threads(pool, monkeypatch, returning):
+    # Without RETURNING (SQLite < 3.35) leases select and update in one transaction
+    monkeypatch.setattr(pool_module, 'HAS_RETURNING', returning and pool_module.HAS_RETURNING)
+    leases = []
+    lock = threading.Lock()
+
+    def lease_many():
+        for _ in range(150):
+            lease = pool.lease()
+            with lock:
+                leases.append(lease.alias)
+
+    threads = [threading.Thread(target=lease_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(leases) == 600
+    assert len(set(leases)) == 600
+
+
+def test_commit_release_and_reclaim(pool):
+    pool.refill()
+    used, returned = pool.lease(), pool.lease()
+    assert pool.commit(used)
+    assert pool.release(returned)
+    assert not pool.commit(returned)  # no longer leased
+    assert pool.lease().alias == returned.alias  # returned aliases go out first
+
+    pool.lease_seconds = -1
+    expired = pool.lease()
+    assert pool.reclaim() == 1
+    assert not pool.commit(expired)
+    assert pool.stats()['committed'] == 1
+
+
+def test_restart_never_repeats(tmp_path, engine):
+    path = tmp_path / 'pool.db'
+    with AliasPool(path, MAILBOX, engine, capacity=100, low_water=10) as pool:
+        first = [pool.lease().alias for _ in range(250)]
+    # A new pool, as in a restarted process, picks up the stored continuation
+    with AliasPool(path, MAILBOX, engine, capacity=100, low_water=10) as pool:
+        later = [pool.lease().alias for _ in range(250)]
+    assert len(set(first) | set(later)) == 500
+
+
+def test_low_water_must_be_below_capacity(tmp_path, engine):
+    with pytest.raises(ValueError):
+        AliasPool(tmp_path / 'pool.db', MAILBOX, engine, capacity=10, low_water=10)
@@ -0,0 +1,100 @@
+"""
+Tests for deadline-bounded generation and resume tokens
+"""
+
+import random
+import time
+
+import pytest
+
+from src.deadline import Deadline, decode_token, encode_token
+from src.distance import levenshtein
+from src.engine import AliasEngine
+
+
+MAILBOX = 'john.doe@gmail.com'
+
+
+def _generate(engine, op, count, **kwargs):
+    if op == 'mixed':
+        return engine.mixed_aliases(MAILBOX, count, deadline_ms=0, **kwargs)
+    if op == 'plus':
+        return engine.plus_aliases(MAILBOX, count, deadline_ms=0, **kwargs)
+    return engine.variations(MAILBOX, count, deadline_ms=0, **kwargs)
+
+
+def _finish(engine, result):
+    aliases = list(result)
+    while result.partial:
+        result = engine.resume(result.continuation, deadline_ms=10)
+        aliases.extend(result)
+    return aliases
+
+
+@pytest.mark.parametrize('op', ['mixed', 'plus', 'variations'])
+def test_resumed_runs_complete_without_repeats(engine, op):
+    result = _generate(engine, op, 3000)
+    assert result.partial and len(result) < 3000
+    aliases = _finish(engine, result)
+    assert len(aliases) == 3000
+    assert len(set(aliases)) == 3000
+
+
+def test_resume_keeps_length_window(engine):
+    aliases = _finish(engine, _generate(engine, 'plus', 500, min_length=12, max_length=14))
+    assert all(12 <= len(alias.split('@')[0]) <= 14 for alias in aliases)
+
+
+def test_tokens_round_trip():
+    state = {'op': 'plus', 'count': 3, 'words': ['a', 'b']}
+    assert decode_token(encode_token(state)) == state
+
+
+@pytest.mark.parametrize('token', ['', 'not a token', encode_token({'count': 1})[:-2] + '!!'])
+def test_bad_tokens_are_rejected(token):
+    with pytest.raises(ValueError):
+        decode_token(token)
+
+
+@pytest.mark.parametrize('op, min_distance', [('mixed', 3), ('plus', 2), ('variations', 2)])
+def test_resume_in_a_new_engine_keeps_spacing(word_lists, op, min_distance):
+    def fresh():
+        adjectives, nouns, verbs, weights = word_lists
+        return AliasEngine(adjectives, nouns, verbs, rng=random.Random(99), word_weights=weights)
+
+    result = _generate(fresh(), op, 300, min_distance=min_distance)
+    assert result.partial
+    aliases = list(result)
+    # A new engine stands in for a new process: it only has the token
+    aliases += _finish(fresh(), fresh().resume(result.continuation))
+    locals_ = [alias.split('@')[0] for alias in aliases]
+    assert len(locals_) > len(result)
+    for i, local in enumerate(locals_):
+        for other in locals_[:i]:
+            assert levenshtein(local, other, min_distance) >= min_distance, (local, other)
+
+
+@pytest.mark.parametrize('op', ['mixed', 'plus', 'variations'])
+def test_deadline_holds_while_candidates_are_rejected(engine, op):
+    # At distance 4 most candidates are rejected before any alias is yielded
+    mailbox = 'user4@example.com'
+    start = time.monotonic()
+    if op == 'mixed':
+        result = engine.mixed_aliases(mailbox, 3000, deadline_ms=50, min_distance=4)
+    elif op == 'plus':
+        result = engine.plus_aliases(mailbox, 3000, deadline_ms=50, min_distance=4)
+    else:
+        result = engine.variations(mailbox, 3000, deadline_ms=50, min_distance=4)
+    assert time.monotonic() - start < 0.5
+    if len(result) < 3000 and result.partial:
+        assert result.continuation
+        assert engine.resume(result.continuation, deadline_ms=50) is not None
+
+
+def test_deadline_reads_the_clock_on_slow_attempts():
+    deadline = Deadline(20)
+    start = time.monotonic()
+    while not deadline.expired():
+        time.sleep(0.002)
+    assert deadline.hit
+    assert time.monotonic() - start < 0.05
@@ -0,0 +1,32 @@
+"""
+Tests for HMAC-derived rotating aliases
+"""
+
+import pytest
+
+from src.rotating import RotatingAliases
+
+
+DAY = 86400
+
+
+@pytest.mark.parametrize('mode', ['plus', 'local'])
+def test_derived_aliases_verify_after_the_word_lists_change(engine, word_lists, mode):
+    rotating = RotatingAliases('secret', engine, mode=mode, clock=lambda: 10 * DAY)
+    aliases = rotating.derive_many('john@example.com', 50)
+    adjectives, nouns, verbs, _ = word_lists
+    engine.reload(adjectives[:40], nouns[:40], verbs)
+    reloaded = RotatingAliases('secret', engine, mode=mode, clock=lambda: 10 * DAY)
+    for index, alias in enumerate(aliases):
+        assert reloaded.verify(alias, 'john@example.com') == (10, index)
+
+
+def test_tampered_and_expired_aliases_do_not_verify(engine):
+    rotating = RotatingAliases('secret', engine, clock=lambda: 10 * DAY)
+    alias = rotating.derive('john@example.com', 7)
+    local, domain = alias.split('@')
+    assert rotating.verify(alias) == (10, 7)
+    assert rotating.verify(f"{local[:-1]}{'a' if local[-1] != 'a' else 'b'}@{domain}") is None
+    assert rotating.verify(alias.replace('john', 'jane')) is None
+    assert RotatingAliases('other', engine, clock=lambda: 10 * DAY).verify(alias) is None
+    assert RotatingAliases('secret', engine, clock=lambda: 12 * DAY).verify(alias) is None
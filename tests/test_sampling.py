@@ -0,0 +1,80 @@
+"""
+Tests for Vose alias tables and the secure random source
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from src.sampling import AliasTable, WeightedChoice
+from src.secure import SecureRandom
+
+
+DRAWS = 200000
+
+
+def _frequencies(table, rng):
+    counts = Counter(table.sample(rng) for _ in range(DRAWS))
+    return [counts[i] / DRAWS for i in range(table.size)]
+
+
+def test_alias_table_matches_weights():
+    weights = [1, 2, 3, 0, 10, 0.5]
+    frequencies = _frequencies(AliasTable(weights), random.Random(7))
+    total = sum(weights)
+    for weight, frequency in zip(weights, frequencies):
+        assert frequency == pytest.approx(weight / total, abs=0.005)
+
+
+def test_alias_table_never_draws_zero_weights():
+    table = AliasTable([0, 5, 0, 1e-9, 0])
+    draws = {table.sample(random.Random(i)) for i in range(2000)}
+    assert draws <= {1, 3}
+
+
+@pytest.mark.parametrize('weights', [[], [-1, 2], [0, 0]])
+def test_alias_table_rejects_bad_weights(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
+
+
+def test_weighted_choice_follows_new_weights():
+    choice = WeightedChoice('abc', [1, 0, 0])
+    rng = random.Random(3)
+    assert {choice.choice(rng) for _ in range(100)} == {'a'}
+    choice.set_weights([0, 0, 1])
+    assert {choice.choice(rng) for _ in range(100)} == {'c'}
+
+
+class _Words(SecureRandom):
+    """SecureRandom fed a fixed sequence of 32-bit words."""
+
+    def __init__(self, words):
+        super().__init__()
+        self._words = iter(words)
+
+
+def test_lemire_rejects_the_biased_range():
+    # For n = 3, multiplying 0 leaves a low half of 0, below (2**32 - 3) % 3 = 1:
+    # that draw is biased and must be skipped in favour of the next word
+    rng = _Words([0, 0xFFFFFFFF])
+    assert rng._below(3) == 2
+
+
+def test_lemire_is_uniform():
+    rng = SecureRandom()
+    counts = Counter(rng._below(6) for _ in range(DRAWS))
+    assert set(counts) == set(range(6))
+    for count in counts.values():
+        assert count / DRAWS == pytest.approx(1 / 6, abs=0.005)
+
+
+def test_secure_random_ranges():
+    rng = SecureRandom(block_size=64)  # force many refills
+    assert all(5 <= rng.randint(5, 9) <= 9 for _ in range(5000))
+    assert all(0.0 <= rng.random() < 1.0 for _ in range(5000))
+    assert rng.getrandbits(100) < 2 ** 100
+    assert rng._below(2 ** 40) < 2 ** 40
+    with pytest.raises(ValueError):
+        rng._below(0)
@@ -0,0 +1,137 @@
+"""
+Scaling and complexity checks for the alias generators
+
+Each generator runs at growing sizes: list results must be unique and
+reach the requested count while capacity remains, and memory per alias must
+stay within budget. Wall-clock growth rates depend on the machine, so the
+timing check (a log-log fit that must not exceed the declared complexity)
+only runs with ALIAS_TIMING_TESTS=1.
+"""
+
+import math
+import os
+import time
+import tracemalloc
+
+import pytest
+
+from src.generators import (
+    generate_creative_alias,
+    generate_mixed_aliases,
+    generate_plus_aliases,
+    generate_random_alias,
+    generate_variations,
+    get_default_engine,
+    iter_variations,
+)
+from src.tags import plus_capacity
+
+SIZES = (1000, 2000, 4000, 8000)
+# Larger sizes for the timing check, so runs take well above timer noise
+TIMING_SIZES = (4000, 8000, 16000, 32000)
+REPEATS = 3
+# Allowed excess over the declared exponent, to absorb timer noise
+SLOPE_TOLERANCE = 0.35
+# Peak traced memory per returned alias
+BYTES_PER_ALIAS = 2048
+
+
+def fit_exponent(sizes, timings):
+    """Least-squares slope of log(time) against log(n)."""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in timings]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    num = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    den = sum((x - mean_x) ** 2 for x in xs)
+    return num / den
+
+
+def best_time(func, n):
+    best = float('inf')
+    result = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func(n)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(func, n):
+    tracemalloc.start()
+    try:
+        func(n)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def creative_batch(n):
+    engine = get_default_engine()
+    return [generate_creative_alias(engine.adjectives, engine.nouns, engine.verbs, 'example.com')
+            for _ in range(n)]
+
+
+def random_batch(n):
+    engine = get_default_engine()
+    return [generate_random_alias(engine.adjectives, engine.nouns, 'example.com') for _ in range(n)]
+
+
+def variation_capacity(email):
+    return sum(1 for _ in iter_variations(email))
+
+
+# name -> (function of n, declared exponent, capacity or None if not unique by design)
+CHECKS = {
+    'mixed-other': (
+        lambda n: generate_mixed_aliases('john.doe@example.com', n), 1.0,
+        lambda: 29 * 992),  # at least the traditional plus words are always present
+    'mixed-gmail': (
+        lambda n: generate_mixed_aliases('john.doe@gmail.com', n), 1.0,
+        lambda: 29 * 992),
+    'plus': (
+        lambda n: generate_plus_aliases('john.doe@example.com', n), 1.0,
+        lambda: plus_capacity(get_default_engine().plus_words)),
+    'variations': (
+        lambda n: generate_variations('johndoe@example.com', n), 1.0,
+        lambda: variation_capacity('johndoe@example.com')),
+    'creative': (creative_batch, 1.0, None),
+    'random': (random_batch, 1.0, None),
+}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm_engine():
+    get_default_engine()  # keep word-list loading out of the timings
+
+
+@pytest.mark.parametrize('name', CHECKS)
+def test_scaling(name):
+    func, _, capacity = CHECKS[name]
+    capacity = capacity() if capacity is not None else None
+    if capacity is not None:
+        for n in SIZES:
+            result = func(n)
+            assert len(result) == min(n, capacity)
+            assert len(set(result)) == len(result)
+
+    n = SIZES[-1]
+    assert peak_memory(func, n) / n <= BYTES_PER_ALIAS
+
+
+@pytest.mark.skipif(not os.environ.get('ALIAS_TIMING_TESTS'),
+                    reason="timing check; set ALIAS_TIMING_TESTS=1 to run")
+@pytest.mark.parametrize('name', CHECKS)
+def test_growth_rate(name):
+    func, exponent, _ = CHECKS[name]
+    timings = [best_time(func, n)[0] for n in TIMING_SIZES]
+    slope = fit_exponent(TIMING_SIZES, timings)
+    assert slope <= exponent + SLOPE_TOLERANCE, f"grows as n^{slope:.2f}"
+
+
+def test_plus_aliases_stop_at_capacity():
+    # Requests beyond capacity must stop at capacity, not loop or repeat
+    capacity = plus_capacity(get_default_engine().plus_words)
+    result = generate_plus_aliases('john.doe@example.com', capacity + 500)
+    assert len(result) == capacity
+    assert len(set(result)) == capacity
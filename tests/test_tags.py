@@ -0,0 +1,44 @@
+"""
+Tests for the plus-tag pool
+"""
+
+import random
+import re
+
+from src.secure import SecureRandom
+from src.tags import VARIANTS_PER_WORD, TagPool
+
+
+WORDS = ('shopping', 'newsletter', 'social', 'work')
+
+
+def _suffixes(pool, count):
+    by_word = {}
+    for _ in range(count):
+        word, digits = re.fullmatch(r'([a-z]+)(\d*)', pool.take()).groups()
+        by_word.setdefault(word, []).append(digits)
+    return by_word
+
+
+def test_each_word_has_its_own_suffix_order():
+    pool = TagPool(WORDS, SecureRandom())
+    sequences = {tuple(s[:20]) for s in _suffixes(pool, 400).values()}
+    assert len(sequences) == len(WORDS)
+
+
+def test_pool_hands_out_every_variant_once():
+    pool = TagPool(WORDS, random.Random(1))
+    tags = [pool.take() for _ in range(len(WORDS) * VARIANTS_PER_WORD)]
+    assert len(set(tags)) == len(tags)
+    assert pool.take() is None
+
+
+def test_restore_continues_without_repeats():
+    rng = random.Random(2)
+    pool = TagPool(WORDS, rng)
+    first = [pool.take() for _ in range(500)]
+    restored = TagPool.restore(WORDS, random.Random(3), pool.state())
+    rest = [restored.take() for _ in range(len(WORDS) * VARIANTS_PER_WORD - 500)]
+    assert None not in rest
+    assert len(set(first) | set(rest)) == len(WORDS) * VARIANTS_PER_WORD
+    assert restored.take() is None
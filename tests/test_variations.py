@@ -0,0 +1,90 @@
+"""
+Tests for variation spaces and the variation stream
+"""
+
+import random
+from itertools import islice
+
+import pytest
+
+from src.variations import VariationStream, build_variation_spaces
+
+
+def _stream(username='johndoe', order='weighted', weights=None, seed=1):
+    spaces = build_variation_spaces(username)
+    return VariationStream(username, 'example.com', spaces, random.Random(seed), order, weights)
+
+
+def _only(**weights):
+    """Weights for just these strategies; the others default to their size."""
+    names = {space.name: 0 for space in build_variation_spaces('johndoe')}
+    return {**names, **weights}
+
+
+def _positions(stream):
+    return {name: position for name, position, _, _ in stream.state()['cursors']}
+
+
+def test_weighted_order_follows_the_weights():
+    stream = _stream(weights=_only(number=3, letter_number=1))
+    aliases = list(islice(stream, 1000))
+    positions = _positions(stream)
+    assert len(aliases) == 1000
+    assert positions['number'] + positions['letter_number'] == 1000
+    assert positions['number'] / 1000 == pytest.approx(0.75, abs=0.04)
+    # Strategies weighted 0 never come up
+    assert all(position == 0 for name, position in positions.items()
+               if name not in ('number', 'letter_number'))
+
+
+def test_balanced_order_takes_turns():
+    stream = _stream(order='balanced')
+    spaces = build_variation_spaces('johndoe')
+    list(islice(stream, len(spaces)))
+    assert set(_positions(stream).values()) == {1}
+    # One-variation strategies (double, reverse) drop out after their turn
+    list(islice(stream, len(spaces)))
+    positions = _positions(stream)
+    assert positions['double'] == positions['reverse'] == 1
+    assert min(positions['year'], positions['number'], positions['prefix']) >= 2
+
+
+def test_exhausted_strategies_are_dropped():
+    stream = _stream(weights=_only(year=1000, number=1))
+    aliases = list(islice(stream, 200))
+    positions = _positions(stream)
+    assert positions == {**positions, 'year': 6, 'number': 194}
+    assert [c.space.name for c in stream._active] == ['number']
+    assert len(set(aliases)) == 200
+    # Dropped strategies stay dropped across a restore
+    assert stream.state()['weights']['year'] == 0
+
+
+def test_stream_runs_dry_without_repeats():
+    stream = _stream(order='balanced')
+    aliases = list(stream)
+    assert len(aliases) == len(set(aliases))
+    assert 'johndoe@example.com' not in aliases
+    assert len(aliases) <= stream.total
+
+
+def test_palindromes_skip_reverse():
+    assert 'reverse' not in {space.name for space in build_variation_spaces('anna')}
+    assert 'reverse' in {space.name for space in build_variation_spaces('anne')}
+    assert 'anna@example.com' not in set(_stream('anna', order='balanced'))
+
+
+@pytest.mark.parametrize('order', ['balanced', 'weighted'])
+def test_restore_continues_without_repeats(order):
+    username = 'johndoe'
+    stream = _stream(username, order, weights={'number': 2, 'dots': 1, 'year': 5})
+    first = list(islice(stream, 300))
+    spaces = build_variation_spaces(username)
+    restored = VariationStream.restore(username, 'example.com', spaces, random.Random(9),
+                                       stream.state())
+    assert set(restored.produced()) == set(first)
+    rest = list(restored)
+    assert not set(first) & set(rest)
+    assert len(set(rest)) == len(rest)
+    # The restored stream finishes exactly what the original would have
+    assert set(first + rest) == set(first + list(stream))
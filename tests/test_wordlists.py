@@ -0,0 +1,20 @@
+"""
+Tests for word list loading
+"""
+
+from src.wordlists import FALLBACK_VERBS, WordListSource, load_weighted_word_lists
+
+
+def test_both_loaders_agree_and_report_rejected_lines(tmp_path):
+    (tmp_path / 'adjectives.txt').write_text("happy 2\nBold\nnot-a-word\nhappy\n")
+    (tmp_path / 'nouns.txt').write_text("tiger x\nfox 0.5\n")
+    source = WordListSource(tmp_path)
+    loaded = source.load()
+    assert loaded == load_weighted_word_lists(tmp_path)
+    adjectives, nouns, verbs, weights = loaded
+    assert adjectives == ['happy', 'bold']
+    assert nouns == ['fox']
+    assert verbs == list(FALLBACK_VERBS)  # verbs.txt is missing
+    assert weights == {'happy': 2.0, 'fox': 0.5}
+    assert source.rejected == {'adjectives.txt': ['not-a-word'], 'nouns.txt': ['tiger x'],
+                               'verbs.txt': []}
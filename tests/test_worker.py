@@ -0,0 +1,86 @@
+"""
+Tests for the JSON-lines stdio worker
+"""
+
+import io
+import json
+import time
+
+import pytest
+
+from src.distance import levenshtein
+from src.worker import CHUNK_SIZE, MAX_COUNT, StdioWorker
+
+
+def _serve(engine, *requests):
+    infile = io.StringIO(''.join(json.dumps(r) + '\n' for r in requests))
+    outfile = io.StringIO()
+    StdioWorker(engine, infile, outfile, key='secret').serve()
+    return [json.loads(line) for line in outfile.getvalue().splitlines()]
+
+
+def test_bad_requests_get_error_lines_and_the_worker_keeps_going(engine):
+    responses = _serve(
+        engine,
+        {'id': 1, 'mailbox': 'john@gmail.com', 'constraints': [1]},
+        {'id': 2, 'mailbox': 'john@gmail.com', 'strategy': 'rotating',
+         'constraints': {'period': 0}},
+        {'id': 3, 'mailbox': 'john@gmail.com', 'constraints': {'mix': {'plus': 'x'}}},
+        {'id': 4, 'mailbox': 'john@gmail.com', 'count': 2, 'strategy': 'plus'},
+    )
+    assert [r['id'] for r in responses] == [1, 2, 3, 4]
+    assert all(r.get('error') for r in responses[:3])
+    assert responses[3]['done'] and len(responses[3]['aliases']) == 2
+
+
+def test_pipelined_requests_are_answered_in_order(engine):
+    responses = _serve(
+        engine,
+        {'id': 'a', 'mailbox': 'john@gmail.com', 'count': 3},
+        {'id': 'b', 'mailbox': 'jane@example.com', 'count': 2, 'strategy': 'plus',
+         'constraints': {'max_length': 12}},
+        {'id': 'c', 'mailbox': 'john@example.com', 'count': 5, 'strategy': 'creative'},
+    )
+    assert [r['id'] for r in responses] == ['a', 'b', 'c']
+    assert all(r['done'] and not r['partial'] and r['continuation'] is None for r in responses)
+    assert [len(r['aliases']) for r in responses] == [3, 2, 5]
+    assert all(len(alias.split('@')[0]) <= 12 for alias in responses[1]['aliases'])
+    assert all(alias.endswith('@example.com') for alias in responses[2]['aliases'])
+
+
+def test_large_batches_are_split_into_chunks(engine):
+    responses = _serve(engine, {'id': 1, 'mailbox': 'john.doe@gmail.com',
+                                'count': CHUNK_SIZE * 2 + 5})
+    assert [len(r['aliases']) for r in responses] == [CHUNK_SIZE, CHUNK_SIZE, 5]
+    assert [r['done'] for r in responses] == [False, False, True]
+    assert 'partial' not in responses[0] and responses[-1]['partial'] is False
+    aliases = [alias for r in responses for alias in r['aliases']]
+    assert len(set(aliases)) == len(aliases)
+
+
+def test_partial_runs_resume_from_their_continuation(engine):
+    first = _serve(engine, {'id': 1, 'mailbox': 'john.doe@gmail.com', 'count': 3000,
+                            'strategy': 'plus', 'constraints': {'deadline_ms': 0}})[-1]
+    assert first['partial'] and first['continuation']
+    rest = _serve(engine, {'id': 2, 'continuation': first['continuation']})
+    aliases = first['aliases'] + [alias for r in rest for alias in r['aliases']]
+    assert rest[-1]['done'] and not rest[-1]['partial']
+    assert len(aliases) == 3000 and len(set(aliases)) == 3000
+
+
+@pytest.mark.parametrize('strategy', ['creative', 'random'])
+def test_template_batches_are_distinct_and_keep_constraints(engine, strategy):
+    response = _serve(engine, {'id': 1, 'mailbox': 'bob@example.com', 'count': 300,
+                               'strategy': strategy, 'constraints': {'min_distance': 3}})[-1]
+    aliases = response['aliases']
+    assert len(aliases) == 300
+    locals_ = [alias.split('@')[0] for alias in aliases]
+    assert all(levenshtein(a, b) >= 3 for i, a in enumerate(locals_) for b in locals_[:i])
+
+    started = time.perf_counter()
+    cut = _serve(engine, {'id': 2, 'mailbox': 'ann@example.com', 'count': MAX_COUNT,
+                          'strategy': strategy, 'constraints': {'deadline_ms': 50}})
+    assert time.perf_counter() - started < 5
+    assert cut[-1]['partial'] and cut[-1]['continuation'] is None
+    aliases = [alias for r in cut for alias in r['aliases']]
+    assert aliases and len(set(aliases)) == len(aliases)
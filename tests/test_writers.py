@@ -0,0 +1,55 @@
+"""
+Tests for the lookup-table and database writers
+"""
+
+import dbm.dumb
+import sqlite3
+
+import pytest
+
+from src import writers
+from src.writers import write_sqlite
+
+
+MAILBOX = 'john@example.com'
+
+
+def _aliases(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return [row[0] for row in conn.execute("SELECT alias FROM aliases ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_sqlite_new_file_loads_and_deduplicates(tmp_path):
+    path = tmp_path / 'aliases.db'
+    aliases = [f"john+{i % 700}@example.com" for i in range(1000)]
+    assert write_sqlite(aliases, MAILBOX, path, batch_size=300) == 700
+    assert _aliases(path) == [f"john+{i}@example.com" for i in range(700)]
+
+
+def test_sqlite_append_keeps_wal_and_skips_existing(tmp_path):
+    path = tmp_path / 'aliases.db'
+    conn = sqlite3.connect(str(path))
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.close()
+    write_sqlite([f"john+{i}@example.com" for i in range(10)], MAILBOX, path)
+    added = write_sqlite([f"john+{i}@example.com" for i in range(5, 15)], MAILBOX, path,
+                         batch_size=4)
+    assert added == 5
+    assert sorted(_aliases(path)) == sorted(f"john+{i}@example.com" for i in range(15))
+    conn = sqlite3.connect(str(path))
+    try:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    finally:
+        conn.close()
+
+
+def test_dbm_warns_when_only_the_slow_backend_is_available(tmp_path, monkeypatch):
+    monkeypatch.setattr(writers, '_gdbm', None)
+    monkeypatch.setattr(writers, '_ndbm', None)
+    with pytest.warns(RuntimeWarning, match='dbm.dumb'):
+        assert writers.write_dbm(['john+a@example.com'], MAILBOX, tmp_path / 'map') == 1
+    with dbm.dumb.open(str(tmp_path / 'map')) as db:
+        assert db[b'john+a@example.com'] == MAILBOX.encode()